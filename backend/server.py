@@ -1,27 +1,40 @@
 from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, Response, BackgroundTasks, WebSocket, WebSocketDisconnect, UploadFile, File
 from fastapi.responses import JSONResponse
+import orjson
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne, ReturnDocument
+from pymongo.errors import DuplicateKeyError
 import os
 import logging
 import httpx
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, Field, EmailStr, field_validator
 from typing import List, Optional, Dict
 import uuid
 from datetime import datetime, timezone, timedelta
 import secrets
 import string
-import hashlib
 import re
 import asyncio
-import json
 import random
 from livekit import api
 
 # Import services
-from services.email_service import send_verification_email, send_welcome_email
+from services.email_service import EmailOutbox, verification_params, welcome_params, password_reset_params
+from services.push_service import PushDeliveryService
+from services.password_service import hash_password, verify_password, needs_rehash, password_stats
+from services.password_service import shutdown as shutdown_password_hashing
+from services.account_deletion import AccountDeletionService
+from services.social_graph import SocialGraph
+from services.suggestions import SuggestionService
+from services.leaderboard import RisingVoicesLeaderboard
+from services.presence import PresenceRegistry
+from services.engagement_counters import EngagementCounters
+from services.migrations import Migration, Backfill, MigrationRunner, MIGRATION_BATCH, MIGRATION_PAUSE
+from services.explore_ranker import ExploreRanker, EXPLORE_SNAPSHOT_SIZE
+from services.micro_cache import MicroCache
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -31,8 +44,56 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
+# Transactional email goes through a durable outbox; handlers never wait on Resend
+email_outbox = EmailOutbox(db)
+
+# Account deletion cascades run as resumable background jobs
+account_deletion = AccountDeletionService(db)
+
+# In-memory follow graph for mutuals, friends-of-friends and follow lists
+social_graph = SocialGraph(db)
+suggestion_service = SuggestionService(db, social_graph)
+
+# Rising Voices: daily score buckets bumped on follow/like/reply
+rising_voices = RisingVoicesLeaderboard(db)
+
+# Who is on The Block: in-memory, fed by sockets and requests, last_active written behind
+presence = PresenceRegistry(db)
+
+# Like/reply/repost counts are buffered and applied to posts in bulk
+engagement_counters = EngagementCounters(db)
+
+# Explore is ranked once a minute for everyone and served from a snapshot
+explore_ranker = ExploreRanker(db, overlay=engagement_counters.overlay)
+
+# Short-TTL, single-flight cache for reads that are the same for every caller
+micro_cache = MicroCache()
+
+def profile_changed(*user_ids: str):
+    """Drop cached profiles and GC member cards of these users"""
+    micro_cache.invalidate("profile", where=lambda profile: profile.user_id in user_ids)
+    micro_cache.invalidate("gc_member_cards", where=lambda cards: any(uid in cards for uid in user_ids))
+
+def stoop_changed(stoop_id: str):
+    """Drop cached reads of a Stoop and the live list after it changes"""
+    micro_cache.invalidate("stoop", stoop_id)
+    micro_cache.invalidate("live_stoops")
+
+class FastJSONResponse(JSONResponse):
+    """
+    orjson-encoded JSON. It is the default response class; list endpoints
+    also return it directly, which skips FastAPI's jsonable_encoder pass.
+    Timestamps go out as stored (ISO strings, or datetimes orjson formats
+    natively; Mongo's naive datetimes are UTC) rather than being parsed and
+    re-formatted per item.
+    """
+    media_type = "application/json"
+    
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC)
+
 # Create the main app
-app = FastAPI(title="BLVX API", description="High-Context Social Network")
+app = FastAPI(title="BLVX API", description="High-Context Social Network", default_response_class=FastJSONResponse)
 
 # Create routers
 api_router = APIRouter(prefix="/api")
@@ -68,12 +129,16 @@ class ConnectionManager:
     def __init__(self):
         # Map of gc_id -> list of active connections
         self.gc_connections: Dict[str, List[WebSocket]] = {}
+        # Map of gc_id -> {user_id: open socket count} for users viewing the GC room
+        self.gc_room_users: Dict[str, Dict[str, int]] = {}
         # Map of stoop_id -> list of active connections
         self.stoop_connections: Dict[str, List[WebSocket]] = {}
-        # Map of user_id -> WebSocket for direct notifications
-        self.user_connections: Dict[str, WebSocket] = {}
+        # Map of user_id -> active notification sockets (one per open tab/device)
+        self.user_connections: Dict[str, List[WebSocket]] = {}
         # Map of sidebar_id -> list of active connections for 1-on-1 chats
         self.sidebar_connections: Dict[str, List[WebSocket]] = {}
+        # /ws/presence subscribers (the Who's Here widget)
+        self.presence_connections: List[WebSocket] = []
     
     async def connect_gc(self, websocket: WebSocket, gc_id: str, user_id: str):
         """Connect a user to a GC channel"""
@@ -81,6 +146,8 @@ class ConnectionManager:
         if gc_id not in self.gc_connections:
             self.gc_connections[gc_id] = []
         self.gc_connections[gc_id].append(websocket)
+        room_users = self.gc_room_users.setdefault(gc_id, {})
+        room_users[user_id] = room_users.get(user_id, 0) + 1
         logger.info(f"User {user_id} connected to GC {gc_id}")
     
     async def disconnect_gc(self, websocket: WebSocket, gc_id: str, user_id: str):
@@ -90,8 +157,19 @@ class ConnectionManager:
                 self.gc_connections[gc_id].remove(websocket)
             if not self.gc_connections[gc_id]:
                 del self.gc_connections[gc_id]
+        room_users = self.gc_room_users.get(gc_id)
+        if room_users and user_id in room_users:
+            room_users[user_id] -= 1
+            if room_users[user_id] <= 0:
+                del room_users[user_id]
+            if not room_users:
+                del self.gc_room_users[gc_id]
         logger.info(f"User {user_id} disconnected from GC {gc_id}")
     
+    def get_gc_room_user_ids(self, gc_id: str) -> set:
+        """Get the user IDs that currently have the GC room open"""
+        return set(self.gc_room_users.get(gc_id, {}))
+    
     async def broadcast_to_gc(self, gc_id: str, message: dict):
         """Broadcast a message to all connections in a GC"""
         if gc_id in self.gc_connections:
@@ -140,22 +218,40 @@ class ConnectionManager:
     async def connect_user(self, websocket: WebSocket, user_id: str):
         """Connect a user for direct notifications"""
         await websocket.accept()
-        self.user_connections[user_id] = websocket
+        self.user_connections.setdefault(user_id, []).append(websocket)
+        presence.connect(user_id)
         logger.info(f"User {user_id} connected for notifications")
     
-    async def disconnect_user(self, user_id: str):
-        """Disconnect a user from notifications"""
-        if user_id in self.user_connections:
-            del self.user_connections[user_id]
+    async def disconnect_user(self, websocket: WebSocket, user_id: str):
+        """Disconnect one of a user's notification sockets"""
+        self._remove_user_socket(user_id, websocket)
         logger.info(f"User {user_id} disconnected from notifications")
     
+    def _remove_user_socket(self, user_id: str, websocket: WebSocket):
+        """The only way a notification socket leaves, so presence sees every removal exactly once"""
+        sockets = self.user_connections.get(user_id)
+        if sockets is None:
+            return
+        if websocket in sockets:
+            sockets.remove(websocket)
+            presence.disconnect(user_id)
+        if not sockets:
+            del self.user_connections[user_id]
+    
     async def send_to_user(self, user_id: str, message: dict):
-        """Send a message to a specific user"""
-        if user_id in self.user_connections:
+        """Send a message to every notification socket of a user"""
+        sockets = self.user_connections.get(user_id)
+        if not sockets:
+            return
+        for connection in list(sockets):
             try:
-                await self.user_connections[user_id].send_json(message)
+                await connection.send_json(message)
             except Exception:
-                del self.user_connections[user_id]
+                self._remove_user_socket(user_id, connection)
+    
+    def is_user_connected(self, user_id: str) -> bool:
+        """Check if a user has a live notification socket"""
+        return user_id in self.user_connections
     
     async def connect_sidebar(self, websocket: WebSocket, sidebar_id: str, user_id: str):
         """Connect a user to a sidebar chat"""
@@ -188,6 +284,22 @@ class ConnectionManager:
                 if conn in self.sidebar_connections[sidebar_id]:
                     self.sidebar_connections[sidebar_id].remove(conn)
 
+    async def connect_presence(self, websocket: WebSocket):
+        await websocket.accept()
+        self.presence_connections.append(websocket)
+    
+    def disconnect_presence(self, websocket: WebSocket):
+        if websocket in self.presence_connections:
+            self.presence_connections.remove(websocket)
+    
+    async def broadcast_presence(self, message: dict):
+        """Send one presence update to every /ws/presence socket concurrently"""
+        sockets = list(self.presence_connections)
+        results = await asyncio.gather(*(ws.send_json(message) for ws in sockets), return_exceptions=True)
+        for ws, result in zip(sockets, results):
+            if isinstance(result, Exception):
+                self.disconnect_presence(ws)
+
 # Global connection manager
 ws_manager = ConnectionManager()
 
@@ -201,9 +313,9 @@ class UserBase(BaseModel):
     name: str
     picture: Optional[str] = None
     username: Optional[str] = None
-    bio: Optional[str] = None
+    bio: Optional[str] = ""
     verified: bool = False
-    email_verified: bool = False
+    email_verified: bool = True   # Only accounts from before verification lack the field
     reputation_score: int = 100
     plates_remaining: int = 10
     is_day_one: bool = False
@@ -217,6 +329,12 @@ class UserBase(BaseModel):
     last_active: Optional[datetime] = None
     activity_status: Optional[str] = None  # "online", "recently", "away"
 
+    @field_validator("created_at")
+    @classmethod
+    def created_at_utc(cls, value: datetime) -> datetime:
+        # Mongo hands back naive UTC datetimes
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
 class UserUpdate(BaseModel):
     username: Optional[str] = None
     bio: Optional[str] = None
@@ -297,6 +415,10 @@ class BonitaResponse(BaseModel):
     response: str
     mode: str
 
+class ViewerStateRequest(BaseModel):
+    post_ids: List[str] = []
+    user_ids: List[str] = []
+
 class ReportCreate(BaseModel):
     """Report a post or user"""
     target_type: str  # "post" or "user"
@@ -304,24 +426,62 @@ class ReportCreate(BaseModel):
     reason: str  # "spam", "harassment", "hate_speech", "misinformation", "other"
     details: Optional[str] = None  # Additional context
 
+# Canonical public shapes for users/posts embedded in feed, notification and
+# message responses. Never embed a full user document: it carries email,
+# muted_words, consent flags and more.
+PUBLIC_USER_CARD = {"_id": 0, "user_id": 1, "name": 1, "username": 1, "picture": 1, "verified": 1, "is_day_one": 1}
+# People lists (search, online, discover, trending): the card plus what they render or derive status from
+USER_LIST_CARD = {**PUBLIC_USER_CARD, "bio": 1, "last_active": 1}
+# Accounts being deleted are tombstoned (deleted_at) until their job finishes; card lookups skip them
+LIVE_USER = {"deleted_at": {"$exists": False}}
+POST_VIEW = {"_id": 0, **{field: 1 for field in (
+    "post_id", "user_id", "content", "media_url", "media_type", "gif_metadata", "reference_url",
+    "post_type", "parent_post_id", "quote_post_id", "root_id", "depth", "visibility", "energy",
+    "poll.options", "poll.total_votes", "is_spark", "reply_count", "repost_count", "like_count", "created_at",
+    "event_name", "is_culture_calendar", "stoop_session_id",
+)}}
+# Posts keep who voted in poll_ballots (and legacy poll.voters); clients only get the tallies
+POLL_VIEW = {"_id": 0, "poll.options": 1, "poll.total_votes": 1}
+POLL_BALLOTS_VERSION = 8     # Migration that moves poll_votes rows onto their posts
+POST_PREVIEW_PROJECTION = {"_id": 0, "post_id": 1, "user_id": 1, "content": 1, "media_url": 1, "media_type": 1, "created_at": 1}
+
+# ========================
+# BACKGROUND TASKS
+# ========================
+
+# Fire-and-forget work started by request handlers. The loop only keeps weak
+# references to tasks, so they are held here until done.
+_background_tasks: set = set()
+
+def spawn_background(coro, what: str) -> asyncio.Task:
+    """Run coro without waiting for it; failures are logged, not lost"""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(lambda t: _background_done(t, what))
+    return task
+
+def _background_done(task: asyncio.Task, what: str):
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception():
+        logger.error(f"Background {what} failed: {task.exception()!r}")
+
 # ========================
 # PASSWORD HELPERS
 # ========================
 
-def hash_password(password: str) -> str:
-    """Hash password with salt"""
-    salt = secrets.token_hex(16)
-    hashed = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
-    return f"{salt}:{hashed.hex()}"
+# hash_password / verify_password live in services.password_service and run on
+# a bounded thread pool so PBKDF2 never blocks the event loop.
 
-def verify_password(password: str, stored_hash: str) -> bool:
-    """Verify password against stored hash"""
+async def upgrade_password_hash(user_id: str, password: str, old_hash: str):
+    """Re-hash at the current cost after a successful login (no-op if the hash changed meanwhile)"""
     try:
-        salt, hashed = stored_hash.split(':')
-        new_hash = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
-        return new_hash.hex() == hashed
-    except:
-        return False
+        new_hash = await hash_password(password)
+        await db.users.update_one(
+            {"user_id": user_id, "password_hash": old_hash},
+            {"$set": {"password_hash": new_hash}}
+        )
+    except Exception as e:
+        logger.error(f"Password rehash failed for {user_id}: {e}")
 
 def generate_verification_code() -> str:
     """Generate 6-digit verification code"""
@@ -331,6 +491,56 @@ def generate_session_token() -> str:
     """Generate secure session token"""
     return f"session_{secrets.token_urlsafe(32)}"
 
+# ========================
+# SESSION STORE
+# ========================
+
+SESSION_DAYS = 7
+SESSION_REMEMBER_DAYS = 30
+SESSION_RENEW_INTERVAL = timedelta(hours=1)   # Touch a session at most this often
+MAX_SESSIONS_PER_USER = 10                    # Oldest sessions beyond this are revoked
+SESSION_PROJECTION = {"_id": 0, "user_id": 1, "expires_at": 1, "last_seen_at": 1, "remember_me": 1}
+
+def as_utc(value) -> Optional[datetime]:
+    """Coerce a stored timestamp (BSON date or legacy ISO string) to an aware datetime"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime) and value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+async def get_session(session_token: str) -> Optional[dict]:
+    """
+    Look up a live session and slide its expiry forward. Sessions carry BSON
+    dates so the TTL index on expires_at reaps them; renewal writes at most
+    once per SESSION_RENEW_INTERVAL and runs off the request path.
+    """
+    session = await db.user_sessions.find_one({"session_token": session_token}, SESSION_PROJECTION)
+    if not session:
+        return None
+    now = datetime.now(timezone.utc)
+    expires_at = as_utc(session.get("expires_at"))
+    if expires_at and expires_at < now:
+        return None
+
+    last_seen_at = as_utc(session.get("last_seen_at"))
+    if not last_seen_at or now - last_seen_at >= SESSION_RENEW_INTERVAL:
+        days = SESSION_REMEMBER_DAYS if session.get("remember_me") else SESSION_DAYS
+        session["expires_at"] = now + timedelta(days=days)
+        session["renewed"] = True
+        spawn_background(renew_session(session_token, now, session["expires_at"]), "session renewal")
+    return session
+
+async def renew_session(session_token: str, now: datetime, expires_at: datetime):
+    """Slide a session's expiry (background task)"""
+    try:
+        await db.user_sessions.update_one(
+            {"session_token": session_token},
+            {"$set": {"last_seen_at": now, "expires_at": expires_at}}
+        )
+    except Exception as e:
+        logger.error(f"Failed to renew session: {e}")
+
 # ========================
 # AUTH HELPERS
 # ========================
@@ -338,6 +548,7 @@ def generate_session_token() -> str:
 async def get_current_user(request: Request) -> UserBase:
     """Get current user from session token (cookie or header)"""
     session_token = request.cookies.get("session_token")
+    from_cookie = bool(session_token)
     if not session_token:
         auth_header = request.headers.get("Authorization")
         if auth_header and auth_header.startswith("Bearer "):
@@ -346,79 +557,37 @@ async def get_current_user(request: Request) -> UserBase:
     if not session_token:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    session = await db.user_sessions.find_one({"session_token": session_token}, {"_id": 0})
+    session = await get_session(session_token)
     
     if not session:
-        raise HTTPException(status_code=401, detail="Invalid session")
+        raise HTTPException(status_code=401, detail="Invalid or expired session")
     
-    expires_at = session["expires_at"]
-    if isinstance(expires_at, str):
-        expires_at = datetime.fromisoformat(expires_at)
-    if expires_at.tzinfo is None:
-        expires_at = expires_at.replace(tzinfo=timezone.utc)
-    if expires_at < datetime.now(timezone.utc):
-        raise HTTPException(status_code=401, detail="Session expired")
+    # The cookie's max_age must slide with the session (see refresh_session_cookie)
+    if from_cookie and session.get("renewed"):
+        request.state.renewed_session = (session_token, session["expires_at"])
     
     user = await db.users.find_one({"user_id": session["user_id"]}, {"_id": 0})
     
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
     
-    if isinstance(user.get("created_at"), str):
-        user["created_at"] = datetime.fromisoformat(user["created_at"])
-    
-    # Set defaults for ALL optional fields to prevent frontend crashes
-    user.setdefault("email_verified", True)  # Default for existing users
-    user.setdefault("reputation_score", 100)
-    user.setdefault("plates_remaining", 10)
-    user.setdefault("is_day_one", False)
-    user.setdefault("is_vouched", False)
-    user.setdefault("has_seen_welcome", False)
-    user.setdefault("vouched_by", None)
-    user.setdefault("bio", "")
-    user.setdefault("followers_count", 0)
-    user.setdefault("following_count", 0)
-    user.setdefault("posts_count", 0)
-    user.setdefault("verified", False)
-    
-    # Generate default avatar if missing
-    if not user.get("picture"):
-        user["picture"] = f"https://api.dicebear.com/7.x/initials/svg?seed={user.get('name', 'U')}&backgroundColor=1a1a1a&textColor=ffffff"
-    
-    # Generate default username if missing
-    if not user.get("username"):
-        email = user.get("email", "")
-        user["username"] = email.split("@")[0] if email else f"user_{user.get('user_id', '')[:8]}"
-    
-    # Generate default name if missing
-    if not user.get("name"):
-        user["name"] = user.get("username", "User")
+    # Defaults and native dates are backfilled by SCHEMA_MIGRATIONS; fill in until they finish
+    with_user_fallbacks(user)
     
     # The Prime Mover - CJ is always vouched
     if user.get("email") == "cj@blvx.social":
         user["is_vouched"] = True
     
-    # Update last_active in background (non-blocking)
-    asyncio.create_task(update_user_last_active(user["user_id"]))
+    # Presence is in memory; last_active reaches the database in periodic batches
+    presence.touch(user["user_id"])
     
     # Calculate activity status
-    user["last_active"] = user.get("last_active") or datetime.utcnow()
+    user["last_active"] = presence.last_seen(user["user_id"])
     user["activity_status"] = get_activity_status(user.get("last_active"))
     
     return UserBase(**user)
 
 
-async def update_user_last_active(user_id: str):
-    """Update user's last_active timestamp (background task)"""
-    try:
-        await db.users.update_one(
-            {"user_id": user_id},
-            {"$set": {"last_active": datetime.utcnow()}}
-        )
-    except Exception as e:
-        logger.error(f"Failed to update last_active for {user_id}: {e}")
-
-
 def get_activity_status(last_active: Optional[datetime]) -> str:
     """
     Calculate user's activity status based on last_active timestamp.
@@ -483,21 +652,33 @@ async def get_optional_user(request: Request) -> Optional[UserBase]:
         return None
 
 async def create_session(user_id: str, response: Response, remember_me: bool = False) -> str:
-    """Create a new session for a user"""
+    """Create a new session for a user (other devices stay signed in, up to MAX_SESSIONS_PER_USER)"""
     session_token = generate_session_token()
-    # 30 days if remember_me, otherwise 7 days
-    session_days = 30 if remember_me else 7
-    expires_at = datetime.now(timezone.utc) + timedelta(days=session_days)
+    session_days = SESSION_REMEMBER_DAYS if remember_me else SESSION_DAYS
+    now = datetime.now(timezone.utc)
+    
+    # Make room for the new session by revoking the least recently used ones
+    stale = await db.user_sessions.find(
+        {"user_id": user_id},
+        {"_id": 0, "session_token": 1}
+    ).sort("last_seen_at", -1).skip(MAX_SESSIONS_PER_USER - 1).to_list(None)
+    if stale:
+        await db.user_sessions.delete_many({"session_token": {"$in": [s["session_token"] for s in stale]}})
     
-    await db.user_sessions.delete_many({"user_id": user_id})
     await db.user_sessions.insert_one({
         "user_id": user_id,
         "session_token": session_token,
-        "expires_at": expires_at.isoformat(),
-        "created_at": datetime.now(timezone.utc).isoformat(),
+        "expires_at": now + timedelta(days=session_days),
+        "last_seen_at": now,
+        "created_at": now,
         "remember_me": remember_me
     })
     
+    set_session_cookie(response, session_token, session_days * 24 * 60 * 60)
+    
+    return session_token
+
+def set_session_cookie(response: Response, session_token: str, max_age: int):
     response.set_cookie(
         key="session_token",
         value=session_token,
@@ -505,10 +686,72 @@ async def create_session(user_id: str, response: Response, remember_me: bool = F
         secure=True,
         samesite="none",  # Required for OAuth redirects on mobile Safari
         path="/",
-        max_age=session_days * 24 * 60 * 60
+        max_age=max_age
     )
-    
-    return session_token
+
+# ========================
+# USERNAME ALLOCATION
+# ========================
+
+USERNAME_INSERT_RETRIES = 3
+USERNAME_PREFIX_SCAN = 200  # Most base<N> names read when looking for a free suffix
+# The unique username index covers member accounts (user_ ids) only: Bonita's
+# system accounts (bonita, bonita_ai) share the "bonita" handle on purpose.
+# Signups still see system handles as taken through next_free_username.
+MEMBER_USERNAMES = {"username": {"$type": "string"}, "user_id": {"$gte": "user_", "$lt": "user`"}}
+SYSTEM_USER_IDS = ("bonita", "bonita_ai")
+
+def username_base(raw: str) -> str:
+    """Normalize a name/email prefix into a username base"""
+    return re.sub(r'[^a-z0-9_]', '', (raw or "").lower())[:15] or "user"
+
+async def next_free_username(base: str) -> str:
+    """
+    Find `base` or the lowest free `base<N>` with one anchored-prefix query
+    (served by the username index) instead of probing base1, base2, ...
+    Takers are read in numeric order (shorter names first, so base10 comes
+    after base9); if the first USERNAME_PREFIX_SCAN of them leave no gap,
+    the base gets a random suffix instead.
+    """
+    taken = await db.users.aggregate([
+        {"$match": {"username": {"$regex": f"^{re.escape(base)}[0-9]*$"}}},
+        {"$project": {"_id": 0, "username": 1, "length": {"$strLenCP": "$username"}}},
+        {"$sort": {"length": 1, "username": 1}},
+        {"$limit": USERNAME_PREFIX_SCAN}
+    ]).to_list(USERNAME_PREFIX_SCAN)
+    suffixes = set()
+    for doc in taken:
+        suffix = doc["username"][len(base):]
+        suffixes.add(int(suffix) if suffix else 0)
+    if 0 not in suffixes:
+        return base
+    counter = 1
+    while counter in suffixes:
+        counter += 1
+    if len(taken) >= USERNAME_PREFIX_SCAN and counter > max(suffixes):
+        return f"{base[:9]}_{uuid.uuid4().hex[:5]}"
+    return f"{base}{counter}"
+
+async def insert_user_with_username(new_user: dict, base: str) -> str:
+    """
+    Insert a new user under the first free username for `base`. The unique
+    username index settles races: on a duplicate we re-allocate and retry.
+    """
+    if not new_user.get("picture"):
+        new_user["picture"] = default_avatar_url(new_user.get("name") or "New Member")
+    for _ in range(USERNAME_INSERT_RETRIES):
+        new_user["username"] = await next_free_username(base)
+        try:
+            await db.users.insert_one(new_user)
+            return new_user["username"]
+        except DuplicateKeyError as e:
+            if "username" not in str(e):
+                raise
+            new_user.pop("_id", None)
+    # Persistent contention on this base - fall back to a random suffix
+    new_user["username"] = f"{base[:9]}_{uuid.uuid4().hex[:5]}"
+    await db.users.insert_one(new_user)
+    return new_user["username"]
 
 # ========================
 # AUTH ROUTES
@@ -526,15 +769,6 @@ async def email_signup(data: EmailSignup, response: Response):
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    # Generate username from email
-    username = data.email.split("@")[0].lower()
-    username = re.sub(r'[^a-z0-9_]', '', username)[:15]
-    base_username = username
-    counter = 1
-    while await db.users.find_one({"username": username}):
-        username = f"{base_username}{counter}"
-        counter += 1
-    
     # Generate verification code
     verification_code = generate_verification_code()
     
@@ -543,10 +777,9 @@ async def email_signup(data: EmailSignup, response: Response):
     new_user = {
         "user_id": user_id,
         "email": data.email.lower(),
-        "password_hash": hash_password(data.password),
+        "password_hash": await hash_password(data.password),
         "name": data.name,
         "picture": "",
-        "username": username,
         "bio": "",
         "verified": False,
         "email_verified": False,
@@ -560,11 +793,12 @@ async def email_signup(data: EmailSignup, response: Response):
         "posts_count": 0,
         "vouched_by": None,
         "marketing_consent": data.marketing_consent,
-        "marketing_consent_at": datetime.now(timezone.utc).isoformat() if data.marketing_consent else None,
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "marketing_consent_at": datetime.now(timezone.utc) if data.marketing_consent else None,
+        "created_at": datetime.now(timezone.utc)
     }
     
-    await db.users.insert_one(new_user)
+    # Username comes from the email prefix
+    await insert_user_with_username(new_user, username_base(data.email.split("@")[0]))
     
     # Store verification code
     await db.verification_codes.delete_many({"email": data.email.lower()})
@@ -577,15 +811,13 @@ async def email_signup(data: EmailSignup, response: Response):
     
     logger.info(f"Verification code for {data.email}: {verification_code}")
     
-    # Send verification email (non-blocking)
-    email_sent = await send_verification_email(data.email.lower(), verification_code, data.name)
+    # Queue verification email; the outbox sender delivers it
+    email_sent = await email_outbox.enqueue("verification", data.email.lower(), verification_params(verification_code, data.name))
     
     # Create session even before verification (but user will have limited access)
     session_token = await create_session(user_id, response)
     
     user = await db.users.find_one({"user_id": user_id}, {"_id": 0, "password_hash": 0})
-    if isinstance(user.get("created_at"), str):
-        user["created_at"] = datetime.fromisoformat(user["created_at"])
     
     return {
         "user": {**user, "session_token": session_token},
@@ -606,15 +838,16 @@ async def email_login(data: EmailLogin, response: Response):
     if not user.get("password_hash"):
         raise HTTPException(status_code=401, detail="This account uses Google sign-in")
     
-    if not verify_password(data.password, user["password_hash"]):
+    if not await verify_password(data.password, user["password_hash"]):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
+    if needs_rehash(user["password_hash"]):
+        spawn_background(upgrade_password_hash(user["user_id"], data.password, user["password_hash"]), "password rehash")
+    
     session_token = await create_session(user["user_id"], response, data.remember_me)
     
     # Return user without password, with session token
     user_data = {k: v for k, v in user.items() if k not in ["_id", "password_hash"]}
-    if isinstance(user_data.get("created_at"), str):
-        user_data["created_at"] = datetime.fromisoformat(user_data["created_at"])
     
     return {**user_data, "session_token": session_token}
 
@@ -643,11 +876,9 @@ async def verify_email(data: VerifyEmail, response: Response):
     await db.verification_codes.delete_many({"email": data.email.lower()})
     
     user = await db.users.find_one({"email": data.email.lower()}, {"_id": 0, "password_hash": 0})
-    if isinstance(user.get("created_at"), str):
-        user["created_at"] = datetime.fromisoformat(user["created_at"])
     
-    # Send welcome email
-    await send_welcome_email(data.email.lower(), user.get("name", "there"))
+    # Queue welcome email
+    await email_outbox.enqueue("welcome", data.email.lower(), welcome_params(user.get("name", "there")))
     
     # Create session token for auto-login after verification
     session_token = await create_session(user["user_id"], response)
@@ -676,8 +907,8 @@ async def resend_verification(email: EmailStr):
     
     logger.info(f"New verification code for {email}: {verification_code}")
     
-    # Send verification email
-    email_sent = await send_verification_email(email.lower(), verification_code, user.get("name", "there"))
+    # Queue verification email
+    email_sent = await email_outbox.enqueue("verification", email.lower(), verification_params(verification_code, user.get("name", "there")))
     
     return {
         "email_sent": email_sent,
@@ -712,13 +943,11 @@ async def forgot_password(email: EmailStr, request: Request):
     # Get origin from request headers for dynamic URL
     origin = request.headers.get("origin", "https://blvx.social")
     
-    # Send reset email
-    from services.email_service import send_password_reset_email
-    email_sent = await send_password_reset_email(
-        email.lower(), 
-        reset_token, 
-        user.get("name", "there"),
-        origin
+    # Queue reset email
+    email_sent = await email_outbox.enqueue(
+        "password_reset",
+        email.lower(),
+        password_reset_params(reset_token, user.get("name", "there"), origin)
     )
     
     logger.info(f"Password reset requested for {email}")
@@ -741,12 +970,17 @@ async def reset_password(token: str, new_password: str):
         raise HTTPException(status_code=400, detail="Reset link has expired")
     
     # Update password
-    password_hash = hash_password(new_password)
-    await db.users.update_one(
+    password_hash = await hash_password(new_password)
+    user = await db.users.find_one_and_update(
         {"email": reset["email"]},
-        {"$set": {"password_hash": password_hash}}
+        {"$set": {"password_hash": password_hash}},
+        projection={"_id": 0, "user_id": 1}
     )
     
+    # Sign out every device that used the old password
+    if user:
+        await db.user_sessions.delete_many({"user_id": user["user_id"]})
+    
     # Delete used token
     await db.password_resets.delete_one({"token": token})
     
@@ -873,13 +1107,6 @@ async def google_callback(code: str, state: str, request: Request, response: Res
         username = email.split("@")[0].lower() if email else ""
         if len(username) < 3 and name:
             username = re.sub(r'\s+', '', name).lower()
-        username = re.sub(r'[^a-z0-9_]', '', username)[:15]
-        
-        base_username = username or "user"
-        counter = 1
-        while await db.users.find_one({"username": username}):
-            username = f"{base_username}{counter}"
-            counter += 1
         
         new_user = {
             "user_id": user_id,
@@ -887,7 +1114,6 @@ async def google_callback(code: str, state: str, request: Request, response: Res
             "email": email.lower(),
             "name": name or email.split("@")[0],
             "picture": picture,
-            "username": username,
             "bio": "",
             "verified": False,
             "email_verified": True,
@@ -902,9 +1128,9 @@ async def google_callback(code: str, state: str, request: Request, response: Res
             "vouched_by": None,
             "marketing_consent": False,
             "marketing_consent_at": None,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
-        await db.users.insert_one(new_user)
+        await insert_user_with_username(new_user, username_base(username))
         logger.info(f"Google OAuth: Created new user {user_id} ({email})")
     
     # Create session
@@ -1087,6 +1313,9 @@ async def apple_callback(request: Request, response: Response):
                 update_fields["plates_remaining"] = 10
             if existing_user.get("is_vouched") is None:
                 update_fields["is_vouched"] = False
+            if not schema_migrations.complete:
+                # user_defaults may not have reached this account yet
+                update_fields.update((user_missing_defaults({**existing_user, **update_fields}) or {}).get("$set", {}))
             
             if update_fields:
                 await db.users.update_one(
@@ -1123,13 +1352,6 @@ async def apple_callback(request: Request, response: Response):
                 random_num = uuid.uuid4().hex[:6]
                 username = f"member_{random_num}"
             
-            username = re.sub(r'[^a-z0-9_]', '', username)[:15]
-            base_username = username
-            counter = 1
-            while await db.users.find_one({"username": username}):
-                username = f"{base_username}{counter}"
-                counter += 1
-            
             # Determine display name
             display_name = name
             if not display_name:
@@ -1146,7 +1368,6 @@ async def apple_callback(request: Request, response: Response):
                 "email": user_email,
                 "name": display_name,
                 "picture": "",
-                "username": username,
                 "bio": "",
                 "verified": False,
                 "email_verified": True,  # Apple verifies emails (even private relay)
@@ -1162,26 +1383,14 @@ async def apple_callback(request: Request, response: Response):
                 "vouched_by": None,
                 "marketing_consent": False,
                 "marketing_consent_at": None,
-                "created_at": datetime.now(timezone.utc).isoformat()
+                "created_at": datetime.now(timezone.utc)
             }
-            await db.users.insert_one(new_user)
+            await insert_user_with_username(new_user, username_base(username))
             logger.info(f"Created new Apple user: {user_id}, email: {user_email}, private_relay: {new_user['is_private_relay_email']}")
         
         # Create session with remember_me=True by default for Apple Sign-In
         session_token = await create_session(user_id, response, remember_me=True)
         
-        user = await db.users.find_one({"user_id": user_id}, {"_id": 0, "password_hash": 0})
-        if isinstance(user.get("created_at"), str):
-            user["created_at"] = datetime.fromisoformat(user["created_at"])
-        
-        # Ensure user object has all required fields for frontend (prevent black screen crashes)
-        user.setdefault("is_vouched", False)
-        user.setdefault("plates_remaining", 10)
-        user.setdefault("has_seen_welcome", False)
-        user.setdefault("username", f"member_{uuid.uuid4().hex[:6]}")
-        user.setdefault("picture", f"https://api.dicebear.com/7.x/initials/svg?seed={user.get('name', 'N')}&backgroundColor=1a1a1a&textColor=ffffff")
-        user.setdefault("name", "New Member")
-        
         logger.info(f"Apple user authenticated: {user_id}")
         
         # Determine frontend URL for redirect
@@ -1231,8 +1440,12 @@ async def get_me(user: UserBase = Depends(get_current_user)):
 
 @auth_router.post("/logout")
 async def logout(request: Request, response: Response):
-    """Logout and clear session"""
+    """Logout and clear this device's session"""
     session_token = request.cookies.get("session_token")
+    if not session_token:
+        auth_header = request.headers.get("Authorization")
+        if auth_header and auth_header.startswith("Bearer "):
+            session_token = auth_header.split(" ")[1]
     if session_token:
         await db.user_sessions.delete_one({"session_token": session_token})
     
@@ -1295,7 +1508,7 @@ async def get_my_plates(user: UserBase = Depends(get_current_user)):
         if plate.get("used_by"):
             redeemer = await db.users.find_one(
                 {"user_id": plate["used_by"]},
-                {"_id": 0, "user_id": 1, "username": 1, "name": 1, "picture": 1}
+                PUBLIC_USER_CARD
             )
             if redeemer:
                 plate_data["redeemer"] = redeemer
@@ -1380,22 +1593,17 @@ async def revoke_plate(code: str, user: UserBase = Depends(get_current_user)):
 # ========================
 
 @users_router.get("/profile/{username}")
+@micro_cache.cached("profile", ttl=30, stale=30, key=("username",))
 async def get_user_profile(username: str):
     """Get user profile by username"""
-    user = await db.users.find_one({"username": username}, {"_id": 0, "password_hash": 0})
+    user = await db.users.find_one(
+        {"username": username, **LIVE_USER},
+        {"_id": 0, "password_hash": 0}
+    )
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    if isinstance(user.get("created_at"), str):
-        user["created_at"] = datetime.fromisoformat(user["created_at"])
-    
-    user.setdefault("email_verified", True)
-    user.setdefault("reputation_score", 100)
-    user.setdefault("plates_remaining", 10)
-    user.setdefault("is_day_one", False)
-    user.setdefault("vouched_by", None)
-    
-    return UserBase(**user)
+    return UserBase(**with_user_fallbacks(user))
 
 @users_router.put("/profile")
 async def update_profile(update: UserUpdate, user: UserBase = Depends(get_current_user)):
@@ -1408,21 +1616,15 @@ async def update_profile(update: UserUpdate, user: UserBase = Depends(get_curren
             raise HTTPException(status_code=400, detail="Username already taken")
     
     if update_data:
-        await db.users.update_one({"user_id": user.user_id}, {"$set": update_data})
+        try:
+            await db.users.update_one({"user_id": user.user_id}, {"$set": update_data})
+        except DuplicateKeyError:
+            raise HTTPException(status_code=400, detail="Username already taken")
     
     updated_user = await db.users.find_one({"user_id": user.user_id}, {"_id": 0, "password_hash": 0})
-    if isinstance(updated_user.get("created_at"), str):
-        updated_user["created_at"] = datetime.fromisoformat(updated_user["created_at"])
+    profile_changed(user.user_id)
     
-    updated_user.setdefault("email_verified", True)
-    updated_user.setdefault("reputation_score", 100)
-    updated_user.setdefault("plates_remaining", 10)
-    updated_user.setdefault("is_day_one", False)
-    updated_user.setdefault("is_vouched", False)
-    updated_user.setdefault("has_seen_welcome", False)
-    updated_user.setdefault("vouched_by", None)
-    
-    return UserBase(**updated_user)
+    return UserBase(**with_user_fallbacks(updated_user))
 
 @users_router.post("/welcome-seen")
 async def mark_welcome_seen(user: UserBase = Depends(get_current_user)):
@@ -1478,6 +1680,7 @@ async def upload_avatar(file: UploadFile = File(...), user: UserBase = Depends(g
             {"user_id": user.user_id},
             {"$set": {"picture": avatar_url}}
         )
+        profile_changed(user.user_id)
         
         logger.info(f"Avatar uploaded for user {user.user_id}: {avatar_url}")
         
@@ -1491,68 +1694,33 @@ async def upload_avatar(file: UploadFile = File(...), user: UserBase = Depends(g
 async def delete_account(user: UserBase = Depends(get_current_user)):
     """
     Permanently delete user account and all associated data.
-    This action cannot be undone.
+    This action cannot be undone. The account is tombstoned and signed out
+    immediately; its data is removed by a background job.
     """
     user_id = user.user_id
     logger.info(f"Account deletion requested for user {user_id}")
     
     try:
-        # Delete user's posts
-        await db.posts.delete_many({"user_id": user_id})
-        
-        # Delete user's likes
-        await db.likes.delete_many({"user_id": user_id})
-        
-        # Delete user's follows (both directions)
-        await db.follows.delete_many({"follower_id": user_id})
-        await db.follows.delete_many({"following_id": user_id})
-        
-        # Delete user's notifications (both sent and received)
-        await db.notifications.delete_many({"user_id": user_id})
-        await db.notifications.delete_many({"from_user_id": user_id})
-        
-        # Delete user's blocks and mutes
-        await db.blocks.delete_many({"blocker_id": user_id})
-        await db.blocks.delete_many({"blocked_id": user_id})
-        await db.mutes.delete_many({"muter_id": user_id})
-        await db.mutes.delete_many({"muted_id": user_id})
-        
-        # Delete user's reports (as reporter)
-        await db.reports.delete_many({"reporter_id": user_id})
-        
-        # Delete user's GC memberships
-        await db.gcs.update_many(
-            {"member_ids": user_id},
-            {"$pull": {"member_ids": user_id}}
-        )
-        
-        # Delete user's GC messages
-        await db.gc_messages.delete_many({"user_id": user_id})
-        
-        # Delete user's sidebar conversations
-        await db.sidebars.delete_many({"$or": [{"user1_id": user_id}, {"user2_id": user_id}]})
-        await db.sidebar_messages.delete_many({"user_id": user_id})
-        
-        # Delete user's vouch plates
-        await db.plates.delete_many({"creator_id": user_id})
-        
-        # Delete user's AI stoop sessions and config
-        await db.ai_stoop_sessions.delete_many({"$or": [{"visitor_id": user_id}, {"owner_id": user_id}]})
-        await db.ai_stoop_configs.delete_many({"user_id": user_id})
-        
-        # Delete user's push subscriptions
-        await db.push_subscriptions.delete_many({"user_id": user_id})
-        
-        # Finally, delete the user account
-        await db.users.delete_one({"user_id": user_id})
-        
-        logger.info(f"Account deleted successfully for user {user_id}")
-        
-        return {"message": "Account deleted successfully. We're sorry to see you go."}
-        
+        job = await account_deletion.request(user_id)
+        social_graph.remove_user(user_id)
+        profile_changed(user_id)
     except Exception as e:
         logger.error(f"Account deletion failed for user {user_id}: {e}")
         raise HTTPException(status_code=500, detail="Failed to delete account. Please contact support.")
+    
+    return {
+        "message": "Account deleted successfully. We're sorry to see you go.",
+        "job_id": job["job_id"],
+        "status": job["status"]
+    }
+
+@users_router.get("/account/deletion/{job_id}")
+async def get_account_deletion_status(job_id: str):
+    """Progress of an account deletion job (the job id is the capability)"""
+    job = await account_deletion.get_status(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Deletion job not found")
+    return job
 
 @users_router.post("/follow/{user_id}")
 async def follow_user(user_id: str, current_user: UserBase = Depends(get_current_user)):
@@ -1578,9 +1746,14 @@ async def follow_user(user_id: str, current_user: UserBase = Depends(get_current
         "following_id": user_id,
         "created_at": datetime.now(timezone.utc).isoformat()
     })
+    social_graph.add_follow(current_user.user_id, user_id)
+    record_activity(current_user.user_id, "follow", target_user_id=user_id)
+    await suggestion_service.on_follow(current_user.user_id, user_id)
+    rising_voices.record(user_id, "followers", actor_id=current_user.user_id)
     
     await db.users.update_one({"user_id": current_user.user_id}, {"$inc": {"following_count": 1}})
     await db.users.update_one({"user_id": user_id}, {"$inc": {"followers_count": 1}})
+    profile_changed(current_user.user_id, user_id)
     
     await create_notification(user_id, "follow", current_user.user_id, None)
     
@@ -1589,16 +1762,21 @@ async def follow_user(user_id: str, current_user: UserBase = Depends(get_current
 @users_router.delete("/follow/{user_id}")
 async def unfollow_user(user_id: str, current_user: UserBase = Depends(get_current_user)):
     """Unfollow a user"""
-    result = await db.follows.delete_one({
+    follow = await db.follows.find_one_and_delete({
         "follower_id": current_user.user_id,
         "following_id": user_id
-    })
+    }, projection={"_id": 0, "created_at": 1})
     
-    if result.deleted_count == 0:
+    if not follow:
         raise HTTPException(status_code=400, detail="Not following this user")
+    social_graph.remove_follow(current_user.user_id, user_id)
+    suggestion_service.mark_dirty(current_user.user_id)
+    retract_activity(current_user.user_id, "follow", target_user_id=user_id)
+    rising_voices.record(user_id, "followers", -1, actor_id=current_user.user_id, when=as_utc(follow.get("created_at")))
     
     await db.users.update_one({"user_id": current_user.user_id}, {"$inc": {"following_count": -1}})
     await db.users.update_one({"user_id": user_id}, {"$inc": {"followers_count": -1}})
+    profile_changed(current_user.user_id, user_id)
     
     return {"message": "Unfollowed successfully"}
 
@@ -1614,15 +1792,7 @@ async def check_following(user_id: str, current_user: UserBase = Depends(get_cur
 @users_router.get("/mutuals/{user_id}")
 async def check_mutuals(user_id: str, current_user: UserBase = Depends(get_current_user)):
     """Check if users are mutual followers"""
-    follows_them = await db.follows.find_one({
-        "follower_id": current_user.user_id,
-        "following_id": user_id
-    })
-    they_follow = await db.follows.find_one({
-        "follower_id": user_id,
-        "following_id": current_user.user_id
-    })
-    return {"is_mutual": follows_them is not None and they_follow is not None}
+    return {"is_mutual": social_graph.is_mutual(current_user.user_id, user_id)}
 
 @users_router.get("/search")
 async def search_users(q: str, limit: int = 20, user: Optional[UserBase] = Depends(get_optional_user)):
@@ -1632,245 +1802,110 @@ async def search_users(q: str, limit: int = 20, user: Optional[UserBase] = Depen
             {"username": {"$regex": q, "$options": "i"}},
             {"name": {"$regex": q, "$options": "i"}},
             {"bio": {"$regex": q, "$options": "i"}}
-        ]},
-        {"_id": 0, "password_hash": 0}
+        ], **LIVE_USER},
+        USER_LIST_CARD
     ).limit(limit).to_list(limit)
     
     result = []
     for u in users:
-        if isinstance(u.get("created_at"), str):
-            u["created_at"] = datetime.fromisoformat(u["created_at"])
-        u.setdefault("email_verified", True)
-        u.setdefault("reputation_score", 100)
-        u.setdefault("plates_remaining", 10)
-        u.setdefault("is_day_one", False)
-        u.setdefault("vouched_by", None)
-        u.setdefault("last_active", None)
+        with_user_fallbacks(u)
         u["activity_status"] = get_activity_status(u.get("last_active"))
         result.append(u)
     
-    return result
+    return FastJSONResponse(result)
 
 
 @users_router.get("/online")
 async def get_online_users(limit: int = 50, user: UserBase = Depends(get_current_user)):
     """
     Get users currently on The Block.
-    Returns users active in the last 30 minutes, sorted by most recent.
+    Returns users with a live socket or active in the last 30 minutes, most
+    recent first, from the in-memory presence registry. Subscribe to
+    /ws/presence for changes instead of polling.
     """
-    thirty_mins_ago = datetime.utcnow() - timedelta(minutes=30)
-    
-    # Get users active in last 30 mins (exclude current user)
-    online_users = await db.users.find(
-        {
-            "last_active": {"$gte": thirty_mins_ago},
-            "user_id": {"$ne": user.user_id}
-        },
-        {"_id": 0, "password_hash": 0, "email": 0}
-    ).sort("last_active", -1).limit(limit).to_list(limit)
-    
-    # Get count of all online users
-    total_online = await db.users.count_documents({
-        "last_active": {"$gte": thirty_mins_ago}
-    })
+    online_ids = presence.online_users(limit, exclude=user.user_id)
+    docs = await db.users.find(
+        {"user_id": {"$in": online_ids}, **LIVE_USER},
+        USER_LIST_CARD
+    ).to_list(len(online_ids))
+    by_id = {u["user_id"]: u for u in docs}
     
     result = []
-    for u in online_users:
-        if isinstance(u.get("created_at"), str):
-            u["created_at"] = datetime.fromisoformat(u["created_at"])
+    for uid in online_ids:
+        u = by_id.get(uid)
+        if not u:
+            continue
+        u["last_active"] = presence.last_seen(uid)
         u["activity_status"] = get_activity_status(u.get("last_active"))
         u["last_seen"] = format_last_seen(u.get("last_active"))
         result.append(u)
     
-    return {
-        "total_online": total_online,
+    return FastJSONResponse({
+        "total_online": presence.online_count(),
         "users": result
-    }
+    })
 
 
 @users_router.get("/discover")
 async def discover_users(limit: int = 20, user: UserBase = Depends(get_current_user)):
     """
-    People You Might Know - Smart suggestions based on:
-    - Mutual follows (you both follow someone)
+    People You Might Know - precomputed, scored suggestions based on:
+    - Mutual follows (people you follow follow them)
     - Same voucher
     - Recent joiners (welcome new members)
     - Active users you don't follow yet
     """
-    # Get users I already follow
-    following = await db.follows.find(
-        {"follower_id": user.user_id},
-        {"_id": 0, "following_id": 1}
-    ).to_list(1000)
-    following_ids = {f["following_id"] for f in following}
-    following_ids.add(user.user_id)  # Exclude self
-    
-    suggestions = []
-    seen_users = set()
-    
-    # 1. Users with mutual connections (you both follow someone)
-    # Get who my follows are following
-    if following_ids:
-        for follow_id in list(following_ids)[:20]:  # Check first 20 follows
-            their_follows = await db.follows.find(
-                {"follower_id": follow_id},
-                {"_id": 0, "following_id": 1}
-            ).limit(50).to_list(50)
-            
-            for tf in their_follows:
-                if tf["following_id"] not in following_ids and tf["following_id"] not in seen_users:
-                    seen_users.add(tf["following_id"])
-                    suggestions.append({
-                        "user_id": tf["following_id"],
-                        "reason": "mutual_connection",
-                        "connection": follow_id
-                    })
-                    if len(suggestions) >= limit * 2:
-                        break
-            if len(suggestions) >= limit * 2:
-                break
-    
-    # 2. Users vouched by the same person
-    if user.vouched_by:
-        same_voucher = await db.users.find(
-            {
-                "vouched_by": user.vouched_by,
-                "user_id": {"$nin": list(following_ids)}
-            },
-            {"_id": 0, "user_id": 1}
-        ).limit(10).to_list(10)
-        
-        for u in same_voucher:
-            if u["user_id"] not in seen_users:
-                seen_users.add(u["user_id"])
-                suggestions.append({
-                    "user_id": u["user_id"],
-                    "reason": "same_voucher",
-                    "connection": user.vouched_by
-                })
-    
-    # 3. New members (joined in last 7 days)
-    seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    new_members = await db.users.find(
-        {
-            "created_at": {"$gte": seven_days_ago},
-            "user_id": {"$nin": list(following_ids)}
-        },
-        {"_id": 0, "user_id": 1}
-    ).limit(10).to_list(10)
-    
-    for u in new_members:
-        if u["user_id"] not in seen_users:
-            seen_users.add(u["user_id"])
-            suggestions.append({
-                "user_id": u["user_id"],
-                "reason": "new_member",
-                "connection": None
-            })
-    
-    # 4. Active users you don't follow (fallback)
-    if len(suggestions) < limit:
-        thirty_mins_ago = datetime.utcnow() - timedelta(minutes=30)
-        active_users = await db.users.find(
-            {
-                "last_active": {"$gte": thirty_mins_ago},
-                "user_id": {"$nin": list(following_ids | seen_users)}
-            },
-            {"_id": 0, "user_id": 1}
-        ).limit(limit).to_list(limit)
-        
-        for u in active_users:
-            suggestions.append({
-                "user_id": u["user_id"],
-                "reason": "active_now",
-                "connection": None
-            })
+    suggestions = await suggestion_service.get(user.user_id)
+    if not suggestions:
+        # No list yet (it's being computed in the background): show Rising Voices meanwhile
+        suggestions = [
+            {"user_id": t["user_id"], "score": t["score"], "reason": "trending", "connection": None}
+            for t in rising_voices.top_users(limit * 2) if t["user_id"] != user.user_id
+        ]
+    # Lists can be a few minutes old; skip anyone followed since
+    suggestions = [s for s in suggestions if not social_graph.follows(user.user_id, s["user_id"])][:limit]
     
     # Fetch full user data for suggestions
-    suggestion_ids = [s["user_id"] for s in suggestions[:limit]]
+    suggestion_ids = [s["user_id"] for s in suggestions]
     users_data = await db.users.find(
-        {"user_id": {"$in": suggestion_ids}},
-        {"_id": 0, "password_hash": 0, "email": 0}
+        {"user_id": {"$in": suggestion_ids}, **LIVE_USER},
+        USER_LIST_CARD
     ).to_list(limit)
-    
-    # Create lookup for suggestion reasons
-    reason_lookup = {s["user_id"]: s for s in suggestions}
+    users_by_id = {u["user_id"]: u for u in users_data}
     
     result = []
-    for u in users_data:
-        if isinstance(u.get("created_at"), str):
-            u["created_at"] = datetime.fromisoformat(u["created_at"])
+    for s in suggestions:
+        u = users_by_id.get(s["user_id"])
+        if not u:
+            continue
         u["activity_status"] = get_activity_status(u.get("last_active"))
-        u["suggestion_reason"] = reason_lookup.get(u["user_id"], {}).get("reason", "suggested")
-        u["mutual_connection"] = reason_lookup.get(u["user_id"], {}).get("connection")
+        u["suggestion_reason"] = s.get("reason", "suggested")
+        u["mutual_connection"] = s.get("connection")
+        u["suggestion_score"] = s.get("score")
         result.append(u)
     
-    return result
+    return FastJSONResponse(result)
 
 
 @users_router.get("/trending")
 async def get_trending_users(limit: int = 20, user: UserBase = Depends(get_current_user)):
     """
-    Trending on The Block - Rising voices this week:
-    - Most new followers
-    - Most engagement (likes + replies on their posts)
-    - Most vouched
+    Trending on The Block - Rising voices this week, scored from
+    incrementally maintained daily buckets:
+    - New followers (x2)
+    - Engagement (likes + replies on their posts)
     """
-    seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    
-    # Get users with most new followers this week
-    follower_pipeline = [
-        {"$match": {"created_at": {"$gte": seven_days_ago.isoformat()}}},
-        {"$group": {"_id": "$following_id", "new_followers": {"$sum": 1}}},
-        {"$sort": {"new_followers": -1}},
-        {"$limit": limit * 2}
-    ]
-    
-    rising_by_followers = await db.follows.aggregate(follower_pipeline).to_list(limit * 2)
-    
-    # Get users with most engagement on their posts this week
-    engagement_pipeline = [
-        {"$match": {"created_at": {"$gte": seven_days_ago.isoformat()}}},
-        {"$group": {
-            "_id": "$user_id",
-            "total_engagement": {"$sum": {"$add": ["$like_count", "$reply_count"]}}
-        }},
-        {"$sort": {"total_engagement": -1}},
-        {"$limit": limit * 2}
-    ]
-    
-    rising_by_engagement = await db.posts.aggregate(engagement_pipeline).to_list(limit * 2)
-    
-    # Combine and score
-    user_scores = {}
-    
-    for item in rising_by_followers:
-        user_id = item["_id"]
-        if user_id and user_id != "bonita":
-            user_scores[user_id] = user_scores.get(user_id, 0) + item["new_followers"] * 2
-    
-    for item in rising_by_engagement:
-        user_id = item["_id"]
-        if user_id and user_id != "bonita":
-            user_scores[user_id] = user_scores.get(user_id, 0) + item["total_engagement"]
-    
-    # Sort by score and get top users
-    sorted_users = sorted(user_scores.items(), key=lambda x: x[1], reverse=True)[:limit]
-    trending_ids = [u[0] for u in sorted_users]
+    top = rising_voices.top_users(limit)
+    score_lookup = {t["user_id"]: t["score"] for t in top}
     
     # Fetch user data
     trending_users = await db.users.find(
-        {"user_id": {"$in": trending_ids}},
-        {"_id": 0, "password_hash": 0, "email": 0}
+        {"user_id": {"$in": list(score_lookup)}, **LIVE_USER},
+        USER_LIST_CARD
     ).to_list(limit)
     
-    # Create score lookup
-    score_lookup = dict(sorted_users)
-    
     result = []
     for u in trending_users:
-        if isinstance(u.get("created_at"), str):
-            u["created_at"] = datetime.fromisoformat(u["created_at"])
         u["activity_status"] = get_activity_status(u.get("last_active"))
         u["trending_score"] = score_lookup.get(u["user_id"], 0)
         result.append(u)
@@ -1878,7 +1913,7 @@ async def get_trending_users(limit: int = 20, user: UserBase = Depends(get_curre
     # Sort by trending score
     result.sort(key=lambda x: x.get("trending_score", 0), reverse=True)
     
-    return result
+    return FastJSONResponse(result)
 
 
 @users_router.get("/{user_id}/connections")
@@ -1898,43 +1933,14 @@ async def get_user_connections(user_id: str, user: UserBase = Depends(get_curren
     if not target:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Get mutual followers (people you both follow)
-    my_following = await db.follows.find(
-        {"follower_id": user.user_id},
-        {"_id": 0, "following_id": 1}
-    ).to_list(1000)
-    my_following_ids = {f["following_id"] for f in my_following}
-    
-    their_following = await db.follows.find(
-        {"follower_id": user_id},
-        {"_id": 0, "following_id": 1}
-    ).to_list(1000)
-    their_following_ids = {f["following_id"] for f in their_following}
-    
-    mutual_following = my_following_ids & their_following_ids
-    
-    # Get mutual followers (people who follow both of you)
-    my_followers = await db.follows.find(
-        {"following_id": user.user_id},
-        {"_id": 0, "follower_id": 1}
-    ).to_list(1000)
-    my_follower_ids = {f["follower_id"] for f in my_followers}
-    
-    their_followers = await db.follows.find(
-        {"following_id": user_id},
-        {"_id": 0, "follower_id": 1}
-    ).to_list(1000)
-    their_follower_ids = {f["follower_id"] for f in their_followers}
-    
-    mutual_followers = my_follower_ids & their_follower_ids
-    
-    # Get sample of mutuals (first 5 for display)
-    sample_mutual_ids = list(mutual_followers)[:5]
+    # People you both follow / people who follow both of you (sample 5 for display)
+    mutual_following_count = social_graph.mutual_following_count(user.user_id, user_id)
+    mutual_followers_count, sample_mutual_ids = social_graph.mutual_followers(user.user_id, user_id, sample=5)
     sample_mutuals = []
     if sample_mutual_ids:
         sample_mutuals = await db.users.find(
             {"user_id": {"$in": sample_mutual_ids}},
-            {"_id": 0, "user_id": 1, "username": 1, "name": 1, "picture": 1}
+            PUBLIC_USER_CARD
         ).to_list(5)
     
     # Get voucher info
@@ -1942,150 +1948,124 @@ async def get_user_connections(user_id: str, user: UserBase = Depends(get_curren
     if target.get("vouched_by"):
         voucher = await db.users.find_one(
             {"user_id": target["vouched_by"]},
-            {"_id": 0, "user_id": 1, "username": 1, "name": 1, "picture": 1}
+            PUBLIC_USER_CARD
         )
     
     # Check if I follow them / they follow me
-    i_follow = await db.follows.find_one({
-        "follower_id": user.user_id,
-        "following_id": user_id
-    })
-    they_follow = await db.follows.find_one({
-        "follower_id": user_id,
-        "following_id": user.user_id
-    })
+    i_follow = social_graph.follows(user.user_id, user_id)
+    last_active = presence.last_seen(user_id) or target.get("last_active")
+    they_follow = social_graph.follows(user_id, user.user_id)
     
     return {
-        "mutual_followers_count": len(mutual_followers),
-        "mutual_following_count": len(mutual_following),
+        "mutual_followers_count": mutual_followers_count,
+        "mutual_following_count": mutual_following_count,
         "sample_mutuals": sample_mutuals,
         "vouched_by": voucher,
         "joined": target.get("created_at"),
         "is_day_one": target.get("is_day_one", False),
-        "i_follow_them": i_follow is not None,
-        "they_follow_me": they_follow is not None,
-        "is_mutual": i_follow is not None and they_follow is not None,
-        "activity_status": get_activity_status(target.get("last_active")),
-        "last_seen": format_last_seen(target.get("last_active"))
+        "i_follow_them": i_follow,
+        "they_follow_me": they_follow,
+        "is_mutual": i_follow and they_follow,
+        "activity_status": get_activity_status(last_active),
+        "last_seen": format_last_seen(last_active)
+    }
+
+
+# Friend activity reads one append-only stream instead of likes/posts/follows
+ACTIVITY_RETENTION_DAYS = 14
+
+def record_activity(actor_id: str, activity_type: str, **fields):
+    """Append to activity_events (fire-and-forget)"""
+    event = {
+        "event_id": f"act_{uuid.uuid4().hex[:12]}",
+        "actor_id": actor_id,
+        "type": activity_type,
+        "created_at": datetime.now(timezone.utc),
+        **fields
     }
+    spawn_background(db.activity_events.insert_one(event), f"{activity_type} activity for {actor_id}")
 
+def retract_activity(actor_id: str, activity_type: str, **fields):
+    """Remove an event when its action is undone (fire-and-forget)"""
+    spawn_background(
+        db.activity_events.delete_many({"actor_id": actor_id, "type": activity_type, **fields}),
+        f"{activity_type} activity retraction for {actor_id}"
+    )
 
 @users_router.get("/activity/friends")
-async def get_friend_activity(limit: int = 30, user: UserBase = Depends(get_current_user)):
+async def get_friend_activity(limit: int = 30, before: Optional[str] = None, user: UserBase = Depends(get_current_user)):
     """
     Friend Activity Feed - What your people are doing:
     - Likes from people you follow
     - New posts from people you follow
     - Who they just followed
+    
+    One query on activity_events: the (actor_id, created_at) index lets Mongo
+    merge the per-friend ranges in time order. Page with `before` set to the
+    last item's created_at.
     """
     # Get people I follow
-    following = await db.follows.find(
-        {"follower_id": user.user_id},
-        {"_id": 0, "following_id": 1}
-    ).to_list(1000)
-    following_ids = [f["following_id"] for f in following]
+    following_ids = social_graph.following(user.user_id)
     
     if not following_ids:
         return []
     
-    activities = []
-    one_day_ago = datetime.utcnow() - timedelta(hours=24)
-    one_day_ago_str = one_day_ago.isoformat()
-    
-    # 1. Recent likes from friends (what they're vibing with)
-    recent_likes = await db.likes.find(
-        {
-            "user_id": {"$in": following_ids},
-            "created_at": {"$gte": one_day_ago_str}
-        }
-    ).sort("created_at", -1).limit(limit).to_list(limit)
-    
-    for like in recent_likes:
-        activities.append({
-            "type": "like",
-            "user_id": like["user_id"],
-            "post_id": like["post_id"],
-            "created_at": like["created_at"]
-        })
+    query = {"actor_id": {"$in": following_ids}}
+    if before:
+        try:
+            query["created_at"] = {"$lt": as_utc(before)}
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
     
-    # 2. Recent posts from friends
-    recent_posts = await db.posts.find(
-        {
-            "user_id": {"$in": following_ids},
-            "created_at": {"$gte": one_day_ago_str},
-            "visibility": "block"
-        },
+    activities = await db.activity_events.find(
+        query,
         {"_id": 0}
     ).sort("created_at", -1).limit(limit).to_list(limit)
     
-    for post in recent_posts:
-        activities.append({
-            "type": "post",
-            "user_id": post["user_id"],
-            "post_id": post["post_id"],
-            "content_preview": post.get("content", "")[:100],
-            "created_at": post["created_at"]
-        })
-    
-    # 3. Recent follows (who your friends just followed)
-    recent_follows = await db.follows.find(
-        {
-            "follower_id": {"$in": following_ids},
-            "created_at": {"$gte": one_day_ago_str}
-        }
-    ).sort("created_at", -1).limit(limit).to_list(limit)
-    
-    for follow in recent_follows:
-        activities.append({
-            "type": "follow",
-            "user_id": follow["follower_id"],
-            "target_user_id": follow["following_id"],
-            "created_at": follow["created_at"]
-        })
-    
-    # Sort all activities by time
-    activities.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-    activities = activities[:limit]
-    
     # Enrich with user data
     user_ids_needed = set()
     post_ids_needed = set()
     
     for a in activities:
-        user_ids_needed.add(a.get("user_id"))
+        a["user_id"] = a.pop("actor_id")
+        user_ids_needed.add(a["user_id"])
         if a.get("target_user_id"):
             user_ids_needed.add(a["target_user_id"])
         if a.get("post_id"):
             post_ids_needed.add(a["post_id"])
     
-    # Fetch users
-    users_data = await db.users.find(
-        {"user_id": {"$in": list(user_ids_needed)}},
-        {"_id": 0, "user_id": 1, "username": 1, "name": 1, "picture": 1}
-    ).to_list(100)
-    users_lookup = {u["user_id"]: u for u in users_data}
-    
-    # Fetch posts
+    # Fetch posts, then every user referenced (actors, targets, authors) in one go
     posts_data = await db.posts.find(
         {"post_id": {"$in": list(post_ids_needed)}},
         {"_id": 0, "post_id": 1, "content": 1, "user_id": 1}
-    ).to_list(100)
+    ).to_list(None)
     posts_lookup = {p["post_id"]: p for p in posts_data}
+    user_ids_needed.update(p["user_id"] for p in posts_data)
+    
+    users_data = await db.users.find(
+        {"user_id": {"$in": list(user_ids_needed)}, **LIVE_USER},
+        PUBLIC_USER_CARD
+    ).to_list(None)
+    users_lookup = {u["user_id"]: u for u in users_data}
     
     # Enrich activities
     result = []
     for a in activities:
         a["user"] = users_lookup.get(a.get("user_id"))
+        if not a["user"]:
+            continue  # Account being deleted
         
         if a.get("target_user_id"):
             a["target_user"] = users_lookup.get(a["target_user_id"])
+            if not a["target_user"]:
+                continue
         
         if a.get("post_id"):
             post = posts_lookup.get(a["post_id"])
-            if post:
-                a["post_preview"] = post.get("content", "")[:100]
-                post_author = users_lookup.get(post.get("user_id"))
-                a["post_author"] = post_author
+            if not post or post.get("user_id") not in users_lookup:
+                continue  # Deleted since
+            a["post_preview"] = post.get("content", "")[:100]
+            a["post_author"] = users_lookup[post["user_id"]]
         
         result.append(a)
     
@@ -2096,53 +2076,95 @@ async def get_friend_activity(limit: int = 30, user: UserBase = Depends(get_curr
 # POST ROUTES
 # ========================
 
-async def get_post_with_user(post: dict) -> dict:
-    """Enrich post with user data"""
-    user = await db.users.find_one({"user_id": post["user_id"]}, {"_id": 0, "password_hash": 0})
-    if user and isinstance(user.get("created_at"), str):
-        user["created_at"] = datetime.fromisoformat(user["created_at"])
-    
-    post["user"] = user
-    
-    if post.get("parent_post_id"):
-        parent = await db.posts.find_one({"post_id": post["parent_post_id"]}, {"_id": 0})
-        if parent:
-            if isinstance(parent.get("created_at"), str):
-                parent["created_at"] = datetime.fromisoformat(parent["created_at"])
-            parent_user = await db.users.find_one({"user_id": parent["user_id"]}, {"_id": 0, "password_hash": 0})
-            if parent_user and isinstance(parent_user.get("created_at"), str):
-                parent_user["created_at"] = datetime.fromisoformat(parent_user["created_at"])
-            parent["user"] = parent_user
-            post["parent_post"] = parent
-    
-    if post.get("quote_post_id"):
-        quote = await db.posts.find_one({"post_id": post["quote_post_id"]}, {"_id": 0})
-        if quote:
-            if isinstance(quote.get("created_at"), str):
-                quote["created_at"] = datetime.fromisoformat(quote["created_at"])
-            quote_user = await db.users.find_one({"user_id": quote["user_id"]}, {"_id": 0, "password_hash": 0})
-            if quote_user and isinstance(quote_user.get("created_at"), str):
-                quote_user["created_at"] = datetime.fromisoformat(quote_user["created_at"])
-            quote["user"] = quote_user
-            post["quote_post"] = quote
-    
-    return post
+async def get_post_with_user(post: dict) -> Optional[dict]:
+    """
+    Enrich one post with its author, parent and quoted post (public shapes
+    only) via hydrate_posts. None when the author is being deleted.
+    """
+    posts = [post]
+    await hydrate_posts(posts, with_parents=True)
+    return posts[0] if posts else None
+
+async def hydrate_posts(posts: List[dict], with_parents: bool = False):
+    """
+    Attach `user`, `quote_post` (and optionally `parent_post`) to many posts
+    with batched lookups: one posts query for referenced posts, one users
+    query for every author involved. Posts whose author is being deleted
+    are removed from `posts`.
+    """
+    ref_ids = {p["quote_post_id"] for p in posts if p.get("quote_post_id")}
+    if with_parents:
+        ref_ids |= {p["parent_post_id"] for p in posts if p.get("parent_post_id")}
+    refs = {}
+    if ref_ids:
+        for r in await db.posts.find({"post_id": {"$in": list(ref_ids)}}, POST_VIEW).to_list(len(ref_ids)):
+            refs[r["post_id"]] = r
+    
+    user_ids = {p["user_id"] for p in posts} | {r["user_id"] for r in refs.values()}
+    users = {}
+    if user_ids:
+        for u in await db.users.find({"user_id": {"$in": list(user_ids)}, **LIVE_USER}, PUBLIC_USER_CARD).to_list(len(user_ids)):
+            users[u["user_id"]] = u
+    
+    # Posts by accounts being deleted are dropped (in place) until the deletion job removes them
+    refs = {post_id: r for post_id, r in refs.items() if r["user_id"] in users}
+    posts[:] = [p for p in posts if p["user_id"] in users]
+    for r in refs.values():
+        r["user"] = users[r["user_id"]]
+    for p in posts:
+        p["user"] = users[p["user_id"]]
+        if p.get("quote_post_id") in refs:
+            p["quote_post"] = refs[p["quote_post_id"]]
+        if with_parents and p.get("parent_post_id") in refs:
+            p["parent_post"] = refs[p["parent_post_id"]]
+
+async def attach_viewer_state(posts: List[dict], viewer_id: Optional[str]):
+    """
+    Set liked_by_me, voted_option and following_author on a page of posts,
+    so cards need no per-post follow-up requests. One likes query per page;
+    follows come from the in-memory graph. Also overlays engagement counts
+    that are still buffered.
+    """
+    if not posts:
+        return
+    engagement_counters.overlay(posts)
+    liked = set()
+    votes = {}
+    if viewer_id:
+        likes = await db.likes.find(
+            {"user_id": viewer_id, "post_id": {"$in": [p["post_id"] for p in posts]}},
+            {"_id": 0, "post_id": 1}
+        ).to_list(len(posts))
+        liked = {like["post_id"] for like in likes}
+        poll_ids = [p["post_id"] for p in posts if p.get("poll")]
+        if poll_ids:
+            ballots = await db.posts.find(
+                {"post_id": {"$in": poll_ids}, "poll_ballots.user_id": viewer_id},
+                {"_id": 0, "post_id": 1, "poll_ballots": {"$elemMatch": {"user_id": viewer_id}}}
+            ).to_list(len(poll_ids))
+            cast = [{"post_id": b["post_id"], **b["poll_ballots"][0]} for b in ballots]
+            if not schema_migrations.has_applied(POLL_BALLOTS_VERSION):
+                # Votes not yet moved onto their posts (schema migrations 2 and 8)
+                cast += await db.poll_votes.find(
+                    {"user_id": viewer_id, "post_id": {"$in": poll_ids}},
+                    {"_id": 0, "post_id": 1, "option_index": 1}
+                ).to_list(len(poll_ids))
+                cast += await db.posts.find(
+                    {"post_id": {"$in": poll_ids}, "poll.voters": viewer_id}, {"_id": 0, "post_id": 1}
+                ).to_list(len(poll_ids))
+            # Votes migrated from the old voters list have no option: -1 = voted, option unknown
+            votes = {v["post_id"]: v["option_index"] if v.get("option_index") is not None else -1 for v in cast}
+    for p in posts:
+        p["liked_by_me"] = p["post_id"] in liked
+        p["voted_option"] = votes.get(p["post_id"])
+        p["following_author"] = bool(viewer_id) and social_graph.follows(viewer_id, p["user_id"])
 
 async def can_view_cookout(viewer_id: str, author_id: str) -> bool:
     """Check if viewer can see author's Cookout posts"""
     if viewer_id == author_id:
         return True
     
-    follows_them = await db.follows.find_one({
-        "follower_id": viewer_id,
-        "following_id": author_id
-    })
-    they_follow = await db.follows.find_one({
-        "follower_id": author_id,
-        "following_id": viewer_id
-    })
-    
-    return follows_them is not None and they_follow is not None
+    return social_graph.is_mutual(viewer_id, author_id)
 
 @posts_router.post("", status_code=201)
 async def create_post(post: PostCreate, user: UserBase = Depends(get_current_user)):
@@ -2152,6 +2174,14 @@ async def create_post(post: PostCreate, user: UserBase = Depends(get_current_use
     
     post_id = f"post_{uuid.uuid4().hex[:12]}"
     
+    parent = None
+    position = {"root_id": post_id, "depth": 0}
+    if post.parent_post_id:
+        parent = await db.posts.find_one({"post_id": post.parent_post_id}, {"_id": 0})
+        if not parent:
+            raise HTTPException(status_code=404, detail="Post not found")
+        position = await thread_position(parent)
+    
     # Validate energy if provided
     valid_energies = {"hot_take", "real_talk", "confession", "question", "w", "l", "event", "the_plug", "psa"}
     if post.energy and post.energy not in valid_energies:
@@ -2163,9 +2193,9 @@ async def create_post(post: PostCreate, user: UserBase = Depends(get_current_use
         cleaned_options = [opt.strip() for opt in post.poll_options if opt.strip()]
         if len(cleaned_options) < 2 or len(cleaned_options) > 4:
             raise HTTPException(status_code=400, detail="Polls need 2-4 options")
+        # Who voted goes in poll_ballots, which POST_VIEW never returns
         poll_data = {
             "options": [{"text": opt, "votes": 0} for opt in cleaned_options],
-            "voters": [],
             "total_votes": 0
         }
 
@@ -2178,6 +2208,8 @@ async def create_post(post: PostCreate, user: UserBase = Depends(get_current_use
         "gif_metadata": post.gif_metadata,
         "post_type": post.post_type,
         "parent_post_id": post.parent_post_id,
+        "root_id": position["root_id"],
+        "depth": position["depth"],
         "quote_post_id": post.quote_post_id,
         "visibility": post.visibility,
         "energy": post.energy,
@@ -2191,23 +2223,22 @@ async def create_post(post: PostCreate, user: UserBase = Depends(get_current_use
 
     await db.posts.insert_one(new_post)
     await db.users.update_one({"user_id": user.user_id}, {"$inc": {"posts_count": 1}})
+    if post.visibility == "block":
+        record_activity(user.user_id, "post", post_id=post_id, content_preview=post.content[:100])
     
-    if post.parent_post_id:
-        await db.posts.update_one({"post_id": post.parent_post_id}, {"$inc": {"reply_count": 1}})
-        parent = await db.posts.find_one({"post_id": post.parent_post_id}, {"_id": 0})
-        if parent and parent["user_id"] != user.user_id:
+    if parent:
+        engagement_counters.add(post.parent_post_id, "reply_count", 1)
+        rising_voices.record(parent["user_id"], "replies", actor_id=user.user_id)
+        if parent["user_id"] != user.user_id:
             await create_notification(parent["user_id"], "reply", user.user_id, post_id)
     
     if post.quote_post_id:
-        await db.posts.update_one({"post_id": post.quote_post_id}, {"$inc": {"repost_count": 1}})
+        engagement_counters.add(post.quote_post_id, "repost_count", 1)
         quote = await db.posts.find_one({"post_id": post.quote_post_id}, {"_id": 0})
         if quote and quote["user_id"] != user.user_id:
             await create_notification(quote["user_id"], "repost", user.user_id, post_id)
     
     new_post.pop("_id", None)
-    if isinstance(new_post.get("created_at"), str):
-        new_post["created_at"] = datetime.fromisoformat(new_post["created_at"])
-    
     enriched = await get_post_with_user(new_post)
     return enriched
 
@@ -2217,7 +2248,8 @@ async def get_bonita_feed_limit() -> int:
     When the community is quiet, Bonita holds it down.
     When humans are active, she steps back.
     """
-    six_hours_ago = datetime.utcnow() - timedelta(hours=6)
+    # Post timestamps are ISO strings, so the bound must be one too
+    six_hours_ago = (datetime.now(timezone.utc) - timedelta(hours=6)).isoformat()
     
     # Count human posts in last 6 hours (exclude Bonita and spark posts)
     human_post_count = await db.posts.count_documents({
@@ -2271,12 +2303,7 @@ async def get_feed(limit: int = 20, before: Optional[str] = None, energy: Option
     hidden_users = await get_hidden_user_ids(user.user_id)
     muted_words = await get_muted_words(user.user_id)
 
-    following = await db.follows.find(
-        {"follower_id": user.user_id},
-        {"_id": 0, "following_id": 1}
-    ).to_list(1000)
-    
-    following_ids = [f["following_id"] for f in following]
+    following_ids = social_graph.following(user.user_id)
     following_ids.append(user.user_id)
     following_ids.append("bonita")  # Always include Bonita/system spark posts
     
@@ -2302,16 +2329,13 @@ async def get_feed(limit: int = 20, before: Optional[str] = None, energy: Option
         query["energy"] = energy
 
     # Fetch extra posts to account for Bonita throttling
-    posts = await db.posts.find(query, {"_id": 0}).sort("created_at", -1).limit(limit + 10).to_list(limit + 10)
+    posts = await db.posts.find(query, POST_VIEW).sort("created_at", -1).limit(limit + 10).to_list(limit + 10)
     
     # Process posts
     human_posts = []
     bonita_posts = []
     
     for post in posts:
-        if isinstance(post.get("created_at"), str):
-            post["created_at"] = datetime.fromisoformat(post["created_at"])
-        
         if post["visibility"] == "cookout" and post["user_id"] != user.user_id:
             if not await can_view_cookout(user.user_id, post["user_id"]):
                 continue
@@ -2320,65 +2344,54 @@ async def get_feed(limit: int = 20, before: Optional[str] = None, energy: Option
         if post_contains_muted_words(post.get("content", ""), muted_words):
             continue
         
-        enriched = await get_post_with_user(post)
-        
         # Separate Bonita posts from human posts (spark posts count as system/Bonita)
         if post.get("user_id") == "bonita" or post.get("is_spark"):
-            bonita_posts.append(enriched)
+            bonita_posts.append(post)
         else:
-            human_posts.append(enriched)
+            human_posts.append(post)
     
     # Get activity-aware Bonita limit and interleave
     bonita_max = await get_bonita_feed_limit()
     result = interleave_bonita_posts(human_posts, bonita_posts, bonita_max)
     
     # Trim to requested limit
-    return result[:limit]
+    page = result[:limit]
+    await hydrate_posts(page, with_parents=True)
+    await attach_viewer_state(page, user.user_id)
+    return FastJSONResponse(page)
 
 @posts_router.get("/explore")
-async def get_explore_feed(limit: int = 20, before: Optional[str] = None, energy: Optional[str] = None, user: UserBase = Depends(get_current_user)):
-    """Get public explore feed - varied topics and users (different from Block)"""
-    # Get a diverse mix of posts
-    query = {"visibility": "block"}
-    if before:
-        query["created_at"] = {"$lt": before}
-    if energy:
-        query["energy"] = energy
-    
-    # Get more posts than needed, then diversify
-    posts = await db.posts.find(query, {"_id": 0}).sort("created_at", -1).limit(limit * 3).to_list(limit * 3)
-    
-    # Diversify: limit posts per user to 2, prioritize variety
-    user_post_count = {}
-    diverse_posts = []
-    
-    for post in posts:
-        post_user_id = post.get("user_id", "")
-        user_post_count[post_user_id] = user_post_count.get(post_user_id, 0) + 1
-        
-        # Allow max 2 posts per user in explore
-        if user_post_count[post_user_id] <= 2:
-            diverse_posts.append(post)
-        
-        if len(diverse_posts) >= limit:
-            break
-    
-    # If not enough diverse posts, fill with remaining
-    if len(diverse_posts) < limit:
-        for post in posts:
-            if post not in diverse_posts:
-                diverse_posts.append(post)
-                if len(diverse_posts) >= limit:
-                    break
-    
-    result = []
-    for post in diverse_posts[:limit]:
-        if isinstance(post.get("created_at"), str):
-            post["created_at"] = datetime.fromisoformat(post["created_at"])
-        enriched = await get_post_with_user(post)
-        result.append(enriched)
+async def get_explore_feed(limit: int = 20, offset: int = 0, energy: Optional[str] = None, user: UserBase = Depends(get_current_user)):
+    """
+    Get public explore feed - varied topics and users (different from Block).
+    Ranked for everyone at once by explore_ranker (time-decayed engagement,
+    at most two posts per author per page); this slices the snapshot after
+    the viewer's own filters. `offset` pages through the ranking (it is
+    ordered by score, so there is no `before` cursor on created_at).
+    """
+    limit = max(1, min(limit, 50))
+    offset = max(0, min(offset, EXPLORE_SNAPSHOT_SIZE))
+    hidden_users = await get_hidden_user_ids(user.user_id)
+    muted_words = await get_muted_words(user.user_id)
     
-    return result
+    entries = [
+        e for e in explore_ranker.ranked()
+        if e["user_id"] not in hidden_users
+        and (not energy or e.get("energy") == energy)
+    ][offset:offset + limit]
+    if not entries:
+        return FastJSONResponse([])
+    
+    # Fresh documents for just this page (current counts, deleted posts drop out)
+    docs = await db.posts.find({"post_id": {"$in": [e["post_id"] for e in entries]}}, POST_VIEW).to_list(len(entries))
+    by_id = {d["post_id"]: d for d in docs}
+    result = [
+        by_id[e["post_id"]] for e in entries
+        if e["post_id"] in by_id and not post_contains_muted_words(by_id[e["post_id"]].get("content", ""), muted_words)
+    ]
+    await hydrate_posts(result, with_parents=True)
+    await attach_viewer_state(result, user.user_id)
+    return FastJSONResponse(result)
 
 @posts_router.get("/cookout")
 async def get_cookout_feed(limit: int = 20, before: Optional[str] = None, energy: Optional[str] = None, user: UserBase = Depends(get_current_user)):
@@ -2391,13 +2404,7 @@ async def get_cookout_feed(limit: int = 20, before: Optional[str] = None, energy
         )
 
     # Get mutuals (users who follow each other)
-    following = await db.follows.find({"follower_id": user.user_id}, {"_id": 0, "following_id": 1}).to_list(1000)
-    following_ids = set([f["following_id"] for f in following])
-
-    followers = await db.follows.find({"following_id": user.user_id}, {"_id": 0, "follower_id": 1}).to_list(1000)
-    follower_ids = set([f["follower_id"] for f in followers])
-
-    mutuals = following_ids.intersection(follower_ids)
+    mutuals = set(social_graph.mutuals(user.user_id))
     mutuals.add(user.user_id)  # Include own cookout posts
 
     query = {
@@ -2410,16 +2417,10 @@ async def get_cookout_feed(limit: int = 20, before: Optional[str] = None, energy
     if energy:
         query["energy"] = energy
     
-    posts = await db.posts.find(query, {"_id": 0}).sort("created_at", -1).limit(limit).to_list(limit)
-    
-    result = []
-    for post in posts:
-        if isinstance(post.get("created_at"), str):
-            post["created_at"] = datetime.fromisoformat(post["created_at"])
-        enriched = await get_post_with_user(post)
-        result.append(enriched)
-    
-    return result
+    result = await db.posts.find(query, POST_VIEW).sort("created_at", -1).limit(limit).to_list(limit)
+    await hydrate_posts(result, with_parents=True)
+    await attach_viewer_state(result, user.user_id)
+    return FastJSONResponse(result)
 
 @posts_router.get("/user/{username}")
 async def get_user_posts(username: str, limit: int = 20, before: Optional[str] = None, request: Request = None):
@@ -2443,27 +2444,18 @@ async def get_user_posts(username: str, limit: int = 20, before: Optional[str] =
     if before:
         query["created_at"] = {"$lt": before}
     
-    posts = await db.posts.find(query, {"_id": 0}).sort("created_at", -1).limit(limit).to_list(limit)
-    
-    result = []
-    for post in posts:
-        if isinstance(post.get("created_at"), str):
-            post["created_at"] = datetime.fromisoformat(post["created_at"])
-        enriched = await get_post_with_user(post)
-        result.append(enriched)
-    
-    return result
+    result = await db.posts.find(query, POST_VIEW).sort("created_at", -1).limit(limit).to_list(limit)
+    await hydrate_posts(result, with_parents=True)
+    await attach_viewer_state(result, current_user.user_id if current_user else None)
+    return FastJSONResponse(result)
 
 @posts_router.get("/{post_id}")
 async def get_post(post_id: str, request: Request = None):
     """Get a single post by ID"""
-    post = await db.posts.find_one({"post_id": post_id}, {"_id": 0})
+    post = await db.posts.find_one({"post_id": post_id}, POST_VIEW)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    if isinstance(post.get("created_at"), str):
-        post["created_at"] = datetime.fromisoformat(post["created_at"])
-    
     current_user = await get_optional_user(request)
     
     if post.get("visibility") == "cookout":
@@ -2474,70 +2466,270 @@ async def get_post(post_id: str, request: Request = None):
                 raise HTTPException(status_code=403, detail="Cookout posts are for mutuals only")
     
     enriched = await get_post_with_user(post)
+    if not enriched:
+        raise HTTPException(status_code=404, detail="Post not found")
+    await attach_viewer_state([enriched], current_user.user_id if current_user else None)
     return enriched
 
+# ========================
+# THREADS
+# ========================
+# Every post stores root_id (the top-level post of its conversation) and depth
+# (0 for top-level posts). A thread is one exact page of direct replies on
+# (parent_post_id, created_at) plus one (root_id, depth, created_at) window
+# query for the nested levels below it, assembled in memory.
+
+THREAD_WINDOW = 500          # Nested replies loaded per conversation window
+THREAD_MAX_DEPTH = 6         # Levels rendered below the requested post
+THREAD_BRANCH_REPLIES = 3    # Nested replies shown per branch before a cursor
+THREAD_POSITIONS_VERSION = 7 # Migration that backfills root_id/depth
+
+async def thread_position(parent: dict) -> dict:
+    """root_id/depth for a reply to `parent`, walking up posts written before root_id existed"""
+    if parent.get("root_id"):
+        return {"root_id": parent["root_id"], "depth": parent.get("depth", 0) + 1}
+    depth, node = 1, parent
+    while node.get("parent_post_id") and not node.get("root_id"):
+        up = await db.posts.find_one(
+            {"post_id": node["parent_post_id"]},
+            {"_id": 0, "post_id": 1, "parent_post_id": 1, "root_id": 1, "depth": 1}
+        )
+        if not up:
+            # Ancestor deleted: its id still groups the conversation
+            return {"root_id": node["parent_post_id"], "depth": depth + 1}
+        node, depth = up, depth + 1
+    if node.get("root_id"):
+        return {"root_id": node["root_id"], "depth": node.get("depth", 0) + depth}
+    return {"root_id": node["post_id"], "depth": depth}
+
+async def backfill_thread_positions():
+    """Give posts written before root_id/depth existed their thread position, in throttled batches (idempotent)"""
+    fields = {"_id": 1, "post_id": 1, "parent_post_id": 1, "root_id": 1, "depth": 1}
+    after, total = None, 0
+    while True:
+        query = {"root_id": {"$exists": False}}
+        if after is not None:
+            query["_id"] = {"$gt": after}
+        batch = await db.posts.find(query, fields).sort("_id", 1).limit(MIGRATION_BATCH).to_list(MIGRATION_BATCH)
+        if not batch:
+            break
+        after = batch[-1]["_id"]
+        parent_of = {p["post_id"]: p.get("parent_post_id") for p in batch}
+        positions = {}
+        # Walk up through ancestors outside the batch until each reaches a positioned post
+        frontier = {pid for pid in parent_of.values() if pid and pid not in parent_of}
+        while frontier:
+            ancestors = await db.posts.find({"post_id": {"$in": list(frontier)}}, fields).to_list(None)
+            frontier = set()
+            for d in ancestors:
+                if d.get("root_id"):
+                    positions[d["post_id"]] = (d["root_id"], d.get("depth", 0))
+                    continue
+                parent_id = parent_of[d["post_id"]] = d.get("parent_post_id")
+                if parent_id and parent_id not in parent_of and parent_id not in positions:
+                    frontier.add(parent_id)
+        
+        def resolve(post_id: str) -> tuple:
+            chain, node = [], post_id
+            while node not in positions:
+                parent_id = parent_of.get(node)
+                if node not in parent_of or not parent_id or node in chain:
+                    # Top-level post, deleted ancestor or a cycle: it roots the conversation
+                    if node in chain:
+                        chain = chain[:chain.index(node)]
+                    positions[node] = (node, 0)
+                    break
+                chain.append(node)
+                node = parent_id
+            root, depth = positions[node]
+            for pid in reversed(chain):
+                depth += 1
+                positions[pid] = (root, depth)
+            return positions[post_id]
+        
+        ops = [
+            UpdateOne({"post_id": post_id}, {"$set": dict(zip(("root_id", "depth"), resolve(post_id)))})
+            for post_id in list(parent_of)
+        ]
+        await db.posts.bulk_write(ops, ordered=False)
+        total += len(ops)
+        await asyncio.sleep(MIGRATION_PAUSE)
+    if total:
+        logger.info(f"Migration: thread positions backfilled for {total} posts")
+
 @posts_router.get("/{post_id}/thread")
-async def get_thread(post_id: str, request: Request = None):
-    """Get a post and all its replies"""
-    post = await db.posts.find_one({"post_id": post_id}, {"_id": 0})
+async def get_thread(post_id: str, limit: int = 20, after: Optional[str] = None, depth: int = THREAD_MAX_DEPTH, request: Request = None):
+    """
+    Get a post and its conversation tree.
+    
+    `replies` is a page of direct replies, oldest first; fetch the next page
+    with `after` set to `next_cursor`. Each reply nests its own `replies` (up
+    to THREAD_BRANCH_REPLIES per branch, `depth` levels down) plus
+    `more_replies` and `replies_cursor`; continue a branch with
+    /posts/{reply_id}/thread?after=<replies_cursor>.
+    """
+    post = await db.posts.find_one({"post_id": post_id}, POST_VIEW)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    if isinstance(post.get("created_at"), str):
-        post["created_at"] = datetime.fromisoformat(post["created_at"])
-    
-    enriched_post = await get_post_with_user(post)
+    limit = max(1, min(limit, 50))
+    depth = max(1, min(depth, THREAD_MAX_DEPTH))
+    if after:
+        try:
+            datetime.fromisoformat(after)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    # Direct replies are one exact page on (parent_post_id, created_at), so
+    # next_cursor is reliable for any post, not just a conversation root
+    query = {"parent_post_id": post_id, "visibility": "block"}
+    if after:
+        query["created_at"] = {"$gt": after}
+    top = await db.posts.find(query, POST_VIEW).sort("created_at", 1).limit(limit + 1).to_list(limit + 1)
+    page = top[:limit]
+    next_cursor = page[-1]["created_at"] if len(top) > limit else None
+    
+    # Nested previews: the levels below the page come from one window query on
+    # (root_id, depth, created_at), capped at THREAD_WINDOW. A branch crowded
+    # out of the window still reports more_replies and is continued with its
+    # own request. Until root_id is backfilled, levels are read one by one.
+    children: Dict[str, List[dict]] = {}
+    
+    def collect(replies: List[dict]) -> List[dict]:
+        kept = []
+        for reply in replies:
+            kids = children.setdefault(reply["parent_post_id"], [])
+            if len(kids) < THREAD_BRANCH_REPLIES:
+                kids.append(reply)
+                kept.append(reply)
+        return kept
+    
+    if depth > 1 and page:
+        base = post.get("depth", 0)
+        if schema_migrations.has_applied(THREAD_POSITIONS_VERSION) and "root_id" in post:
+            collect(await db.posts.find(
+                {"root_id": post["root_id"], "depth": {"$gt": base + 1, "$lte": base + depth}, "visibility": "block"},
+                POST_VIEW
+            ).sort([("depth", 1), ("created_at", 1)]).limit(THREAD_WINDOW).to_list(THREAD_WINDOW))
+        else:
+            level_ids = [reply["post_id"] for reply in page]
+            for _ in range(depth - 1):
+                if not level_ids:
+                    break
+                level = await db.posts.find(
+                    {"parent_post_id": {"$in": level_ids}, "visibility": "block"}, POST_VIEW
+                ).sort("created_at", 1).limit(THREAD_WINDOW).to_list(THREAD_WINDOW)
+                level_ids = [reply["post_id"] for reply in collect(level)]
+    
+    shown = []
+    
+    def attach(node: dict):
+        shown.append(node)
+        node["replies"] = children.get(node["post_id"], [])
+        for kid in node["replies"]:
+            attach(kid)
+    
+    for reply in page:
+        attach(reply)
+    
+    # Only Block replies are shown, so "more" is counted over those (reply_count includes Cookout replies)
+    visible = {
+        row["_id"]: row["n"] for row in await db.posts.aggregate([
+            {"$match": {"parent_post_id": {"$in": [node["post_id"] for node in shown]}, "visibility": "block"}},
+            {"$group": {"_id": "$parent_post_id", "n": {"$sum": 1}}}
+        ]).to_list(None)
+    } if shown else {}
+    
+    # The focus post gets its parent for context; replies are shown under theirs
+    await hydrate_posts([post], with_parents=True)
+    if not post.get("user"):
+        raise HTTPException(status_code=404, detail="Post not found")
+    await hydrate_posts(shown)
+    # Replies by accounts being deleted drop out of the tree with their branches
+    for node in [{"replies": page}] + shown:
+        node["replies"][:] = [kid for kid in node["replies"] if "user" in kid]
     
-    replies = await db.posts.find(
-        {"parent_post_id": post_id, "visibility": "block"},
-        {"_id": 0}
-    ).sort("created_at", 1).to_list(100)
+    current_user = await get_optional_user(request)
+    await attach_viewer_state([post] + shown, current_user.user_id if current_user else None)
     
-    enriched_replies = []
-    for reply in replies:
-        if isinstance(reply.get("created_at"), str):
-            reply["created_at"] = datetime.fromisoformat(reply["created_at"])
-        enriched_replies.append(await get_post_with_user(reply))
+    for node in shown:
+        kids = node["replies"]
+        node["more_replies"] = max(visible.get(node["post_id"], 0) - len(kids), 0)
+        node["replies_cursor"] = kids[-1]["created_at"] if kids and node["more_replies"] else None
     
-    return {"post": enriched_post, "replies": enriched_replies}
+    return FastJSONResponse({"post": post, "replies": page, "next_cursor": next_cursor})
+
+LIKE_POST_FIELDS = {"_id": 0, "user_id": 1, "visibility": 1}
+
+async def apply_like(post_id: str, user_id: str, delta: int, liked_at: Optional[datetime] = None, post: Optional[dict] = None):
+    """
+    Counter, leaderboard, activity and notification for a like (+1) or unlike
+    (-1) that was just written. An unlike passes when the like was made; a
+    like passes the post (LIKE_POST_FIELDS) it already read.
+    """
+    try:
+        post = post or await db.posts.find_one({"post_id": post_id}, LIKE_POST_FIELDS)
+        if not post:
+            if delta > 0:
+                # Post deleted between the like and now
+                await db.likes.delete_one({"user_id": user_id, "post_id": post_id})
+            return
+        engagement_counters.add(post_id, "like_count", delta)
+        rising_voices.record(post["user_id"], "likes", delta, actor_id=user_id, when=liked_at)
+        if delta < 0:
+            retract_activity(user_id, "like", post_id=post_id)
+            return
+        if post.get("visibility") == "block":
+            record_activity(user_id, "like", post_id=post_id)
+        if post["user_id"] != user_id:
+            await create_notification(post["user_id"], "like", user_id, post_id)
+    except Exception as e:
+        logger.error(f"Like side effects failed for {post_id}: {e}")
 
 @posts_router.post("/{post_id}/like")
 async def like_post(post_id: str, user: UserBase = Depends(get_current_user)):
-    """Like a post"""
-    post = await db.posts.find_one({"post_id": post_id})
+    """
+    Like a post. Idempotent: an upsert on the unique (user_id, post_id) key
+    decides, so a retry or double tap finds the existing like and changes
+    nothing. The post lookup runs concurrently with the upsert (one round
+    trip of latency); a like on a missing post is taken back and 404s.
+    Everything after that runs in the background.
+    """
+    async def upsert_like() -> bool:
+        try:
+            result = await db.likes.update_one(
+                {"user_id": user.user_id, "post_id": post_id},
+                {"$setOnInsert": {"like_id": f"like_{uuid.uuid4().hex[:12]}", "created_at": datetime.now(timezone.utc).isoformat()}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            return False  # A concurrent request inserted it
+        return result.upserted_id is not None
+    
+    post, inserted = await asyncio.gather(
+        db.posts.find_one({"post_id": post_id}, LIKE_POST_FIELDS),
+        upsert_like()
+    )
     if not post:
+        if inserted:
+            await db.likes.delete_one({"user_id": user.user_id, "post_id": post_id})
         raise HTTPException(status_code=404, detail="Post not found")
+    if not inserted:
+        return {"message": "Already liked", "liked": True}
     
-    existing_like = await db.likes.find_one({"user_id": user.user_id, "post_id": post_id})
-    
-    if existing_like:
-        raise HTTPException(status_code=400, detail="Already liked")
-    
-    await db.likes.insert_one({
-        "like_id": f"like_{uuid.uuid4().hex[:12]}",
-        "user_id": user.user_id,
-        "post_id": post_id,
-        "created_at": datetime.now(timezone.utc).isoformat()
-    })
-    
-    await db.posts.update_one({"post_id": post_id}, {"$inc": {"like_count": 1}})
-    
-    if post["user_id"] != user.user_id:
-        await create_notification(post["user_id"], "like", user.user_id, post_id)
-    
-    return {"message": "Liked successfully"}
+    spawn_background(apply_like(post_id, user.user_id, 1, post=post), f"like side effects for {post_id}")
+    return {"message": "Liked successfully", "liked": True}
 
 @posts_router.delete("/{post_id}/like")
 async def unlike_post(post_id: str, user: UserBase = Depends(get_current_user)):
-    """Unlike a post"""
-    result = await db.likes.delete_one({"user_id": user.user_id, "post_id": post_id})
-    
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=400, detail="Not liked")
+    """Unlike a post. Idempotent: only the request that removes the like updates the count."""
+    like = await db.likes.find_one_and_delete({"user_id": user.user_id, "post_id": post_id}, projection={"_id": 0, "created_at": 1})
     
-    await db.posts.update_one({"post_id": post_id}, {"$inc": {"like_count": -1}})
+    if not like:
+        return {"message": "Not liked", "liked": False}
     
-    return {"message": "Unliked successfully"}
+    spawn_background(apply_like(post_id, user.user_id, -1, as_utc(like.get("created_at"))), f"unlike side effects for {post_id}")
+    return {"message": "Unliked successfully", "liked": False}
 
 @posts_router.get("/{post_id}/liked")
 async def check_liked(post_id: str, user: UserBase = Depends(get_current_user)):
@@ -2547,34 +2739,48 @@ async def check_liked(post_id: str, user: UserBase = Depends(get_current_user)):
 
 @posts_router.post("/{post_id}/vote")
 async def vote_poll(post_id: str, request: Request, user: UserBase = Depends(get_current_user)):
-    """Vote on a poll"""
+    """
+    Vote on a poll in one conditional update: the filter checks the option
+    exists and the user has no ballot on the post yet, and the update adds
+    the ballot and bumps the tallies together, so a vote is either fully
+    counted or not recorded. Ballots live on the post in poll_ballots,
+    which POST_VIEW never returns. Returns aggregate counts only.
+    """
     body = await request.json()
     option_index = body.get("option_index")
     if option_index is None:
         raise HTTPException(status_code=400, detail="option_index is required")
-
-    post = await db.posts.find_one({"post_id": post_id}, {"_id": 0})
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
-    if not post.get("poll"):
-        raise HTTPException(status_code=400, detail="This post is not a poll")
-    if user.user_id in post["poll"]["voters"]:
-        raise HTTPException(status_code=400, detail="Already voted")
-    if option_index < 0 or option_index >= len(post["poll"]["options"]):
+    if not isinstance(option_index, int) or isinstance(option_index, bool) or option_index < 0:
         raise HTTPException(status_code=400, detail="Invalid option")
 
-    await db.posts.update_one(
-        {"post_id": post_id},
-        {
-            "$inc": {
-                f"poll.options.{option_index}.votes": 1,
-                "poll.total_votes": 1
-            },
-            "$push": {"poll.voters": user.user_id}
-        }
+    query = {
+        "post_id": post_id,
+        f"poll.options.{option_index}": {"$exists": True},
+        "poll_ballots.user_id": {"$ne": user.user_id},
+    }
+    if not schema_migrations.has_applied(POLL_BALLOTS_VERSION):
+        # Votes not yet moved onto their posts (schema migrations 2 and 8)
+        if await db.poll_votes.find_one({"post_id": post_id, "user_id": user.user_id}, {"_id": 1}):
+            raise HTTPException(status_code=400, detail="Already voted")
+        query["poll.voters"] = {"$ne": user.user_id}
+
+    updated = await db.posts.find_one_and_update(
+        query,
+        {"$inc": {f"poll.options.{option_index}.votes": 1, "poll.total_votes": 1},
+         "$push": {"poll_ballots": {"user_id": user.user_id, "option_index": option_index}}},
+        projection=POLL_VIEW,
+        return_document=ReturnDocument.AFTER
     )
+    if not updated:
+        post = await db.posts.find_one({"post_id": post_id}, POLL_VIEW)
+        if not post:
+            raise HTTPException(status_code=404, detail="Post not found")
+        if not post.get("poll"):
+            raise HTTPException(status_code=400, detail="This post is not a poll")
+        if option_index >= len(post["poll"].get("options") or []):
+            raise HTTPException(status_code=400, detail="Invalid option")
+        raise HTTPException(status_code=400, detail="Already voted")
 
-    updated = await db.posts.find_one({"post_id": post_id}, {"_id": 0, "poll": 1})
     return {"poll": updated["poll"], "voted": option_index}
 
 @posts_router.delete("/{post_id}")
@@ -2590,25 +2796,60 @@ async def delete_post(post_id: str, user: UserBase = Depends(get_current_user)):
     await db.posts.delete_one({"post_id": post_id})
     await db.users.update_one({"user_id": user.user_id}, {"$inc": {"posts_count": -1}})
     await db.likes.delete_many({"post_id": post_id})
+    await db.activity_events.delete_many({"post_id": post_id})
     
     return {"message": "Post deleted"}
 
 @posts_router.get("/search/content")
-async def search_posts(q: str, limit: int = 20):
+async def search_posts(q: str, limit: int = 20, request: Request = None):
     """Search posts by content"""
-    posts = await db.posts.find(
+    result = await db.posts.find(
         {"content": {"$regex": q, "$options": "i"}, "visibility": "block"},
-        {"_id": 0}
+        POST_VIEW
     ).sort("created_at", -1).limit(limit).to_list(limit)
     
-    result = []
-    for post in posts:
-        if isinstance(post.get("created_at"), str):
-            post["created_at"] = datetime.fromisoformat(post["created_at"])
-        enriched = await get_post_with_user(post)
-        result.append(enriched)
+    await hydrate_posts(result, with_parents=True)
+    current_user = await get_optional_user(request)
+    await attach_viewer_state(result, current_user.user_id if current_user else None)
+    return FastJSONResponse(result)
+
+# ========================
+# VIEWER STATE
+# ========================
+
+VIEWER_STATE_MAX_IDS = 200
+
+@api_router.post("/viewer-state")
+async def get_viewer_state(body: ViewerStateRequest, user: UserBase = Depends(get_current_user)):
+    """
+    Batch lookup of the viewer's relationship to posts and users, for screens
+    whose payloads do not already embed viewer flags. Replaces one
+    /posts/{id}/liked or /users/following/{id} call per card.
+    """
+    post_ids = list(dict.fromkeys(body.post_ids))[:VIEWER_STATE_MAX_IDS]
+    user_ids = list(dict.fromkeys(body.user_ids))[:VIEWER_STATE_MAX_IDS]
+    
+    posts = {}
+    if post_ids:
+        found = await db.posts.find(
+            {"post_id": {"$in": post_ids}},
+            {"_id": 0, "post_id": 1, "user_id": 1, "poll.total_votes": 1}
+        ).to_list(len(post_ids))
+        await attach_viewer_state(found, user.user_id)
+        posts = {
+            p["post_id"]: {k: p[k] for k in ("liked_by_me", "voted_option", "following_author")}
+            for p in found
+        }
     
-    return result
+    users = {
+        uid: {
+            "is_following": social_graph.follows(user.user_id, uid),
+            "follows_me": social_graph.follows(uid, user.user_id)
+        }
+        for uid in user_ids
+    }
+    
+    return {"posts": posts, "users": users}
 
 # ========================
 # REPORTS
@@ -2734,6 +2975,8 @@ async def block_user(user_id: str, user: UserBase = Depends(get_current_user)):
     # Also unfollow in both directions
     await db.follows.delete_one({"follower_id": user.user_id, "following_id": user_id})
     await db.follows.delete_one({"follower_id": user_id, "following_id": user.user_id})
+    social_graph.remove_follow(user.user_id, user_id)
+    social_graph.remove_follow(user_id, user.user_id)
     
     logger.info(f"User {user.user_id} blocked {user_id}")
     return {"message": "User blocked"}
@@ -2764,7 +3007,7 @@ async def get_blocked_users(user: UserBase = Depends(get_current_user)):
     for block in blocks:
         blocked_user = await db.users.find_one(
             {"user_id": block["blocked_id"]},
-            {"_id": 0, "user_id": 1, "name": 1, "username": 1, "picture": 1}
+            PUBLIC_USER_CARD
         )
         if blocked_user:
             blocked_user["blocked_at"] = block["created_at"]
@@ -2826,7 +3069,7 @@ async def get_muted_users(user: UserBase = Depends(get_current_user)):
     for mute in mutes:
         muted_user = await db.users.find_one(
             {"user_id": mute["muted_id"]},
-            {"_id": 0, "user_id": 1, "name": 1, "username": 1, "picture": 1}
+            PUBLIC_USER_CARD
         )
         if muted_user:
             muted_user["muted_at"] = mute["created_at"]
@@ -2897,7 +3140,7 @@ async def update_marketing_consent(consent: bool, user: UserBase = Depends(get_c
     """Update user's marketing consent"""
     update_data = {
         "marketing_consent": consent,
-        "marketing_consent_at": datetime.now(timezone.utc).isoformat() if consent else None
+        "marketing_consent_at": datetime.now(timezone.utc) if consent else None
     }
     
     await db.users.update_one(
@@ -3012,7 +3255,7 @@ async def action_report(
     elif action == "ban_user":
         await db.users.update_one(
             {"user_id": report["target_user_id"]},
-            {"$set": {"is_banned": True, "banned_at": datetime.now(timezone.utc).isoformat()}}
+            {"$set": {"is_banned": True, "banned_at": datetime.now(timezone.utc)}}
         )
         logger.info(f"User {report['target_user_id']} banned due to report {report_id}")
     
@@ -3022,65 +3265,276 @@ async def action_report(
 # NOTIFICATION HELPERS
 # ========================
 
-async def create_notification(user_id: str, notif_type: str, from_user_id: str, post_id: Optional[str], gc_id: Optional[str] = None):
-    """Create a notification"""
-    notification = {
+# Notification types that collapse into one row per (recipient, type, target, time bucket)
+NOTIFICATION_GROUPED_TYPES = {"like", "repost", "follow", "gc_message"}
+NOTIFICATION_GROUP_WINDOW_HOURS = 6
+NOTIFICATION_RECENT_ACTORS = 5  # Newest actors of a grouped notification returned for display
+
+NOTIFICATION_VERBS = {
+    "like": "liked your post",
+    "reply": "replied to your post",
+    "repost": "reposted your post",
+    "follow": "followed you",
+    "mention": "mentioned you",
+    "gc_message": "sent messages in The GC",
+    "sidebar_message": "sent you a message",
+    "stoop_visit": "stopped by your stoop",
+    "stoop_share_request": "wants to share a stoop conversation",
+}
+
+def notification_group_key(user_id: str, notif_type: str, post_id: Optional[str], gc_id: Optional[str], when: datetime) -> Optional[str]:
+    """Grouping key for aggregated notifications, None if the type isn't grouped"""
+    if notif_type not in NOTIFICATION_GROUPED_TYPES:
+        return None
+    bucket = int(when.timestamp() // (NOTIFICATION_GROUP_WINDOW_HOURS * 3600))
+    return f"{user_id}:{notif_type}:{post_id or gc_id or '-'}:{bucket}"
+
+def build_notification(user_id: str, notif_type: str, from_user_id: str, post_id: Optional[str], gc_id: Optional[str] = None,
+                       when: Optional[datetime] = None) -> dict:
+    """Build a notification document (not yet stored)"""
+    now = (when or datetime.now(timezone.utc)).isoformat()
+    return {
         "notification_id": f"notif_{uuid.uuid4().hex[:12]}",
         "user_id": user_id,
         "type": notif_type,
         "from_user_id": from_user_id,
+        "actor_ids": [from_user_id],
+        "count": 1,
         "post_id": post_id,
         "gc_id": gc_id,
         "read": False,
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": now,
+        "updated_at": now
+    }
+
+def build_grouped_notification_update(group_key: str, user_id: str, notif_type: str, from_user_id: str, post_id: Optional[str], gc_id: Optional[str], now: datetime):
+    """
+    Build the (filter, update) pair that folds one event into its notification group.
+    The update is a pipeline so `count` only grows when the actor is new to the
+    group: like/unlike/like or a burst of GC messages from one sender counts
+    once. actor_ids holds the group's distinct actors, newest first, and
+    created_at tracks the latest activity so the group resurfaces as unread
+    at the top of the list. updated_at is the resume point for clients
+    catching up after a dropped socket.
+    """
+    actors = {"$ifNull": ["$actor_ids", []]}
+    seen = {"$in": [from_user_id, actors]}
+    update = [{"$set": {
+        "notification_id": {"$ifNull": ["$notification_id", f"notif_{uuid.uuid4().hex[:12]}"]},
+        "user_id": user_id,
+        "type": notif_type,
+        "post_id": post_id,
+        "gc_id": gc_id,
+        "first_at": {"$ifNull": ["$first_at", now.isoformat()]},
+        "from_user_id": from_user_id,
+        "read": {"$literal": False},
+        "created_at": now.isoformat(),
+        "updated_at": now.isoformat(),
+        "count": {"$add": [{"$ifNull": ["$count", 0]}, {"$cond": [seen, 0, 1]}]},
+        "actor_ids": {"$concatArrays": [
+            [from_user_id],
+            {"$filter": {"input": actors, "cond": {"$ne": ["$$this", from_user_id]}}}
+        ]}
+    }}]
+    return {"group_key": group_key}, update
+
+async def increment_unread_counters(user_ids: List[str]):
+    """Bump the denormalized unread notification counter for each user"""
+    if not user_ids:
+        return
+    await db.notification_counters.bulk_write(
+        [UpdateOne({"user_id": uid}, {"$inc": {"unread": 1}}, upsert=True) for uid in user_ids],
+        ordered=False
+    )
+
+async def get_unread_counts(user_ids: List[str]) -> Dict[str, int]:
+    """Unread counters for several users in one query (unsynced counters are rebuilt)"""
+    if not user_ids:
+        return {}
+    counters = await db.notification_counters.find(
+        {"user_id": {"$in": user_ids}}, {"_id": 0, "user_id": 1, "unread": 1, "synced": 1}
+    ).to_list(len(user_ids))
+    counts = {c["user_id"]: max(0, c.get("unread", 0)) for c in counters if c.get("synced")}
+    for uid in user_ids:
+        if uid not in counts:
+            counts[uid] = await get_unread_notification_count(uid)
+    return counts
+
+async def publish_notification_events(events: Dict[str, dict]):
+    """
+    Push compact notification events to recipients' /ws/notifications sockets.
+    events maps recipient user_id -> event (without unread_count, added here).
+    Recipients without an open socket are skipped entirely.
+    """
+    connected = [uid for uid in events if ws_manager.is_user_connected(uid)]
+    if not connected:
+        return
+    counts = await get_unread_counts(connected)
+    await asyncio.gather(*(
+        ws_manager.send_to_user(uid, {**events[uid], "unread_count": counts.get(uid, 0)})
+        for uid in connected
+    ))
+
+def build_notification_event(notif_type: str, actor: Optional[dict], post_id: Optional[str], gc_id: Optional[str], created_at: str, count: int = 1) -> dict:
+    """Compact real-time notification event; created_at (the row's updated_at) doubles as the resume token"""
+    return {
+        "type": "notification",
+        "notification_type": notif_type,
+        "actor": actor,
+        "post_id": post_id,
+        "gc_id": gc_id,
+        "count": count,
+        "resume_token": created_at
     }
-    await db.notifications.insert_one(notification)
+
+async def create_notification(user_id: str, notif_type: str, from_user_id: str, post_id: Optional[str], gc_id: Optional[str] = None):
+    """Create a notification, folding likes/reposts/follows/GC messages into groups"""
+    now = datetime.now(timezone.utc)
+    group_key = notification_group_key(user_id, notif_type, post_id, gc_id, now)
+    
+    if not group_key:
+        await db.notifications.insert_one(build_notification(user_id, notif_type, from_user_id, post_id, gc_id, now))
+        await increment_unread_counters([user_id])
+        count = 1
+    else:
+        query, update = build_grouped_notification_update(group_key, user_id, notif_type, from_user_id, post_id, gc_id, now)
+        # actor_ids comes back only if this actor was already in the group
+        projection = {"_id": 0, "read": 1, "count": 1, "actor_ids": {"$elemMatch": {"$eq": from_user_id}}}
+        try:
+            before = await db.notifications.find_one_and_update(
+                query, update, upsert=True, projection=projection, return_document=ReturnDocument.BEFORE
+            )
+        except DuplicateKeyError:
+            # Lost an upsert race on the unique group_key - the group exists now
+            before = await db.notifications.find_one_and_update(
+                query, update, projection=projection, return_document=ReturnDocument.BEFORE
+            )
+        
+        # Only a new group, or a group that was already read, adds an unread row
+        if before is None or before.get("read"):
+            await increment_unread_counters([user_id])
+        before = before or {}
+        count = before.get("count", 0) + (0 if before.get("actor_ids") else 1)
+    
+    # Real-time delivery to the recipient's open sockets
+    if ws_manager.is_user_connected(user_id):
+        actor = await db.users.find_one({"user_id": from_user_id}, PUBLIC_USER_CARD)
+        await publish_notification_events({
+            user_id: build_notification_event(notif_type, actor, post_id, gc_id, now.isoformat(), count)
+        })
+
+def format_notification_summary(notif: dict, actor_name: Optional[str]) -> str:
+    """Render the grouped text, e.g. 'Keisha and 41 others liked your post'"""
+    name = actor_name or "Someone"
+    verb = NOTIFICATION_VERBS.get(notif.get("type"), "interacted with your post")
+    others = (notif.get("count") or 1) - 1
+    if others <= 0:
+        return f"{name} {verb}"
+    return f"{name} and {others} {'other' if others == 1 else 'others'} {verb}"
 
 # ========================
 # NOTIFICATION ROUTES
 # ========================
 
 @notifications_router.get("")
-async def get_notifications(limit: int = 50, user: UserBase = Depends(get_current_user)):
-    """Get user's notifications"""
+async def get_notifications(limit: int = 50, since: Optional[str] = None, user: UserBase = Depends(get_current_user)):
+    """
+    Get user's notifications (actors and posts hydrated with one query each).
+    Pass since=<resume_token> from the notifications socket to fetch only
+    notifications created or updated after that point (groups count as
+    updated whenever they fold in another event).
+    """
+    query = {"user_id": user.user_id}
+    if since:
+        query["updated_at"] = {"$gt": since}
+    
     notifications = await db.notifications.find(
-        {"user_id": user.user_id},
-        {"_id": 0}
+        query,
+        {"_id": 0, "group_key": 0, "actor_ids": {"$slice": NOTIFICATION_RECENT_ACTORS}}
     ).sort("created_at", -1).limit(limit).to_list(limit)
     
+    user_ids = set()
+    post_ids = set()
+    for notif in notifications:
+        user_ids.add(notif["from_user_id"])
+        user_ids.update(notif.get("actor_ids") or [])
+        if notif.get("post_id"):
+            post_ids.add(notif["post_id"])
+    
+    users_lookup = {}
+    if user_ids:
+        users = await db.users.find({"user_id": {"$in": list(user_ids)}, **LIVE_USER}, PUBLIC_USER_CARD).to_list(len(user_ids))
+        users_lookup = {u["user_id"]: u for u in users}
+    
+    posts_lookup = {}
+    if post_ids:
+        posts = await db.posts.find({"post_id": {"$in": list(post_ids)}}, POST_PREVIEW_PROJECTION).to_list(len(post_ids))
+        posts_lookup = {p["post_id"]: p for p in posts}
+    
     result = []
     for notif in notifications:
-        if isinstance(notif.get("created_at"), str):
-            notif["created_at"] = datetime.fromisoformat(notif["created_at"])
-        
-        from_user = await db.users.find_one({"user_id": notif["from_user_id"]}, {"_id": 0, "password_hash": 0})
-        if from_user and isinstance(from_user.get("created_at"), str):
-            from_user["created_at"] = datetime.fromisoformat(from_user["created_at"])
+        from_user = users_lookup.get(notif["from_user_id"])
         notif["from_user"] = from_user
+        notif.setdefault("count", 1)
+        notif["actors"] = [users_lookup[uid] for uid in notif.pop("actor_ids", None) or [] if uid in users_lookup]
+        if not from_user and not notif["actors"]:
+            continue  # Only from accounts being deleted
+        notif["summary"] = format_notification_summary(notif, (from_user or {}).get("name"))
         
         if notif.get("post_id"):
-            post = await db.posts.find_one({"post_id": notif["post_id"]}, {"_id": 0})
-            if post and isinstance(post.get("created_at"), str):
-                post["created_at"] = datetime.fromisoformat(post["created_at"])
-            notif["post"] = post
+            notif["post"] = posts_lookup.get(notif["post_id"])
         
         result.append(notif)
     
-    return result
+    return FastJSONResponse(result)
 
 @notifications_router.post("/read")
 async def mark_notifications_read(user: UserBase = Depends(get_current_user)):
-    """Mark all notifications as read"""
-    await db.notifications.update_many(
-        {"user_id": user.user_id, "read": False},
+    """
+    Mark all notifications as read.
+    Only rows last touched before `now` are marked, and the counter drops by
+    exactly that many, so a notification landing mid-request keeps its badge.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    result = await db.notifications.update_many(
+        {"user_id": user.user_id, "read": False, "updated_at": {"$lte": now}},
         {"$set": {"read": True}}
     )
+    if result.modified_count:
+        await db.notification_counters.update_one(
+            {"user_id": user.user_id},
+            [{"$set": {"unread": {"$max": [0, {"$subtract": [{"$ifNull": ["$unread", 0]}, result.modified_count]}]}}}]
+        )
+    # Sync the badge on the user's other open tabs/devices
+    await ws_manager.send_to_user(user.user_id, {
+        "type": "notifications_state",
+        "unread_count": await get_unread_notification_count(user.user_id),
+        "resume_token": now
+    })
     return {"message": "Notifications marked as read"}
 
+async def get_unread_notification_count(user_id: str) -> int:
+    """
+    Read the denormalized unread counter (one point read).
+    Counters created before the user's first sync are rebuilt once from the
+    notifications collection.
+    """
+    counter = await db.notification_counters.find_one({"user_id": user_id}, {"_id": 0, "unread": 1, "synced": 1})
+    if counter and counter.get("synced"):
+        return max(0, counter.get("unread", 0))
+    
+    count = await db.notifications.count_documents({"user_id": user_id, "read": False})
+    await db.notification_counters.update_one(
+        {"user_id": user_id},
+        {"$set": {"unread": count, "synced": True}},
+        upsert=True
+    )
+    return count
+
 @notifications_router.get("/unread-count")
 async def get_unread_count(user: UserBase = Depends(get_current_user)):
     """Get count of unread notifications"""
-    count = await db.notifications.count_documents({"user_id": user.user_id, "read": False})
+    count = await get_unread_notification_count(user.user_id)
     return {"count": count}
 
 # ========================
@@ -3148,45 +3602,144 @@ async def get_gc(gc_id: str, user: UserBase = Depends(get_current_user)):
     
     members = await db.users.find(
         {"user_id": {"$in": gc["members"]}},
-        {"_id": 0, "user_id": 1, "name": 1, "username": 1, "picture": 1}
+        PUBLIC_USER_CARD
     ).to_list(100)
     
     gc["member_details"] = members
     
     return gc
 
+GC_MESSAGES_MAX = 100               # Page size cap for history loads
+BONITA_GC_CARD = {"user_id": "bonita", "name": "Bonita", "username": "bonita", "picture": BONITA_AVATAR_URL}
+
+@micro_cache.cached("gc_member_cards", ttl=300, stale=300, key=("gc_id",), max_entries=500)
+async def load_gc_member_cards(gc_id: str, member_ids: List[str]) -> Dict[str, dict]:
+    """Public cards of a GC's members, cached per GC (dropped by profile_changed)"""
+    cards = await db.users.find({"user_id": {"$in": member_ids}}, PUBLIC_USER_CARD).to_list(len(member_ids))
+    return {c["user_id"]: c for c in cards}
+
 @gc_router.get("/{gc_id}/messages")
-async def get_gc_messages(gc_id: str, limit: int = 50, user: UserBase = Depends(get_current_user)):
-    """Get messages from a GC"""
-    gc = await db.gcs.find_one({"gc_id": gc_id})
+async def get_gc_messages(
+    gc_id: str,
+    limit: int = 50,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    user: UserBase = Depends(get_current_user)
+):
+    """
+    Get messages from a GC, oldest first. Without cursors this is the latest
+    page; scroll back with `before` set to the first message's created_at,
+    or catch up with `after` set to the last one's. Authors come from the
+    cached member cards and dropped posts are hydrated in one batch.
+    """
+    gc = await db.gcs.find_one({"gc_id": gc_id}, {"_id": 0, "members": 1})
     if not gc or user.user_id not in gc["members"]:
         raise HTTPException(status_code=403, detail="Not a member of this GC")
     
-    messages = await db.gc_messages.find(
-        {"gc_id": gc_id},
-        {"_id": 0}
-    ).sort("created_at", -1).limit(limit).to_list(limit)
+    limit = max(1, min(limit, GC_MESSAGES_MAX))
+    query = {"gc_id": gc_id}
+    for op, cursor in (("$lt", before), ("$gt", after)):
+        if cursor:
+            try:
+                datetime.fromisoformat(cursor)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            query.setdefault("created_at", {})[op] = cursor
+    
+    # `after` reads forward from the cursor; everything else reads back from the newest
+    direction = 1 if after and not before else -1
+    messages = await db.gc_messages.find(query, {"_id": 0}).sort("created_at", direction).limit(limit).to_list(limit)
+    if direction == -1:
+        messages.reverse()
+    
+    cards = await load_gc_member_cards(gc_id=gc_id, member_ids=gc["members"])
+    missing = {m["user_id"] for m in messages if m["user_id"] not in cards and m["user_id"] != "bonita"}
+    if missing:
+        # Former members
+        cards = {**cards, **{
+            c["user_id"]: c for c in await db.users.find(
+                {"user_id": {"$in": list(missing)}}, PUBLIC_USER_CARD
+            ).to_list(len(missing))
+        }}
+    
+    post_ids = {m["post_id"] for m in messages if m.get("post_id")}
+    dropped = {}
+    if post_ids:
+        posts = await db.posts.find({"post_id": {"$in": list(post_ids)}}, POST_VIEW).to_list(len(post_ids))
+        await hydrate_posts(posts, with_parents=True)
+        dropped = {p["post_id"]: p for p in posts}
     
     for msg in messages:
-        if msg["user_id"] == "bonita":
-            msg["user"] = {"name": "Bonita", "username": "bonita", "picture": BONITA_AVATAR_URL}
-        else:
-            msg_user = await db.users.find_one({"user_id": msg["user_id"]}, {"_id": 0, "name": 1, "username": 1, "picture": 1})
-            msg["user"] = msg_user
-        
+        msg["user"] = BONITA_GC_CARD if msg["user_id"] == "bonita" else cards.get(msg["user_id"])
         if msg.get("post_id"):
-            post = await db.posts.find_one({"post_id": msg["post_id"]}, {"_id": 0})
-            if post:
-                post = await get_post_with_user(post)
-            msg["dropped_post"] = post
+            msg["dropped_post"] = dropped.get(msg["post_id"])
     
-    messages.reverse()
-    return messages
+    return FastJSONResponse(messages)
+
+# Web push for GC members who are fully offline (no GC room, no notification socket)
+GC_OFFLINE_PUSH_ENABLED = os.environ.get("GC_OFFLINE_PUSH_ENABLED", "true").lower() == "true"
+
+async def fan_out_gc_message(gc: dict, sender_id: str, sender_info: dict, message: dict):
+    """
+    Deliver a GC message to the other members (background stage).
+    Members with the GC room open already got the message over the room socket,
+    so they are skipped. Everyone else gets one batched notification insert,
+    a concurrent socket ping, and optionally a web push if they're offline.
+    """
+    gc_id = gc["gc_id"]
+    post_id = message.get("post_id")
+    in_room = ws_manager.get_gc_room_user_ids(gc_id)
+    recipients = [
+        member_id for member_id in gc.get("members", [])
+        if member_id != sender_id and member_id not in in_room
+    ]
+    if not recipients:
+        return
+    
+    # Fold the message into every recipient's GC notification group in one round trip.
+    # Groups that are already unread don't add to the unread counter.
+    now = datetime.now(timezone.utc)
+    group_keys = {
+        member_id: notification_group_key(member_id, "gc_message", None, gc_id, now)
+        for member_id in recipients
+    }
+    operations = []
+    for member_id, group_key in group_keys.items():
+        query, update = build_grouped_notification_update(group_key, member_id, "gc_message", sender_id, post_id, gc_id, now)
+        operations.append(UpdateOne(query, update, upsert=True))
+    try:
+        already_unread = await db.notifications.find(
+            {"group_key": {"$in": list(group_keys.values())}, "read": False},
+            {"_id": 0, "user_id": 1}
+        ).to_list(len(recipients))
+        already_unread_ids = {n["user_id"] for n in already_unread}
+        await db.notifications.bulk_write(operations, ordered=False)
+        await increment_unread_counters([uid for uid in recipients if uid not in already_unread_ids])
+    except Exception as e:
+        logger.error(f"GC fan-out notification write failed for {gc_id}: {e}")
+    
+    await publish_notification_events({
+        member_id: {**build_notification_event("gc_message", sender_info, post_id, gc_id, now.isoformat()), "from_user": sender_info}
+        for member_id in recipients
+    })
+    
+    if GC_OFFLINE_PUSH_ENABLED and VAPID_PRIVATE_KEY:
+        offline = [member_id for member_id in recipients if not ws_manager.is_user_connected(member_id)]
+        sender_name = (sender_info or {}).get("name") or "Someone"
+        preview = (message.get("content") or "")[:100]
+        for member_id in offline:
+            await send_push_notification(
+                member_id,
+                gc.get("name") or "The GC",
+                f"{sender_name}: {preview}",
+                {"type": "gc_message", "gc_id": gc_id},
+                urgency="high"
+            )
 
 @gc_router.post("/{gc_id}/message")
-async def send_gc_message(gc_id: str, content: str, post_id: Optional[str] = None, user: UserBase = Depends(get_current_user)):
+async def send_gc_message(gc_id: str, content: str, background_tasks: BackgroundTasks, post_id: Optional[str] = None, user: UserBase = Depends(get_current_user)):
     """Send a message to a GC"""
-    gc = await db.gcs.find_one({"gc_id": gc_id})
+    gc = await db.gcs.find_one({"gc_id": gc_id}, {"_id": 0})
     if not gc or user.user_id not in gc["members"]:
         raise HTTPException(status_code=403, detail="Not a member of this GC")
     
@@ -3202,8 +3755,8 @@ async def send_gc_message(gc_id: str, content: str, post_id: Optional[str] = Non
     await db.gc_messages.insert_one(message)
     message.pop("_id", None)
     
-    # Get user info for WebSocket broadcast
-    user_info = await db.users.find_one({"user_id": user.user_id}, {"_id": 0, "name": 1, "username": 1, "picture": 1})
+    # User info for WebSocket broadcast (already loaded by auth)
+    user_info = {"name": user.name, "username": user.username, "picture": user.picture}
     message["user"] = user_info
     
     # Broadcast via WebSocket for real-time updates
@@ -3212,16 +3765,8 @@ async def send_gc_message(gc_id: str, content: str, post_id: Optional[str] = Non
         "message": message
     })
     
-    for member_id in gc["members"]:
-        if member_id != user.user_id:
-            await create_notification(member_id, "gc_message", user.user_id, post_id, gc_id)
-            # Also send via WebSocket if user is connected
-            await ws_manager.send_to_user(member_id, {
-                "type": "notification",
-                "notification_type": "gc_message",
-                "gc_id": gc_id,
-                "from_user": user_info
-            })
+    # Member notifications run after the response is sent
+    background_tasks.add_task(fan_out_gc_message, gc, user.user_id, user_info, message)
     
     return message
 
@@ -3312,7 +3857,7 @@ async def get_my_sidebars(user: UserBase = Depends(get_current_user)):
     
     for sb in sidebars:
         other_id = sb["user_2"] if sb["user_1"] == user.user_id else sb["user_1"]
-        other_user = await db.users.find_one({"user_id": other_id}, {"_id": 0, "user_id": 1, "name": 1, "username": 1, "picture": 1})
+        other_user = await db.users.find_one({"user_id": other_id}, PUBLIC_USER_CARD)
         sb["other_user"] = other_user
     
     return sidebars
@@ -3326,7 +3871,7 @@ async def get_sidebar(sidebar_id: str, user: UserBase = Depends(get_current_user
     
     # Get other user info
     other_id = sidebar["user_2"] if sidebar["user_1"] == user.user_id else sidebar["user_1"]
-    other_user = await db.users.find_one({"user_id": other_id}, {"_id": 0, "user_id": 1, "name": 1, "username": 1, "picture": 1})
+    other_user = await db.users.find_one({"user_id": other_id}, PUBLIC_USER_CARD)
     
     # Handle case where other user might not exist (like bonita_ai)
     if not other_user:
@@ -3349,7 +3894,7 @@ async def get_sidebar_messages(sidebar_id: str, limit: int = 50, user: UserBase
     ).sort("created_at", -1).limit(limit).to_list(limit)
     
     for msg in messages:
-        msg_user = await db.users.find_one({"user_id": msg["user_id"]}, {"_id": 0, "name": 1, "username": 1, "picture": 1})
+        msg_user = await db.users.find_one({"user_id": msg["user_id"]}, PUBLIC_USER_CARD)
         msg["user"] = msg_user
     
     messages.reverse()
@@ -3586,16 +4131,18 @@ async def create_stoop(stoop: StoopCreate, user: UserBase = Depends(get_current_
     
     await db.stoops.insert_one(stoop_data)
     stoop_data.pop("_id", None)
+    stoop_changed(stoop_id)
     
     return stoop_data
 
 @stoop_router.get("/live")
+@micro_cache.cached("live_stoops", ttl=5, stale=10)
 async def get_live_stoops():
     """Get all live Stoops"""
     stoops = await db.stoops.find({"is_live": True}, {"_id": 0}).to_list(50)
     
     for stoop in stoops:
-        host = await db.users.find_one({"user_id": stoop["host_id"]}, {"_id": 0, "name": 1, "username": 1, "picture": 1})
+        host = await db.users.find_one({"user_id": stoop["host_id"]}, PUBLIC_USER_CARD)
         stoop["host"] = host
         stoop["listener_count"] = len(stoop["listeners"])
         stoop["speaker_count"] = len(stoop["speakers"])
@@ -3603,23 +4150,24 @@ async def get_live_stoops():
     return stoops
 
 @stoop_router.get("/{stoop_id}")
+@micro_cache.cached("stoop", ttl=5, stale=5, key=("stoop_id",))
 async def get_stoop(stoop_id: str):
     """Get a specific Stoop"""
     stoop = await db.stoops.find_one({"stoop_id": stoop_id}, {"_id": 0})
     if not stoop:
         raise HTTPException(status_code=404, detail="Stoop not found")
     
-    host = await db.users.find_one({"user_id": stoop["host_id"]}, {"_id": 0, "name": 1, "username": 1, "picture": 1})
+    host = await db.users.find_one({"user_id": stoop["host_id"]}, PUBLIC_USER_CARD)
     stoop["host"] = host
     
     speakers = await db.users.find(
         {"user_id": {"$in": stoop["speakers"]}},
-        {"_id": 0, "user_id": 1, "name": 1, "username": 1, "picture": 1}
+        PUBLIC_USER_CARD
     ).to_list(50)
     stoop["speaker_details"] = speakers
     
     if stoop.get("pinned_post_id"):
-        pinned = await db.posts.find_one({"post_id": stoop["pinned_post_id"]}, {"_id": 0})
+        pinned = await db.posts.find_one({"post_id": stoop["pinned_post_id"]}, POST_VIEW)
         if pinned:
             pinned = await get_post_with_user(pinned)
         stoop["pinned_post"] = pinned
@@ -3642,6 +4190,8 @@ async def join_stoop(stoop_id: str, user: UserBase = Depends(get_current_user)):
             {"$push": {"listeners": user.user_id}}
         )
     
+    stoop_changed(stoop_id)
+    
     return {"message": "Joined the Stoop", "is_speaker": is_speaker}
 
 # Speaker Request Expressions - the culture
@@ -3700,6 +4250,8 @@ async def request_mic(
         {"$push": {"speaker_queue": request_entry}}
     )
     
+    stoop_changed(stoop_id)
+    
     return {
         "message": f"{expr_data['emoji']} {expr_data['text']}", 
         "position": len(queue) + 1
@@ -3715,6 +4267,8 @@ async def cancel_mic_request(
         {"stoop_id": stoop_id},
         {"$pull": {"speaker_queue": {"user_id": user.user_id}}}
     )
+    stoop_changed(stoop_id)
+    
     return {"message": "Request cancelled"}
 
 @stoop_router.get("/{stoop_id}/queue")
@@ -3760,6 +4314,8 @@ async def approve_speaker(
         }
     )
     
+    stoop_changed(stoop_id)
+    
     return {"message": "Speaker approved", "user_id": user_id}
 
 @stoop_router.post("/{stoop_id}/deny-speaker/{user_id}")
@@ -3779,6 +4335,8 @@ async def deny_speaker(
         {"$pull": {"speaker_queue": {"user_id": user_id}}}
     )
     
+    stoop_changed(stoop_id)
+    
     return {"message": "Speaker request denied", "user_id": user_id}
 
 @stoop_router.post("/{stoop_id}/leave")
@@ -3800,6 +4358,8 @@ async def leave_stoop(stoop_id: str, user: UserBase = Depends(get_current_user))
             {"$pull": {"listeners": user.user_id, "speakers": user.user_id}}
         )
     
+    stoop_changed(stoop_id)
+    
     return {"message": "Left the Stoop"}
 
 @stoop_router.post("/{stoop_id}/pass-aux")
@@ -3826,6 +4386,8 @@ async def pass_aux(stoop_id: str, user_id: str, user: UserBase = Depends(get_cur
         {"$addToSet": {"speakers": user_id}}
     )
     
+    stoop_changed(stoop_id)
+    
     return {"message": "Aux passed", "speakers_count": current_speakers + 1, "max_speakers": max_speakers}
 
 @stoop_router.put("/{stoop_id}/settings")
@@ -3847,6 +4409,8 @@ async def update_stoop_settings(
         {"$set": {"max_speakers": max_speakers}}
     )
     
+    stoop_changed(stoop_id)
+    
     return {"message": "Settings updated", "max_speakers": max_speakers}
 
 @stoop_router.post("/{stoop_id}/end")
@@ -3861,6 +4425,8 @@ async def end_stoop(stoop_id: str, user: UserBase = Depends(get_current_user)):
         {"$set": {"is_live": False}}
     )
     
+    stoop_changed(stoop_id)
+    
     return {"message": "Stoop ended"}
 
 @stoop_router.get("/{stoop_id}/livekit-token")
@@ -4816,7 +5382,7 @@ async def drop_spark(
             "following_count": 0,
             "posts_count": 0,
             "vouched_by": None,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         })
 
     # Check if Bonita posted recently (prevent flooding - max 1 per 2 hours)
@@ -4902,6 +5468,7 @@ async def drop_spark(
     }
 
 @spark_router.get("/categories")
+@micro_cache.cached("spark_categories", ttl=3600)
 async def get_spark_categories():
     """Get available spark topic categories"""
     return {
@@ -4910,6 +5477,7 @@ async def get_spark_categories():
     }
 
 @spark_router.get("/calendar")
+@micro_cache.cached("culture_calendar", ttl=600, stale=600)
 async def get_culture_calendar():
     """Get today's cultural event if any"""
     event = get_culture_calendar_post()
@@ -4957,7 +5525,7 @@ async def post_culture_calendar(user: UserBase = Depends(get_current_user)):
             "bio": "BLVX's cultural compass. I'm here to add context, not chaos.",
             "verified": True,
             "is_day_one": True,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         })
     
     post_id = f"post_{secrets.token_urlsafe(8)}"
@@ -4991,6 +5559,7 @@ async def post_culture_calendar(user: UserBase = Depends(get_current_user)):
     }
 
 @spark_router.get("/trending")
+@micro_cache.cached("trending_news", ttl=900, stale=3600)
 async def get_trending_news():
     """Get trending news headlines for dynamic spark topics"""
     from ddgs import DDGS
@@ -5261,6 +5830,7 @@ async def serve_media(filename: str):
 # ========================
 
 @api_router.get("/trending")
+@micro_cache.cached("trending", ttl=60, stale=240)
 async def get_trending(user: UserBase = Depends(get_current_user)):
     """Get trending hashtags and topics - 'The Word'"""
     
@@ -5509,7 +6079,7 @@ async def create_alert(alert: AlertCreate, user: UserBase = Depends(get_current_
     alert_data.pop("cap_users", None)
     
     # Get user info
-    user_info = await db.users.find_one({"user_id": user.user_id}, {"_id": 0, "name": 1, "username": 1, "picture": 1})
+    user_info = await db.users.find_one({"user_id": user.user_id}, PUBLIC_USER_CARD)
     alert_data["user"] = user_info
     
     return alert_data
@@ -5541,7 +6111,7 @@ async def get_alerts(
     
     # Enrich with user info
     for alert in alerts:
-        user_info = await db.users.find_one({"user_id": alert["user_id"]}, {"_id": 0, "name": 1, "username": 1, "picture": 1})
+        user_info = await db.users.find_one({"user_id": alert["user_id"]}, PUBLIC_USER_CARD)
         alert["user"] = user_info
         if isinstance(alert.get("created_at"), str):
             alert["created_at"] = datetime.fromisoformat(alert["created_at"])
@@ -5670,7 +6240,16 @@ async def health_check():
         "spark": "ready",
         "websocket": "enabled",
         "storage": storage,
-        "cloudinary": is_cloudinary_configured()
+        "cloudinary": is_cloudinary_configured(),
+        "push": {**push_service.stats, "queued": push_service.queue.qsize()},
+        "email": email_outbox.stats,
+        "password_hashing": password_stats(),
+        "social_graph": social_graph.stats,
+        "presence": presence.stats,
+        "engagement_counters": engagement_counters.metrics,
+        "migrations": schema_migrations.stats,
+        "explore": {**explore_ranker.stats, "refreshed_at": explore_ranker.refreshed_at},
+        "micro_cache": micro_cache.stats
     }
 
 # ========================
@@ -5681,10 +6260,10 @@ async def get_user_from_token(token: str) -> Optional[dict]:
     """Validate session token and get user"""
     if not token:
         return None
-    session = await db.sessions.find_one({"token": token})
+    session = await get_session(token)
     if not session:
         return None
-    user = await db.users.find_one({"user_id": session["user_id"]}, {"_id": 0})
+    user = await db.users.find_one({"user_id": session["user_id"]}, {"_id": 0, "password_hash": 0})
     return user
 
 async def get_user_from_websocket(websocket: WebSocket) -> Optional[dict]:
@@ -5698,9 +6277,9 @@ async def get_user_from_websocket(websocket: WebSocket) -> Optional[dict]:
     
     # Then try cookies
     cookies = websocket.cookies
-    session_id = cookies.get("session_id")
-    if session_id:
-        user = await get_user_from_token(session_id)
+    session_token = cookies.get("session_token")
+    if session_token:
+        user = await get_user_from_token(session_token)
         if user:
             return user
     
@@ -5755,6 +6334,9 @@ async def websocket_gc_endpoint(websocket: WebSocket, gc_id: str):
                     "type": "new_message",
                     "message": message
                 })
+                
+                # Notify members who don't have the room open
+                spawn_background(fan_out_gc_message(gc, user["user_id"], message["user"], dict(message)), f"GC fan-out for {gc['gc_id']}")
             
             elif data.get("type") == "typing":
                 # Broadcast typing indicator
@@ -5887,15 +6469,96 @@ async def websocket_notifications_endpoint(websocket: WebSocket):
     await ws_manager.connect_user(websocket, user["user_id"])
     
     try:
+        # Initial state so the client never has to poll the badge count.
+        # resume_token is a starting point for a client that has none yet; a
+        # reconnecting client keeps the token of the last event it saw and
+        # fetches what it missed via GET /notifications?since=<resume_token>
+        await websocket.send_json({
+            "type": "notifications_state",
+            "unread_count": await get_unread_notification_count(user["user_id"]),
+            "resume_token": datetime.now(timezone.utc).isoformat()
+        })
+        
         while True:
-            # Keep connection alive
-            await websocket.receive_text()
+            message = await websocket.receive_text()
+            if message == "ping":
+                # The client heartbeat doubles as the presence heartbeat
+                presence.touch(user["user_id"])
+                await websocket.send_text("pong")
     
     except WebSocketDisconnect:
-        await ws_manager.disconnect_user(user["user_id"])
+        await ws_manager.disconnect_user(websocket, user["user_id"])
     except Exception as e:
         logger.error(f"WebSocket notification error: {e}")
-        await ws_manager.disconnect_user(user["user_id"])
+        await ws_manager.disconnect_user(websocket, user["user_id"])
+
+PRESENCE_BATCH_SECONDS = 2           # Transitions are coalesced this long before one broadcast
+PRESENCE_BROADCAST_QUEUE = 10000     # The broadcaster drains in batches, so it buffers more than a socket would
+
+async def broadcast_presence_changes():
+    """
+    The single presence subscriber for /ws/presence. Transitions are
+    coalesced for PRESENCE_BATCH_SECONDS (the last status per user wins),
+    the cards of users who came online are loaded once, and one event goes
+    to every socket: {"type": "presence", added: [card], removed: [user_id],
+    total_online}. Clients apply it to their list instead of refetching.
+    """
+    queue = presence.subscribe(PRESENCE_BROADCAST_QUEUE)
+    try:
+        while True:
+            events = [await queue.get()]
+            await asyncio.sleep(PRESENCE_BATCH_SECONDS)
+            while not queue.empty():
+                events.append(queue.get_nowait())
+            if not ws_manager.presence_connections:
+                continue
+            try:
+                status = {event["user_id"]: event["status"] for event in events}
+                added_ids = [uid for uid, s in status.items() if s == "online"]
+                added = []
+                if added_ids:
+                    added = await db.users.find(
+                        {"user_id": {"$in": added_ids}, **LIVE_USER}, PUBLIC_USER_CARD
+                    ).to_list(len(added_ids))
+                for card in added:
+                    card["last_active"] = presence.last_seen(card["user_id"])
+                    card["activity_status"] = get_activity_status(card["last_active"])
+                    card["last_seen"] = format_last_seen(card["last_active"])
+                added.sort(key=lambda card: card["last_active"] or datetime.min.replace(tzinfo=timezone.utc), reverse=True)
+                await ws_manager.broadcast_presence({
+                    "type": "presence",
+                    "added": added,
+                    "removed": [uid for uid, s in status.items() if s == "offline"],
+                    "total_online": presence.online_count(),
+                })
+            except Exception as e:
+                logger.error(f"Presence broadcast failed: {e}")
+    finally:
+        presence.unsubscribe(queue)
+
+presence_broadcast_task: Optional[asyncio.Task] = None
+
+@app.websocket("/ws/presence")
+async def websocket_presence_endpoint(websocket: WebSocket):
+    """Stream who came online or went offline (see broadcast_presence_changes)"""
+    user = await get_user_from_websocket(websocket)
+    
+    if not user:
+        await websocket.close(code=4001, reason="Unauthorized")
+        return
+    
+    await ws_manager.connect_presence(websocket)
+    try:
+        await websocket.send_json({"type": "presence_state", "total_online": presence.online_count()})
+        while True:
+            if await websocket.receive_text() == "ping":
+                await websocket.send_text("pong")
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"WebSocket presence error: {e}")
+    finally:
+        ws_manager.disconnect_presence(websocket)
 
 @app.websocket("/ws/sidebar/{sidebar_id}")
 async def websocket_sidebar_endpoint(websocket: WebSocket, sidebar_id: str):
@@ -5935,7 +6598,7 @@ async def websocket_sidebar_endpoint(websocket: WebSocket, sidebar_id: str):
                     # Get user info
                     user_info = await db.users.find_one(
                         {"user_id": user["user_id"]}, 
-                        {"_id": 0, "name": 1, "username": 1, "picture": 1}
+                        PUBLIC_USER_CARD
                     )
                     message["user"] = user_info
                     
@@ -5948,7 +6611,7 @@ async def websocket_sidebar_endpoint(websocket: WebSocket, sidebar_id: str):
                     # Check if messaging Bonita - trigger AI response (handle both bonita and bonita_ai)
                     other_id = sidebar["user_2"] if sidebar["user_1"] == user["user_id"] else sidebar["user_1"]
                     if other_id in ["bonita_ai", "bonita"]:
-                        asyncio.create_task(generate_bonita_sidebar_response(sidebar_id, content, user["user_id"]))
+                        spawn_background(generate_bonita_sidebar_response(sidebar_id, content, user["user_id"]), "Bonita sidebar reply")
             
             elif data.get("type") == "typing":
                 await ws_manager.broadcast_to_sidebar(sidebar_id, {
@@ -6020,32 +6683,12 @@ async def unsubscribe_push(
     
     return {"message": "Unsubscribed from push notifications"}
 
-async def send_push_notification(user_id: str, title: str, body: str, data: dict = None):
-    """Send push notification to all devices of a user"""
-    from pywebpush import webpush, WebPushException
-    
-    subscriptions = await db.push_subscriptions.find({"user_id": user_id}).to_list(100)
-    
-    for sub in subscriptions:
-        try:
-            webpush(
-                subscription_info={
-                    "endpoint": sub["endpoint"],
-                    "keys": sub["keys"]
-                },
-                data=json.dumps({
-                    "title": title,
-                    "body": body,
-                    "data": data or {}
-                }),
-                vapid_private_key=VAPID_PRIVATE_KEY,
-                vapid_claims=VAPID_CLAIMS
-            )
-        except WebPushException as e:
-            logger.error(f"Push notification failed: {e}")
-            # Remove invalid subscription
-            if e.response and e.response.status_code in [404, 410]:
-                await db.push_subscriptions.delete_one({"endpoint": sub["endpoint"]})
+# Push delivery runs in a background worker pool; handlers only enqueue
+push_service = PushDeliveryService(db, VAPID_PRIVATE_KEY, VAPID_CLAIMS)
+
+async def send_push_notification(user_id: str, title: str, body: str, data: dict = None, urgency: str = "normal"):
+    """Queue a push notification to all devices of a user (returns immediately)"""
+    push_service.enqueue(user_id, title, body, data, urgency=urgency)
 
 @push_router.post("/test")
 async def test_push_notification(user: UserBase = Depends(get_current_user)):
@@ -6660,11 +7303,11 @@ async def get_admin_stats(admin: UserBase = Depends(get_admin_user)):
     total_alerts = await db.alerts.count_documents({})
     
     # Get recent signups (last 7 days)
-    week_ago = (datetime.now(timezone.utc) - timedelta(days=7)).isoformat()
+    week_ago = datetime.now(timezone.utc) - timedelta(days=7)
     recent_signups = await db.users.count_documents({"created_at": {"$gte": week_ago}})
     
     # Get active users (users who posted in last 7 days)
-    active_users = await db.posts.distinct("author_id", {"created_at": {"$gte": week_ago}})
+    active_users = await db.posts.distinct("author_id", {"created_at": {"$gte": week_ago.isoformat()}})
     
     return {
         "total_users": total_users,
@@ -6716,7 +7359,7 @@ async def ban_user(user_id: str, reason: str = "Violation of community guideline
     
     result = await db.users.update_one(
         {"user_id": user_id},
-        {"$set": {"is_banned": True, "ban_reason": reason, "banned_at": datetime.now(timezone.utc).isoformat()}}
+        {"$set": {"is_banned": True, "ban_reason": reason, "banned_at": datetime.now(timezone.utc)}}
     )
     
     if result.modified_count == 0:
@@ -6753,14 +7396,14 @@ async def get_admin_posts(
     
     posts = await db.posts.find(
         query,
-        {"_id": 0}
+        {"_id": 0, "poll_ballots": 0, "poll.voters": 0}
     ).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
     
     # Get user info for each post
     for post in posts:
         author = await db.users.find_one(
             {"user_id": post["author_id"]},
-            {"_id": 0, "name": 1, "username": 1, "picture": 1}
+            PUBLIC_USER_CARD
         )
         post["author"] = author
     
@@ -6823,7 +7466,7 @@ async def fix_founder_account(secret: str):
         result = await db.users.update_one(
             {"user_id": user_id},
             {"$set": {
-                "created_at": datetime.now(timezone.utc).isoformat(),
+                "created_at": datetime.now(timezone.utc),
                 "plates_remaining": 999999,
                 "is_day_one": True,
                 "is_admin": True
@@ -6837,7 +7480,7 @@ async def fix_founder_account(secret: str):
         result = await db.users.update_one(
             {"email": email.lower()},
             {"$set": {
-                "created_at": datetime.now(timezone.utc).isoformat(),
+                "created_at": datetime.now(timezone.utc),
                 "plates_remaining": 999999,
                 "is_day_one": True,
                 "is_admin": True
@@ -6872,7 +7515,7 @@ async def fix_user_data(
         update_fields["is_day_one"] = is_day_one
     
     if reset_created_at:
-        update_fields["created_at"] = datetime.now(timezone.utc).isoformat()
+        update_fields["created_at"] = datetime.now(timezone.utc)
     
     if update_fields:
         await db.users.update_one(
@@ -6959,7 +7602,7 @@ async def seed_starter_posts(force: bool = False):
             "following_count": 0,
             "posts_count": 0,
             "vouched_by": None,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         })
         logger.info("Created Bonita user account")
     else:
@@ -7111,6 +7754,23 @@ async def root_health_check():
 # CORS MIDDLEWARE
 # ========================
 
+@app.middleware("http")
+async def refresh_session_cookie(request: Request, call_next):
+    """
+    Re-issue the session cookie when get_current_user slid the session's
+    expiry, so cookie-only clients aren't logged out at the original max_age.
+    Done here because endpoints returning a Response directly drop headers
+    set by dependencies. Responses that set the cookie themselves win.
+    """
+    response = await call_next(request)
+    renewed = getattr(request.state, "renewed_session", None)
+    if renewed and not any(c.startswith("session_token=") for c in response.headers.getlist("set-cookie")):
+        session_token, expires_at = renewed
+        max_age = int((expires_at - datetime.now(timezone.utc)).total_seconds())
+        if max_age > 0:
+            set_session_cookie(response, session_token, max_age)
+    return response
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -7119,9 +7779,344 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# (collection, keys, options) - each index is created independently so one
+# failure (e.g. legacy duplicates blocking a unique index) doesn't skip the rest
+INDEX_SPECS = [
+    ("notifications", "group_key", {"unique": True, "partialFilterExpression": {"group_key": {"$exists": True}}}),
+    ("notifications", [("user_id", 1), ("created_at", -1)], {}),
+    ("notifications", [("user_id", 1), ("updated_at", 1)], {}),
+    ("notification_counters", "user_id", {"unique": True}),
+    ("push_subscriptions", "user_id", {}),
+    ("push_subscriptions", "endpoint", {}),
+    ("email_outbox", "email_id", {"unique": True}),
+    ("email_outbox", [("status", 1), ("next_attempt_at", 1)], {}),
+    ("email_outbox", "claim_id", {"sparse": True}),
+    ("email_outbox", "batch_key", {"sparse": True}),
+    ("users", "username", {"unique": True, "partialFilterExpression": MEMBER_USERNAMES}),
+    ("user_sessions", "session_token", {"unique": True}),
+    ("user_sessions", [("user_id", 1), ("last_seen_at", -1)], {}),
+    ("user_sessions", "expires_at", {"expireAfterSeconds": 0}),
+    ("follows", [("follower_id", 1), ("following_id", 1)], {}),
+    ("follows", "following_id", {}),
+    ("likes", [("user_id", 1), ("post_id", 1)], {"unique": True}),
+    ("likes", "post_id", {}),
+    ("poll_votes", [("post_id", 1), ("user_id", 1)], {"unique": True}),
+    ("poll_votes", "user_id", {}),
+    ("posts", "poll_ballots.user_id", {"sparse": True}),
+    ("posts", [("user_id", 1), ("created_at", -1)], {}),
+    ("posts", [("visibility", 1), ("created_at", -1)], {}),
+    ("gc_messages", [("gc_id", 1), ("created_at", -1)], {}),
+    ("posts", [("parent_post_id", 1), ("created_at", 1)], {}),
+    ("posts", [("root_id", 1), ("depth", 1), ("created_at", 1)], {}),
+    ("posts", "quote_post_id", {"sparse": True}),
+    ("notifications", "from_user_id", {}),
+    ("suggestions", "user_id", {"unique": True}),
+    ("activity_events", [("actor_id", 1), ("created_at", -1)], {}),
+    ("activity_events", "post_id", {"sparse": True}),
+    ("activity_events", "created_at", {"expireAfterSeconds": ACTIVITY_RETENTION_DAYS * 24 * 60 * 60}),
+    ("trending_buckets", [("user_id", 1), ("day", 1)], {"unique": True}),
+    ("trending_buckets", "day", {}),
+    ("trending_buckets", "expires_at", {"expireAfterSeconds": 0}),
+    ("account_deletion_jobs", "user_id", {"unique": True}),
+    ("account_deletion_jobs", "job_id", {"unique": True}),
+    ("account_deletion_jobs", [("status", 1), ("next_attempt_at", 1)], {}),
+]
+
+async def migrate_poll_voters():
+    """Move old poll.voters arrays into poll_votes (option unknown) and drop them from posts"""
+    moved = 0
+    async for post in db.posts.find({"poll.voters": {"$exists": True}}, {"_id": 0, "post_id": 1, "poll.voters": 1}):
+        voters = post["poll"].get("voters") or []
+        if voters:
+            await db.poll_votes.bulk_write([
+                UpdateOne(
+                    {"post_id": post["post_id"], "user_id": uid},
+                    {"$setOnInsert": {"option_index": None}},
+                    upsert=True
+                )
+                for uid in set(voters)
+            ], ordered=False)
+        await db.posts.update_one({"post_id": post["post_id"]}, {"$unset": {"poll.voters": ""}})
+        moved += 1
+    if moved:
+        logger.info(f"Migration: moved voters of {moved} polls into poll_votes")
+
+async def move_poll_votes_to_posts():
+    """Move poll_votes rows onto their posts as poll_ballots, a batch of polls at a time (idempotent)"""
+    moved = 0
+    while True:
+        rows = await db.poll_votes.find({}, {"_id": 1, "post_id": 1, "user_id": 1, "option_index": 1}).limit(MIGRATION_BATCH).to_list(MIGRATION_BATCH)
+        if not rows:
+            break
+        by_post: Dict[str, List[dict]] = {}
+        for row in rows:
+            by_post.setdefault(row["post_id"], []).append(row)
+        # A ballot is only pushed if the user has none on that post yet
+        await db.posts.bulk_write([
+            UpdateOne(
+                {"post_id": post_id, "poll_ballots.user_id": {"$ne": row["user_id"]}},
+                {"$push": {"poll_ballots": {"user_id": row["user_id"], "option_index": row.get("option_index")}}}
+            )
+            for post_id, post_rows in by_post.items() for row in post_rows
+        ], ordered=False)
+        await db.poll_votes.delete_many({"_id": {"$in": [row["_id"] for row in rows]}})
+        moved += len(rows)
+        await asyncio.sleep(MIGRATION_PAUSE)
+    if moved:
+        logger.info(f"Migration: moved {moved} poll votes onto their posts")
+
+async def backfill_activity_events():
+    """
+    Seed activity_events from the last ACTIVITY_RETENTION_DAYS of posts, likes
+    and follows (older events would expire at once). Upserts on the event's
+    identity, so live events and a re-run after a crash don't duplicate.
+    """
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=ACTIVITY_RETENTION_DAYS)).isoformat()
+    sources = [
+        ("posts", {"visibility": "block"}, {"post_id": 1, "user_id": 1, "content": 1},
+         lambda d: (d["user_id"], "post", {"post_id": d["post_id"]}, {"content_preview": (d.get("content") or "")[:100]})),
+        ("likes", {}, {"post_id": 1, "user_id": 1},
+         lambda d: (d["user_id"], "like", {"post_id": d["post_id"]}, {})),
+        ("follows", {}, {"follower_id": 1, "following_id": 1},
+         lambda d: (d["follower_id"], "follow", {"target_user_id": d["following_id"]}, {})),
+    ]
+    seeded = 0
+    for collection, extra, fields, to_event in sources:
+        after = None
+        while True:
+            query = {**extra, "created_at": {"$type": "string", "$gte": cutoff}}
+            if after is not None:
+                query["_id"] = {"$gt": after}
+            batch = await db[collection].find(query, {"_id": 1, "created_at": 1, **fields}).sort("_id", 1).limit(MIGRATION_BATCH).to_list(MIGRATION_BATCH)
+            if not batch:
+                break
+            after = batch[-1]["_id"]
+            if collection == "likes":
+                # Only likes of Block posts show up in Friend Activity
+                visible = {p["post_id"] for p in await db.posts.find(
+                    {"post_id": {"$in": list({d["post_id"] for d in batch})}, "visibility": "block"},
+                    {"_id": 0, "post_id": 1}
+                ).to_list(None)}
+                batch = [d for d in batch if d.get("post_id") in visible]
+            ops = []
+            for d in batch:
+                try:
+                    actor_id, activity_type, identity, rest = to_event(d)
+                    created_at = as_utc(d["created_at"])
+                except (KeyError, ValueError):
+                    continue
+                ops.append(UpdateOne(
+                    {"actor_id": actor_id, "type": activity_type, **identity},
+                    {"$setOnInsert": {"event_id": f"act_{uuid.uuid4().hex[:12]}", "created_at": created_at, **rest}},
+                    upsert=True
+                ))
+            if ops:
+                await db.activity_events.bulk_write(ops, ordered=False)
+                seeded += len(ops)
+            await asyncio.sleep(MIGRATION_PAUSE)
+    if seeded:
+        logger.info(f"Migration: seeded {seeded} friend activity events")
+
+# ========================
+# SCHEMA MIGRATIONS
+# ========================
+
+# What read paths used to setdefault() on every user document
+USER_DEFAULTS = {
+    "email_verified": True,   # Accounts from before verification existed
+    "reputation_score": 100,
+    "plates_remaining": 10,
+    "is_day_one": False,
+    "is_vouched": False,
+    "has_seen_welcome": False,
+    "vouched_by": None,
+    "bio": "",
+    "followers_count": 0,
+    "following_count": 0,
+    "posts_count": 0,
+    "verified": False,
+}
+USER_DATE_FIELDS = ("created_at", "marketing_consent_at", "banned_at")
+
+def user_dates_to_native(user: dict) -> Optional[dict]:
+    """Legacy ISO-string user timestamps become BSON dates"""
+    fields = {}
+    for field in USER_DATE_FIELDS:
+        if isinstance(user.get(field), str):
+            try:
+                fields[field] = as_utc(user[field])
+            except ValueError:
+                logger.warning(f"Migration: unparseable {field} on user {user.get('user_id')}")
+    return {"$set": fields} if fields else None
+
+def default_avatar_url(name: str) -> str:
+    """Initials avatar for users without a picture"""
+    return f"https://api.dicebear.com/7.x/initials/svg?seed={name}&backgroundColor=1a1a1a&textColor=ffffff"
+
+def user_missing_defaults(user: dict) -> Optional[dict]:
+    """Fields an old user document lacks, plus a display name and avatar if blank"""
+    fields = {k: v for k, v in USER_DEFAULTS.items() if k not in user}
+    name = user.get("name") or "New Member"
+    if not user.get("name"):
+        fields["name"] = name
+    if not user.get("picture"):
+        fields["picture"] = default_avatar_url(name)
+    return {"$set": fields} if fields else None
+
+def with_user_fallbacks(user: dict) -> dict:
+    """Fill in what user_defaults/usernames backfill, for documents read before those migrations finish"""
+    if schema_migrations.complete:
+        # A picture can still be blank on accounts written after the backfill ran
+        if not user.get("picture"):
+            user["picture"] = default_avatar_url(user.get("name") or "New Member")
+        return user
+    user.update((user_missing_defaults(user) or {}).get("$set", {}))
+    if not user.get("username"):
+        email = user.get("email") or ""
+        user["username"] = email.split("@")[0] if email else f"user_{user.get('user_id', '')[:8]}"
+    return user
+
+async def assign_missing_usernames():
+    """Give accounts without a username one from their email prefix (one at a time; the unique index arbitrates)"""
+    async for user in db.users.find({"username": {"$not": {"$type": "string"}}}, {"_id": 0, "user_id": 1, "email": 1, "name": 1}):
+        base = username_base((user.get("email") or "").split("@")[0] or user.get("name") or "member")
+        for _ in range(USERNAME_INSERT_RETRIES):
+            try:
+                await db.users.update_one({"user_id": user["user_id"]}, {"$set": {"username": await next_free_username(base)}})
+                break
+            except DuplicateKeyError:
+                continue
+
+async def drop_deleted_gc_members():
+    """Remove accounts deleted before the cascade pulled GC `members` (it targeted a nonexistent field)"""
+    user_ids = await db.account_deletion_jobs.distinct("user_id", {"status": "done"})
+    for i in range(0, len(user_ids), MIGRATION_BATCH):
+        chunk = user_ids[i:i + MIGRATION_BATCH]
+        await db.gcs.update_many({"members": {"$in": chunk}}, {"$pull": {"members": {"$in": chunk}}})
+        await asyncio.sleep(MIGRATION_PAUSE)
+
+SCHEMA_MIGRATIONS = [
+    Migration(2, "poll_votes", migrate_poll_voters),
+    Migration(3, "user_native_dates", Backfill(
+        "users",
+        {"$or": [{field: {"$type": "string"}} for field in USER_DATE_FIELDS]},
+        user_dates_to_native,
+        {"user_id": 1, **{field: 1 for field in USER_DATE_FIELDS}},
+    )),
+    Migration(4, "user_defaults", Backfill(
+        "users",
+        {"$or": [{field: {"$exists": False}} for field in USER_DEFAULTS]
+                + [{"name": {"$in": [None, ""]}}, {"picture": {"$in": [None, ""]}}]},
+        user_missing_defaults,
+        {"user_id": 1, "name": 1, "picture": 1, **{field: 1 for field in USER_DEFAULTS}},
+    )),
+    Migration(5, "usernames", assign_missing_usernames),
+    Migration(6, "gc_deleted_members", drop_deleted_gc_members),
+    # Version 1 (an earlier thread_positions) may already be recorded, so the restored backfill runs as 7
+    Migration(THREAD_POSITIONS_VERSION, "thread_positions", backfill_thread_positions),
+    Migration(POLL_BALLOTS_VERSION, "poll_ballots", move_poll_votes_to_posts),
+    Migration(9, "activity_events", backfill_activity_events),
+]
+schema_migrations = MigrationRunner(db, SCHEMA_MIGRATIONS)
+
+async def prepare_unique_likes():
+    """
+    Make room for the unique (user_id, post_id) likes index: until it exists,
+    drop duplicate likes (fixing like_count) and any old non-unique index on
+    the same keys. Without this the unique build fails on legacy duplicates.
+    """
+    try:
+        info = await db.likes.index_information()
+        same_keys = {
+            name: spec for name, spec in info.items()
+            if [(k, int(v)) for k, v in spec["key"]] == [("user_id", 1), ("post_id", 1)]
+        }
+        if any(spec.get("unique") for spec in same_keys.values()):
+            return
+        dupes = await db.likes.aggregate([
+            {"$group": {"_id": {"user_id": "$user_id", "post_id": "$post_id"}, "ids": {"$push": "$_id"}, "n": {"$sum": 1}}},
+            {"$match": {"n": {"$gt": 1}}}
+        ], allowDiskUse=True).to_list(None)
+        if dupes:
+            await db.likes.delete_many({"_id": {"$in": [i for d in dupes for i in d["ids"][1:]]}})
+            # Each duplicate had bumped like_count
+            await db.posts.bulk_write([
+                UpdateOne({"post_id": d["_id"]["post_id"]}, {"$inc": {"like_count": 1 - d["n"]}})
+                for d in dupes
+            ], ordered=False)
+        for name in same_keys:
+            await db.likes.drop_index(name)
+        logger.info(f"Startup: removed {sum(d['n'] - 1 for d in dupes)} duplicate likes")
+    except Exception as e:
+        logger.error(f"Startup: preparing unique likes index failed: {e}")
+
+async def prepare_unique_usernames():
+    """
+    Make room for the unique username index: signups used to check-then-insert,
+    so legacy databases can hold duplicate usernames. Until the index exists,
+    every member sharing a handle is moved to a free base<N> name except one
+    (none if a system account holds the handle, otherwise the oldest), and
+    any other index on username is dropped (old non-unique or differently
+    scoped ones). System accounts are never renamed.
+    """
+    try:
+        info = await db.users.index_information()
+        same_keys = {
+            name: spec for name, spec in info.items()
+            if [(k, int(v)) for k, v in spec["key"]] == [("username", 1)]
+        }
+        if any(spec.get("unique") and spec.get("partialFilterExpression") == MEMBER_USERNAMES for spec in same_keys.values()):
+            return
+        dupes = await db.users.aggregate([
+            {"$match": {"username": {"$type": "string"}}},
+            {"$sort": {"_id": 1}},
+            {"$group": {"_id": "$username", "user_ids": {"$push": "$user_id"}, "n": {"$sum": 1}}},
+            {"$match": {"n": {"$gt": 1}}}
+        ], allowDiskUse=True).to_list(None)
+        renamed = 0
+        for d in dupes:
+            keep = [u for u in d["user_ids"] if u in SYSTEM_USER_IDS] or d["user_ids"][:1]
+            for user_id in d["user_ids"]:
+                if user_id in keep:
+                    continue
+                await db.users.update_one(
+                    {"user_id": user_id},
+                    {"$set": {"username": await next_free_username(username_base(d["_id"]))}}
+                )
+                renamed += 1
+        for name in same_keys:
+            await db.users.drop_index(name)
+        logger.info(f"Startup: renamed {renamed} duplicate usernames")
+    except Exception as e:
+        logger.error(f"Startup: preparing unique usernames index failed: {e}")
+
+async def ensure_indexes():
+    """Create the indexes the hot read/write paths rely on (idempotent)"""
+    for collection, keys, options in INDEX_SPECS:
+        try:
+            await db[collection].create_index(keys, **options)
+        except Exception as e:
+            logger.error(f"Startup: index creation failed for {collection} {keys}: {e}")
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize database and ensure Bonita's profile is set up"""
+    await prepare_unique_likes()
+    await prepare_unique_usernames()
+    await ensure_indexes()
+    engagement_counters.start()
+    schema_migrations.start()
+    await explore_ranker.start()
+    push_service.start()
+    email_outbox.start()
+    account_deletion.start()
+    await social_graph.start()
+    suggestion_service.start()
+    rising_voices.start()
+    presence.start()
+    global presence_broadcast_task
+    presence_broadcast_task = asyncio.create_task(broadcast_presence_changes())
+    
     # Update Bonita's avatar if she exists
     await db.users.update_one(
         {"user_id": "bonita"},
@@ -7146,18 +8141,18 @@ async def startup_event():
             "following_count": 0,
             "posts_count": 0,
             "vouched_by": None,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         })
     else:
-        # Ensure picture and created_at are set (for existing users that might be missing fields)
+        # Ensure picture, handle and created_at are set (for existing users that might be missing fields)
         await db.users.update_one(
             {"user_id": "bonita_ai"},
-            {"$set": {"picture": BONITA_AVATAR_URL}}
+            {"$set": {"picture": BONITA_AVATAR_URL, "username": "bonita"}}
         )
         # Add created_at if missing
         await db.users.update_one(
             {"user_id": "bonita_ai", "created_at": {"$exists": False}},
-            {"$set": {"created_at": datetime.now(timezone.utc).isoformat()}}
+            {"$set": {"created_at": datetime.now(timezone.utc)}}
         )
     logger.info("Startup: Bonita's profile initialized")
     
@@ -7194,7 +8189,7 @@ async def seed_starter_posts_internal():
             "following_count": 0,
             "posts_count": 0,
             "vouched_by": None,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         })
     
     # Starter posts from Bonita
@@ -7253,4 +8248,18 @@ async def seed_starter_posts_internal():
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await engagement_counters.stop()
+    await schema_migrations.stop()
+    await explore_ranker.stop()
+    await push_service.stop()
+    await email_outbox.stop()
+    await account_deletion.stop()
+    await suggestion_service.stop()
+    await rising_voices.stop()
+    if presence_broadcast_task:
+        presence_broadcast_task.cancel()
+        await asyncio.gather(presence_broadcast_task, return_exceptions=True)
+    await presence.stop()
+    await social_graph.stop()
+    shutdown_password_hashing()
     client.close()
@@ -1,3 +1,3 @@
 # /app/backend/services/__init__.py
 """Services for BLVX"""
-from .email_service import send_verification_email, send_welcome_email
+from .email_service import send_verification_email, send_welcome_email, send_password_reset_email, EmailOutbox
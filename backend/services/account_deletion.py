@@ -0,0 +1,322 @@
+# /app/backend/services/account_deletion.py
+"""Account deletion for BLVX - durable, resumable cascade run in the background"""
+import os
+import uuid
+import asyncio
+import logging
+from datetime import datetime, timezone, timedelta
+from typing import Callable, Dict, List, Optional
+
+from pymongo import UpdateOne, ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+DELETION_BATCH_SIZE = int(os.environ.get("DELETION_BATCH_SIZE", "500"))
+DELETION_BATCH_PAUSE = 0.05    # Seconds between batches so a heavy user never hogs the cluster
+DELETION_LEASE_SECONDS = 300   # A running job is resumed elsewhere if not renewed within this
+DELETION_POLL_INTERVAL = 30    # Seconds between job polls when idle
+DELETION_MAX_ATTEMPTS = 10
+
+
+# Where each corrected counter is counted from: (collection, field) ->
+# (source collection, source field holding the counter's key, extra filter)
+COUNTER_SOURCES = {
+    ("users", "followers_count"): ("follows", "following_id", {}),
+    ("users", "following_count"): ("follows", "follower_id", {}),
+    ("posts", "like_count"): ("likes", "post_id", {}),
+    ("posts", "reply_count"): ("posts", "parent_post_id", {}),
+    ("posts", "repost_count"): ("posts", "quote_post_id", {}),
+    ("notification_counters", "unread"): ("notifications", "user_id", {"read": False}),
+}
+
+
+def _recount(collection: str, field: str, keys) -> List[list]:
+    """Counters to recount as journal entries: [collection, field, [keys]]"""
+    keys = sorted({k for k in keys if k})
+    return [[collection, field, keys]] if keys else []
+
+
+def _following_corrections(docs: List[dict], user_id: str) -> List[list]:
+    # user_id followed these people: their follower counts drop
+    return _recount("users", "followers_count", (d.get("following_id") for d in docs))
+
+
+def _follower_corrections(docs: List[dict], user_id: str) -> List[list]:
+    # These people followed user_id: their following counts drop
+    return _recount("users", "following_count", (d.get("follower_id") for d in docs))
+
+
+def _like_corrections(docs: List[dict], user_id: str) -> List[list]:
+    return _recount("posts", "like_count", (d.get("post_id") for d in docs))
+
+
+def _post_corrections(docs: List[dict], user_id: str) -> List[list]:
+    # Replies and quotes of other people's posts stop counting toward them
+    return (
+        _recount("posts", "reply_count", (d.get("parent_post_id") for d in docs)) +
+        _recount("posts", "repost_count", (d.get("quote_post_id") for d in docs))
+    )
+
+
+def _notification_corrections(docs: List[dict], user_id: str) -> List[list]:
+    # Unread notifications from user_id stop counting toward recipients' badges
+    return _recount("notification_counters", "unread", (d.get("user_id") for d in docs if not d.get("read")))
+
+
+def _by_email(job: dict) -> dict:
+    # Tombstoned users with no email have nothing keyed by email to clean up
+    return {"email": job["email"]} if job.get("email") else {"_id": {"$in": []}}
+
+
+class Step:
+    """One cascade step: remove (or $pull from) every doc matching `query`, in batches"""
+
+    def __init__(self, name: str, collection: str, query: Callable[[dict], dict],
+                 corrections: Optional[Callable[[List[dict], str], List[list]]] = None,
+                 projection: Optional[dict] = None, pull: Optional[str] = None, pull_key: Optional[str] = None):
+        self.name = name
+        self.collection = collection
+        self.query = query
+        self.corrections = corrections
+        self.projection = projection or {"_id": 1}
+        self.pull = pull    # Array field to $pull the user from instead of deleting the doc
+        self.pull_key = pull_key    # For arrays of subdocuments: the field holding the user id
+
+
+# Order matters: edges with counter corrections first, the user document last.
+# Jobs record finished steps by name, so steps can be added anywhere.
+DELETION_STEPS = [
+    Step("sessions", "user_sessions", lambda job: {"user_id": job["user_id"]}),
+    Step("following", "follows", lambda job: {"follower_id": job["user_id"]},
+         _following_corrections, {"_id": 1, "following_id": 1}),
+    Step("followers", "follows", lambda job: {"following_id": job["user_id"]},
+         _follower_corrections, {"_id": 1, "follower_id": 1}),
+    Step("likes", "likes", lambda job: {"user_id": job["user_id"]},
+         _like_corrections, {"_id": 1, "post_id": 1}),
+    # Tallies on polls keep the vote; only the voter record goes
+    Step("poll_votes", "poll_votes", lambda job: {"user_id": job["user_id"]}),
+    Step("poll_ballots", "posts", lambda job: {"poll_ballots.user_id": job["user_id"]},
+         pull="poll_ballots", pull_key="user_id"),
+    Step("posts", "posts", lambda job: {"user_id": job["user_id"]},
+         _post_corrections, {"_id": 1, "parent_post_id": 1, "quote_post_id": 1}),
+    Step("notifications_sent", "notifications", lambda job: {"from_user_id": job["user_id"]},
+         _notification_corrections, {"_id": 1, "user_id": 1, "read": 1}),
+    Step("notifications", "notifications", lambda job: {"user_id": job["user_id"]}),
+    Step("notification_counter", "notification_counters", lambda job: {"user_id": job["user_id"]}),
+    Step("blocks", "blocks", lambda job: {"$or": [{"blocker_id": job["user_id"]}, {"blocked_id": job["user_id"]}]}),
+    Step("mutes", "mutes", lambda job: {"$or": [{"muter_id": job["user_id"]}, {"muted_id": job["user_id"]}]}),
+    Step("reports", "reports", lambda job: {"reporter_id": job["user_id"]}),
+    Step("gc_memberships", "gcs", lambda job: {"members": job["user_id"]}, pull="members"),
+    Step("gc_messages", "gc_messages", lambda job: {"user_id": job["user_id"]}),
+    Step("sidebars", "sidebars", lambda job: {"$or": [{"user1_id": job["user_id"]}, {"user2_id": job["user_id"]}]}),
+    Step("sidebar_messages", "sidebar_messages", lambda job: {"user_id": job["user_id"]}),
+    Step("plates", "plates", lambda job: {"creator_id": job["user_id"]}),
+    Step("ai_stoop_sessions", "ai_stoop_sessions",
+         lambda job: {"$or": [{"visitor_id": job["user_id"]}, {"owner_id": job["user_id"]}]}),
+    Step("ai_stoop_configs", "ai_stoop_configs", lambda job: {"user_id": job["user_id"]}),
+    Step("push_subscriptions", "push_subscriptions", lambda job: {"user_id": job["user_id"]}),
+    Step("suggestions", "suggestions", lambda job: {"user_id": job["user_id"]}),
+    Step("activity", "activity_events", lambda job: {"actor_id": job["user_id"]}),
+    Step("verification_codes", "verification_codes", _by_email),
+    Step("password_resets", "password_resets", _by_email),
+    Step("user", "users", lambda job: {"user_id": job["user_id"]}),
+]
+
+
+def _remaining_steps(job: dict) -> List[Step]:
+    done = set(job.get("completed_steps") or [])
+    return [step for step in DELETION_STEPS if step.name not in done]
+
+
+class AccountDeletionService:
+    """
+    Account deletion as a durable job in `account_deletion_jobs`. request()
+    tombstones the user (identity fields removed, sessions revoked) and writes
+    the job; a background runner then walks DELETION_STEPS in bounded batches,
+    pausing between batches, and records finished steps (by name) and
+    per-step counts as it goes so a restarted server resumes where it
+    stopped, even if a deploy changed the step list in between.
+
+    Each batch journals its ids and the counters it affects on the job
+    before deleting, then recounts those counters from their source
+    collections and clears the journal. Deleting and recounting are both
+    idempotent, so a resumed job can replay an outstanding journal any
+    number of times without skewing a counter.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+
+    async def request(self, user_id: str) -> dict:
+        """Tombstone the user and queue (or return the existing) deletion job"""
+        now = datetime.now(timezone.utc)
+        user = await self.db.users.find_one_and_update(
+            {"user_id": user_id},
+            {"$set": {"deleted_at": now, "account_status": "deleted"},
+             "$unset": {"email": "", "password_hash": "", "google_user_id": "", "apple_user_id": ""}},
+            projection={"_id": 0, "email": 1}
+        )
+        await self.db.user_sessions.delete_many({"user_id": user_id})
+
+        job = await self.db.account_deletion_jobs.find_one_and_update(
+            {"user_id": user_id},
+            {"$setOnInsert": {
+                "job_id": f"deletion_{uuid.uuid4().hex[:16]}",
+                "user_id": user_id,
+                "email": (user or {}).get("email"),
+                "status": "pending",
+                "completed_steps": [],
+                "progress": {},
+                "attempts": 0,
+                "next_attempt_at": now,
+                "created_at": now,
+            }},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+            projection={"_id": 0, "email": 0, "pending": 0}
+        )
+        self._wake.set()
+        return job
+
+    async def get_status(self, job_id: str) -> Optional[dict]:
+        job = await self.db.account_deletion_jobs.find_one(
+            {"job_id": job_id},
+            {"_id": 0, "user_id": 0, "email": 0, "pending": 0}
+        )
+        if job:
+            remaining = _remaining_steps(job)
+            job["steps_total"] = len(DELETION_STEPS)
+            job["steps_done"] = len(DELETION_STEPS) - len(remaining)
+            job["current_step"] = remaining[0].name if remaining else None
+        return job
+
+    def start(self):
+        """Start the background runner (call from app startup)"""
+        if not self._task:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                job = await self._claim()
+                if job:
+                    await self._process(job)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Account deletion runner error: {e}")
+
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=DELETION_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim(self) -> Optional[dict]:
+        now = datetime.now(timezone.utc)
+        return await self.db.account_deletion_jobs.find_one_and_update(
+            {"$or": [
+                {"status": "pending", "next_attempt_at": {"$lte": now}},
+                {"status": "running", "locked_until": {"$lt": now}},
+            ]},
+            {"$set": {"status": "running", "locked_until": now + timedelta(seconds=DELETION_LEASE_SECONDS)},
+             "$inc": {"attempts": 1}},
+            sort=[("next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER,
+            projection={"_id": 0}
+        )
+
+    async def _process(self, job: dict):
+        job_id = job["job_id"]
+        try:
+            if job.get("pending"):
+                await self._replay(job_id, job["pending"])
+
+            for step in _remaining_steps(job):
+                job["current_step"] = step.name
+                await self._run_step(job, step)
+                await self.db.account_deletion_jobs.update_one(
+                    {"job_id": job_id},
+                    {"$addToSet": {"completed_steps": step.name},
+                     "$set": {"updated_at": datetime.now(timezone.utc)}}
+                )
+
+            await self.db.account_deletion_jobs.update_one(
+                {"job_id": job_id},
+                {"$set": {"status": "done", "finished_at": datetime.now(timezone.utc)},
+                 "$unset": {"email": "", "locked_until": "", "error": ""}}
+            )
+            logger.info(f"Account deleted for user {job['user_id']} ({job_id})")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            failed = job.get("attempts", 1) >= DELETION_MAX_ATTEMPTS
+            delay = min(60 * (2 ** job.get("attempts", 1)), 3600)
+            await self.db.account_deletion_jobs.update_one(
+                {"job_id": job_id},
+                {"$set": {
+                    "status": "failed" if failed else "pending",
+                    "error": str(e),
+                    "next_attempt_at": datetime.now(timezone.utc) + timedelta(seconds=delay)},
+                 "$unset": {"locked_until": ""}}
+            )
+            logger.error(f"Account deletion {job_id} failed at step {job.get('current_step')}: {e}")
+
+    async def _run_step(self, job: dict, step: Step):
+        collection = self.db[step.collection]
+        query = step.query(job)
+        while True:
+            docs = await collection.find(query, step.projection).limit(DELETION_BATCH_SIZE).to_list(DELETION_BATCH_SIZE)
+            if not docs:
+                return
+            ids = [doc["_id"] for doc in docs]
+
+            if step.pull:
+                value = {step.pull_key: job["user_id"]} if step.pull_key else job["user_id"]
+                await collection.update_many({"_id": {"$in": ids}}, {"$pull": {step.pull: value}})
+            else:
+                corrections = step.corrections(docs, job["user_id"]) if step.corrections else []
+                if corrections:
+                    pending = {"collection": step.collection, "ids": ids, "corrections": corrections}
+                    await self.db.account_deletion_jobs.update_one({"job_id": job["job_id"]}, {"$set": {"pending": pending}})
+                    await self._replay(job["job_id"], pending)
+                else:
+                    await collection.delete_many({"_id": {"$in": ids}})
+
+            await self.db.account_deletion_jobs.update_one(
+                {"job_id": job["job_id"]},
+                {"$inc": {f"progress.{step.name}": len(ids)},
+                 "$set": {"locked_until": datetime.now(timezone.utc) + timedelta(seconds=DELETION_LEASE_SECONDS)}}
+            )
+            await asyncio.sleep(DELETION_BATCH_PAUSE)
+
+    async def _replay(self, job_id: str, pending: dict):
+        """Delete a journaled batch and recount the counters it touched, then clear the journal"""
+        await self.db[pending["collection"]].delete_many({"_id": {"$in": pending["ids"]}})
+
+        by_collection: Dict[str, List[UpdateOne]] = {}
+        for collection, field, keys in pending["corrections"]:
+            source, source_key, extra = COUNTER_SOURCES[(collection, field)]
+            counts = {key: 0 for key in keys}
+            async for row in self.db[source].aggregate([
+                {"$match": {source_key: {"$in": keys}, **extra}},
+                {"$group": {"_id": f"${source_key}", "n": {"$sum": 1}}}
+            ]):
+                counts[row["_id"]] = row["n"]
+            key_field = "post_id" if collection == "posts" else "user_id"
+            by_collection.setdefault(collection, []).extend(
+                UpdateOne({key_field: key}, {"$set": {field: n}}) for key, n in counts.items()
+            )
+        for collection, ops in by_collection.items():
+            await self.db[collection].bulk_write(ops, ordered=False)
+
+        await self.db.account_deletion_jobs.update_one({"job_id": job_id}, {"$unset": {"pending": ""}})
@@ -1,9 +1,18 @@
 # /app/backend/services/email_service.py
-"""Email service for BLVX using Resend"""
+"""Email service for BLVX using Resend - templates, outbox and background sender"""
 import os
+import html
+import hashlib
+import uuid
+import random
 import asyncio
 import logging
+from string import Template
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Optional
+
 import resend
+from resend.exceptions import ResendError
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -17,310 +26,570 @@ SENDER_EMAIL = os.environ.get("SENDER_EMAIL", "cj@blvx.social")
 # Logo URL (hosted on the frontend)
 LOGO_URL = "https://blvx.social/assets/logo-white.png"
 
+EMAIL_SENDER_CONCURRENCY = int(os.environ.get("EMAIL_SENDER_CONCURRENCY", "4"))
+EMAIL_BATCH_SIZE = 50         # Rows per Resend batch call (API limit is 100)
+EMAIL_MAX_ATTEMPTS = 5        # Including the first try
+EMAIL_BACKOFF_BASE = 30       # Seconds, doubled per retry (with jitter)
+EMAIL_POLL_INTERVAL = 5       # Seconds between outbox polls when idle
+EMAIL_LEASE_SECONDS = 120     # A claimed row is retried if its sender dies before this
+EMAIL_REJECTED_CODES = (400, 422)  # Resend validation errors: nothing in the batch was accepted
 
-async def send_verification_email(to_email: str, code: str, name: str = "there") -> bool:
-    """Send verification code email to user"""
-    if not resend.api_key:
-        logger.warning("RESEND_API_KEY not configured - skipping email send")
-        return False
-    
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    </head>
-    <body style="margin: 0; padding: 0; background-color: #000000; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;">
-        <table role="presentation" style="width: 100%; border-collapse: collapse;">
-            <tr>
-                <td align="center" style="padding: 40px 20px;">
-                    <table role="presentation" style="max-width: 480px; width: 100%; border-collapse: collapse;">
-                        <!-- Header with Logo -->
-                        <tr>
-                            <td align="center" style="padding: 30px; background-color: #000000; border: 1px solid #333; border-bottom: none;">
-                                <img 
-                                    src="{LOGO_URL}" 
-                                    alt="BLVX - High Context Social" 
-                                    width="120" 
-                                    style="display: block; max-width: 120px; height: auto;"
-                                />
-                            </td>
-                        </tr>
-                        
-                        <!-- Content -->
-                        <tr>
-                            <td style="padding: 40px 30px; background-color: #111; border: 1px solid #333;">
-                                <h2 style="margin: 0 0 24px 0; color: #f59e0b; font-size: 22px; font-weight: 600;">
-                                    The Block is Open.
-                                </h2>
-                                
-                                <p style="margin: 0 0 20px 0; color: #ffffff; font-size: 16px; line-height: 1.6;">
-                                    What's good, {name}?
-                                </p>
-                                
-                                <p style="margin: 0 0 20px 0; color: #aaa; font-size: 14px; line-height: 1.7;">
-                                    You made it. We built this platform because the timeline was getting too noisy and we needed a place that spoke our language.
-                                </p>
-                                
-                                <p style="margin: 0 0 30px 0; color: #aaa; font-size: 14px; line-height: 1.7;">
-                                    You are now part of the ecosystem. To secure your spot on the stoop, verify your email below.
-                                </p>
-                                
-                                <!-- Verification Code -->
-                                <div style="background-color: #000; border: 2px solid #f59e0b; padding: 20px; text-align: center; margin: 0 0 30px 0;">
-                                    <span style="font-size: 32px; font-weight: 700; color: #f59e0b; letter-spacing: 8px;">
-                                        {code}
-                                    </span>
-                                </div>
-                                
-                                <p style="margin: 0; color: #666; font-size: 12px;">
-                                    This code expires in 10 minutes. If you didn't sign up for BLVX, you can safely ignore this email.
-                                </p>
-                            </td>
-                        </tr>
-                        
-                        <!-- Footer -->
-                        <tr>
-                            <td style="padding: 20px 30px; background-color: #000; border: 1px solid #333; border-top: none; text-align: center;">
-                                <p style="margin: 0 0 10px 0; color: #666; font-size: 12px;">
-                                    <a href="https://blvx.social" style="color: #888; text-decoration: none;">BLVX</a>. Built for the culture. Owned by the people.
-                                </p>
-                                <p style="margin: 0; color: #444; font-size: 10px;">
-                                    <a href="https://blvx.social" style="color: #555; text-decoration: none;">blvx.social</a>
-                                </p>
-                            </td>
-                        </tr>
-                    </table>
-                </td>
-            </tr>
-        </table>
-    </body>
-    </html>
-    """
-    
-    params = {
+
+# ========================
+# TEMPLATES
+# ========================
+
+def _compile(source: str) -> Template:
+    """Bake the static values into a template once; only per-recipient fields remain"""
+    return Template(Template(source).safe_substitute(logo_url=LOGO_URL))
+
+VERIFICATION_HTML = _compile("""\
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+</head>
+<body style="margin: 0; padding: 0; background-color: #000000; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;">
+    <table role="presentation" style="width: 100%; border-collapse: collapse;">
+        <tr>
+            <td align="center" style="padding: 40px 20px;">
+                <table role="presentation" style="max-width: 480px; width: 100%; border-collapse: collapse;">
+                    <!-- Header with Logo -->
+                    <tr>
+                        <td align="center" style="padding: 30px; background-color: #000000; border: 1px solid #333; border-bottom: none;">
+                            <img 
+                                src="${logo_url}" 
+                                alt="BLVX - High Context Social" 
+                                width="120" 
+                                style="display: block; max-width: 120px; height: auto;"
+                            />
+                        </td>
+                    </tr>
+
+                    <!-- Content -->
+                    <tr>
+                        <td style="padding: 40px 30px; background-color: #111; border: 1px solid #333;">
+                            <h2 style="margin: 0 0 24px 0; color: #f59e0b; font-size: 22px; font-weight: 600;">
+                                The Block is Open.
+                            </h2>
+
+                            <p style="margin: 0 0 20px 0; color: #ffffff; font-size: 16px; line-height: 1.6;">
+                                What's good, ${name}?
+                            </p>
+
+                            <p style="margin: 0 0 20px 0; color: #aaa; font-size: 14px; line-height: 1.7;">
+                                You made it. We built this platform because the timeline was getting too noisy and we needed a place that spoke our language.
+                            </p>
+
+                            <p style="margin: 0 0 30px 0; color: #aaa; font-size: 14px; line-height: 1.7;">
+                                You are now part of the ecosystem. To secure your spot on the stoop, verify your email below.
+                            </p>
+
+                            <!-- Verification Code -->
+                            <div style="background-color: #000; border: 2px solid #f59e0b; padding: 20px; text-align: center; margin: 0 0 30px 0;">
+                                <span style="font-size: 32px; font-weight: 700; color: #f59e0b; letter-spacing: 8px;">
+                                    ${code}
+                                </span>
+                            </div>
+
+                            <p style="margin: 0; color: #666; font-size: 12px;">
+                                This code expires in 10 minutes. If you didn't sign up for BLVX, you can safely ignore this email.
+                            </p>
+                        </td>
+                    </tr>
+
+                    <!-- Footer -->
+                    <tr>
+                        <td style="padding: 20px 30px; background-color: #000; border: 1px solid #333; border-top: none; text-align: center;">
+                            <p style="margin: 0 0 10px 0; color: #666; font-size: 12px;">
+                                <a href="https://blvx.social" style="color: #888; text-decoration: none;">BLVX</a>. Built for the culture. Owned by the people.
+                            </p>
+                            <p style="margin: 0; color: #444; font-size: 10px;">
+                                <a href="https://blvx.social" style="color: #555; text-decoration: none;">blvx.social</a>
+                            </p>
+                        </td>
+                    </tr>
+                </table>
+            </td>
+        </tr>
+    </table>
+</body>
+</html>""")
+
+WELCOME_HTML = _compile("""\
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+</head>
+<body style="margin: 0; padding: 0; background-color: #000000; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;">
+    <table role="presentation" style="width: 100%; border-collapse: collapse;">
+        <tr>
+            <td align="center" style="padding: 40px 20px;">
+                <table role="presentation" style="max-width: 480px; width: 100%; border-collapse: collapse;">
+                    <!-- Header with Logo -->
+                    <tr>
+                        <td align="center" style="padding: 30px; background-color: #000; border: 1px solid #333; border-bottom: none;">
+                            <img 
+                                src="${logo_url}" 
+                                alt="BLVX - High Context Social" 
+                                width="120" 
+                                style="display: block; max-width: 120px; height: auto;"
+                            />
+                        </td>
+                    </tr>
+
+                    <!-- Content -->
+                    <tr>
+                        <td style="padding: 40px 30px; background-color: #111; border: 1px solid #333;">
+                            <h2 style="margin: 0 0 24px 0; color: #f59e0b; font-size: 22px; font-weight: 600;">
+                                You're in. 🏠
+                            </h2>
+
+                            <p style="margin: 0 0 20px 0; color: #ffffff; font-size: 16px; line-height: 1.6;">
+                                ${name}, welcome to the neighborhood.
+                            </p>
+
+                            <p style="margin: 0 0 24px 0; color: #aaa; font-size: 14px; line-height: 1.7;">
+                                Your email is verified. You now have full access to the ecosystem. Here's where to start:
+                            </p>
+
+                            <table style="width: 100%; margin: 0 0 24px 0;">
+                                <tr>
+                                    <td style="padding: 12px 0; border-bottom: 1px solid #222;">
+                                        <span style="color: #f59e0b; font-weight: 600;">The Block</span>
+                                        <span style="color: #888; font-size: 13px;"> — Share your thoughts with everyone</span>
+                                    </td>
+                                </tr>
+                                <tr>
+                                    <td style="padding: 12px 0; border-bottom: 1px solid #222;">
+                                        <span style="color: #f59e0b; font-weight: 600;">The Cookout</span>
+                                        <span style="color: #888; font-size: 13px;"> — Private posts for your circle</span>
+                                    </td>
+                                </tr>
+                                <tr>
+                                    <td style="padding: 12px 0; border-bottom: 1px solid #222;">
+                                        <span style="color: #f59e0b; font-weight: 600;">The Stoop</span>
+                                        <span style="color: #888; font-size: 13px;"> — Live audio rooms</span>
+                                    </td>
+                                </tr>
+                                <tr>
+                                    <td style="padding: 12px 0;">
+                                        <span style="color: #f59e0b; font-weight: 600;">Bonita</span>
+                                        <span style="color: #888; font-size: 13px;"> — Your AI auntie, always here to chat</span>
+                                    </td>
+                                </tr>
+                            </table>
+
+                            <p style="margin: 0; color: #666; font-size: 13px;">
+                                You've got 10 plates to share. Invite your people. Let's build this together.
+                            </p>
+                        </td>
+                    </tr>
+
+                    <!-- Footer -->
+                    <tr>
+                        <td style="padding: 20px 30px; background-color: #000; border: 1px solid #333; border-top: none; text-align: center;">
+                            <p style="margin: 0 0 10px 0; color: #666; font-size: 12px;">
+                                <a href="https://blvx.social" style="color: #888; text-decoration: none;">BLVX</a>. Built for the culture. Owned by the people.
+                            </p>
+                            <p style="margin: 0; color: #444; font-size: 10px;">
+                                <a href="https://blvx.social" style="color: #555; text-decoration: none;">blvx.social</a>
+                            </p>
+                        </td>
+                    </tr>
+                </table>
+            </td>
+        </tr>
+    </table>
+</body>
+</html>""")
+
+PASSWORD_RESET_HTML = _compile("""\
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+</head>
+<body style="margin: 0; padding: 0; background-color: #000000; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;">
+    <table role="presentation" style="width: 100%; border-collapse: collapse;">
+        <tr>
+            <td align="center" style="padding: 40px 20px;">
+                <table role="presentation" style="max-width: 480px; width: 100%; border-collapse: collapse;">
+                    <!-- Header with Logo -->
+                    <tr>
+                        <td align="center" style="padding: 30px; background-color: #000000; border: 1px solid #333; border-bottom: none;">
+                            <img 
+                                src="${logo_url}" 
+                                alt="BLVX - High Context Social" 
+                                width="120" 
+                                style="display: block; max-width: 120px; height: auto;"
+                            />
+                        </td>
+                    </tr>
+
+                    <!-- Content -->
+                    <tr>
+                        <td style="padding: 40px 30px; background-color: #111; border: 1px solid #333;">
+                            <h2 style="margin: 0 0 24px 0; color: #f59e0b; font-size: 22px; font-weight: 600;">
+                                Locked out?
+                            </h2>
+
+                            <p style="margin: 0 0 20px 0; color: #ffffff; font-size: 16px; line-height: 1.6;">
+                                No stress, ${name}. It happens to the best of us.
+                            </p>
+
+                            <p style="margin: 0 0 30px 0; color: #aaa; font-size: 14px; line-height: 1.7;">
+                                Click the button below to secure your account and get back on The Block.
+                            </p>
+
+                            <!-- Reset Button -->
+                            <div style="text-align: center; margin: 0 0 30px 0;">
+                                <a href="${reset_url}" style="display: inline-block; background-color: #f59e0b; color: #000; font-weight: 600; font-size: 14px; text-decoration: none; padding: 14px 32px; border-radius: 0;">
+                                    Reset Password
+                                </a>
+                            </div>
+
+                            <p style="margin: 0 0 16px 0; color: #666; font-size: 12px;">
+                                This link expires in 1 hour. If you didn't request this, you can safely ignore this email.
+                            </p>
+
+                            <p style="margin: 0; color: #444; font-size: 11px; word-break: break-all;">
+                                Or copy this link: ${reset_url}
+                            </p>
+                        </td>
+                    </tr>
+
+                    <!-- Footer -->
+                    <tr>
+                        <td style="padding: 20px 30px; background-color: #000; border: 1px solid #333; border-top: none; text-align: center;">
+                            <p style="margin: 0 0 10px 0; color: #666; font-size: 12px;">
+                                <a href="https://blvx.social" style="color: #888; text-decoration: none;">BLVX</a>. Built for the culture. Owned by the people.
+                            </p>
+                            <p style="margin: 0; color: #444; font-size: 10px;">
+                                <a href="https://blvx.social" style="color: #555; text-decoration: none;">blvx.social</a>
+                            </p>
+                        </td>
+                    </tr>
+                </table>
+            </td>
+        </tr>
+    </table>
+</body>
+</html>""")
+
+EMAIL_TEMPLATES: Dict[str, Dict[str, Template]] = {
+    "verification": {"subject": Template("Welcome home. 🧱"), "html": VERIFICATION_HTML},
+    "welcome": {"subject": Template("You're in, ${name}. 🏠"), "html": WELCOME_HTML},
+    "password_reset": {"subject": Template("Let's get you back in. 🔑"), "html": PASSWORD_RESET_HTML},
+}
+
+
+def render_email(template: str, to_email: str, params: dict) -> dict:
+    """Fill a compiled template and return Resend send params"""
+    compiled = EMAIL_TEMPLATES[template]
+    escaped = {key: html.escape(str(value)) for key, value in params.items()}
+    return {
         "from": f"BLVX <{SENDER_EMAIL}>",
         "to": [to_email],
-        "subject": "Welcome home. 🧱",
-        "html": html_content
+        "subject": compiled["subject"].safe_substitute(params),
+        "html": compiled["html"].safe_substitute(escaped),
     }
-    
-    try:
-        email = await asyncio.to_thread(resend.Emails.send, params)
-        logger.info(f"Verification email sent to {to_email}, ID: {email.get('id')}")
-        return True
-    except Exception as e:
-        logger.error(f"Failed to send verification email to {to_email}: {e}")
-        return False
 
 
-async def send_welcome_email(to_email: str, name: str) -> bool:
-    """Send welcome email after verification"""
+def verification_params(code: str, name: str = "there") -> dict:
+    return {"code": code, "name": name}
+
+
+def welcome_params(name: str = "there") -> dict:
+    return {"name": name}
+
+
+def password_reset_params(token: str, name: str = "there", origin: str = "https://blvx.social") -> dict:
+    return {"name": name, "reset_url": f"{origin}/reset-password?token={token}"}
+
+
+# ========================
+# DIRECT SEND
+# ========================
+
+async def _send_now(template: str, to_email: str, params: dict) -> bool:
     if not resend.api_key:
+        logger.warning("RESEND_API_KEY not configured - skipping email send")
         return False
-    
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    </head>
-    <body style="margin: 0; padding: 0; background-color: #000000; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;">
-        <table role="presentation" style="width: 100%; border-collapse: collapse;">
-            <tr>
-                <td align="center" style="padding: 40px 20px;">
-                    <table role="presentation" style="max-width: 480px; width: 100%; border-collapse: collapse;">
-                        <!-- Header with Logo -->
-                        <tr>
-                            <td align="center" style="padding: 30px; background-color: #000; border: 1px solid #333; border-bottom: none;">
-                                <img 
-                                    src="{LOGO_URL}" 
-                                    alt="BLVX - High Context Social" 
-                                    width="120" 
-                                    style="display: block; max-width: 120px; height: auto;"
-                                />
-                            </td>
-                        </tr>
-                        
-                        <!-- Content -->
-                        <tr>
-                            <td style="padding: 40px 30px; background-color: #111; border: 1px solid #333;">
-                                <h2 style="margin: 0 0 24px 0; color: #f59e0b; font-size: 22px; font-weight: 600;">
-                                    You're in. 🏠
-                                </h2>
-                                
-                                <p style="margin: 0 0 20px 0; color: #ffffff; font-size: 16px; line-height: 1.6;">
-                                    {name}, welcome to the neighborhood.
-                                </p>
-                                
-                                <p style="margin: 0 0 24px 0; color: #aaa; font-size: 14px; line-height: 1.7;">
-                                    Your email is verified. You now have full access to the ecosystem. Here's where to start:
-                                </p>
-                                
-                                <table style="width: 100%; margin: 0 0 24px 0;">
-                                    <tr>
-                                        <td style="padding: 12px 0; border-bottom: 1px solid #222;">
-                                            <span style="color: #f59e0b; font-weight: 600;">The Block</span>
-                                            <span style="color: #888; font-size: 13px;"> — Share your thoughts with everyone</span>
-                                        </td>
-                                    </tr>
-                                    <tr>
-                                        <td style="padding: 12px 0; border-bottom: 1px solid #222;">
-                                            <span style="color: #f59e0b; font-weight: 600;">The Cookout</span>
-                                            <span style="color: #888; font-size: 13px;"> — Private posts for your circle</span>
-                                        </td>
-                                    </tr>
-                                    <tr>
-                                        <td style="padding: 12px 0; border-bottom: 1px solid #222;">
-                                            <span style="color: #f59e0b; font-weight: 600;">The Stoop</span>
-                                            <span style="color: #888; font-size: 13px;"> — Live audio rooms</span>
-                                        </td>
-                                    </tr>
-                                    <tr>
-                                        <td style="padding: 12px 0;">
-                                            <span style="color: #f59e0b; font-weight: 600;">Bonita</span>
-                                            <span style="color: #888; font-size: 13px;"> — Your AI auntie, always here to chat</span>
-                                        </td>
-                                    </tr>
-                                </table>
-                                
-                                <p style="margin: 0; color: #666; font-size: 13px;">
-                                    You've got 10 plates to share. Invite your people. Let's build this together.
-                                </p>
-                            </td>
-                        </tr>
-                        
-                        <!-- Footer -->
-                        <tr>
-                            <td style="padding: 20px 30px; background-color: #000; border: 1px solid #333; border-top: none; text-align: center;">
-                                <p style="margin: 0 0 10px 0; color: #666; font-size: 12px;">
-                                    <a href="https://blvx.social" style="color: #888; text-decoration: none;">BLVX</a>. Built for the culture. Owned by the people.
-                                </p>
-                                <p style="margin: 0; color: #444; font-size: 10px;">
-                                    <a href="https://blvx.social" style="color: #555; text-decoration: none;">blvx.social</a>
-                                </p>
-                            </td>
-                        </tr>
-                    </table>
-                </td>
-            </tr>
-        </table>
-    </body>
-    </html>
-    """
-    
-    params = {
-        "from": f"BLVX <{SENDER_EMAIL}>",
-        "to": [to_email],
-        "subject": f"You're in, {name}. 🏠",
-        "html": html_content
-    }
-    
     try:
-        await asyncio.to_thread(resend.Emails.send, params)
+        email = await asyncio.to_thread(resend.Emails.send, render_email(template, to_email, params))
+        logger.info(f"{template} email sent to {to_email}, ID: {email.get('id')}")
         return True
     except Exception as e:
-        logger.error(f"Failed to send welcome email: {e}")
+        logger.error(f"Failed to send {template} email to {to_email}: {e}")
         return False
 
 
+async def send_verification_email(to_email: str, code: str, name: str = "there") -> bool:
+    """Send verification code email to user"""
+    return await _send_now("verification", to_email, verification_params(code, name))
+
+
+async def send_welcome_email(to_email: str, name: str) -> bool:
+    """Send welcome email after verification"""
+    return await _send_now("welcome", to_email, welcome_params(name))
+
+
 async def send_password_reset_email(to_email: str, token: str, name: str = "there", origin: str = "https://blvx.social") -> bool:
     """Send password reset email"""
-    if not resend.api_key:
-        logger.warning("RESEND_API_KEY not configured - skipping email send")
+    return await _send_now("password_reset", to_email, password_reset_params(token, name, origin))
+
+
+# ========================
+# OUTBOX
+# ========================
+
+def _batch_key(rows: List[dict]) -> str:
+    """Idempotency key for one Resend batch call, stable for the same set of rows"""
+    digest = hashlib.sha256(",".join(sorted(row["email_id"] for row in rows)).encode()).hexdigest()
+    return f"outbox-batch-{digest[:32]}"
+
+
+def _is_rejection(error: Exception) -> bool:
+    """True when Resend validated and refused the call, so nothing in it was sent"""
+    if not isinstance(error, ResendError):
         return False
-    
-    # Build reset URL from origin
-    reset_url = f"{origin}/reset-password?token={token}"
-    
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    </head>
-    <body style="margin: 0; padding: 0; background-color: #000000; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;">
-        <table role="presentation" style="width: 100%; border-collapse: collapse;">
-            <tr>
-                <td align="center" style="padding: 40px 20px;">
-                    <table role="presentation" style="max-width: 480px; width: 100%; border-collapse: collapse;">
-                        <!-- Header with Logo -->
-                        <tr>
-                            <td align="center" style="padding: 30px; background-color: #000000; border: 1px solid #333; border-bottom: none;">
-                                <img 
-                                    src="{LOGO_URL}" 
-                                    alt="BLVX - High Context Social" 
-                                    width="120" 
-                                    style="display: block; max-width: 120px; height: auto;"
-                                />
-                            </td>
-                        </tr>
-                        
-                        <!-- Content -->
-                        <tr>
-                            <td style="padding: 40px 30px; background-color: #111; border: 1px solid #333;">
-                                <h2 style="margin: 0 0 24px 0; color: #f59e0b; font-size: 22px; font-weight: 600;">
-                                    Locked out?
-                                </h2>
-                                
-                                <p style="margin: 0 0 20px 0; color: #ffffff; font-size: 16px; line-height: 1.6;">
-                                    No stress, {name}. It happens to the best of us.
-                                </p>
-                                
-                                <p style="margin: 0 0 30px 0; color: #aaa; font-size: 14px; line-height: 1.7;">
-                                    Click the button below to secure your account and get back on The Block.
-                                </p>
-                                
-                                <!-- Reset Button -->
-                                <div style="text-align: center; margin: 0 0 30px 0;">
-                                    <a href="{reset_url}" style="display: inline-block; background-color: #f59e0b; color: #000; font-weight: 600; font-size: 14px; text-decoration: none; padding: 14px 32px; border-radius: 0;">
-                                        Reset Password
-                                    </a>
-                                </div>
-                                
-                                <p style="margin: 0 0 16px 0; color: #666; font-size: 12px;">
-                                    This link expires in 1 hour. If you didn't request this, you can safely ignore this email.
-                                </p>
-                                
-                                <p style="margin: 0; color: #444; font-size: 11px; word-break: break-all;">
-                                    Or copy this link: {reset_url}
-                                </p>
-                            </td>
-                        </tr>
-                        
-                        <!-- Footer -->
-                        <tr>
-                            <td style="padding: 20px 30px; background-color: #000; border: 1px solid #333; border-top: none; text-align: center;">
-                                <p style="margin: 0 0 10px 0; color: #666; font-size: 12px;">
-                                    <a href="https://blvx.social" style="color: #888; text-decoration: none;">BLVX</a>. Built for the culture. Owned by the people.
-                                </p>
-                                <p style="margin: 0; color: #444; font-size: 10px;">
-                                    <a href="https://blvx.social" style="color: #555; text-decoration: none;">blvx.social</a>
-                                </p>
-                            </td>
-                        </tr>
-                    </table>
-                </td>
-            </tr>
-        </table>
-    </body>
-    </html>
-    """
-    
-    params = {
-        "from": f"BLVX <{SENDER_EMAIL}>",
-        "to": [to_email],
-        "subject": "Let's get you back in. 🔑",
-        "html": html_content
-    }
-    
     try:
-        email = await asyncio.to_thread(resend.Emails.send, params)
-        logger.info(f"Password reset email sent to {to_email}, ID: {email.get('id')}")
-        return True
-    except Exception as e:
-        logger.error(f"Failed to send password reset email to {to_email}: {e}")
+        return int(error.code) in EMAIL_REJECTED_CODES
+    except (TypeError, ValueError):
         return False
+
+
+class EmailOutbox:
+    """
+    Durable email outbox backed by the `email_outbox` collection. Request
+    handlers call enqueue(), which only writes a row; a background sender
+    claims due rows in batches, sends them through Resend's batch API with
+    bounded concurrency (falling back to one call per row when a batch is
+    rejected as invalid), and reschedules failed rows with backoff until
+    EMAIL_MAX_ATTEMPTS. Every call carries an idempotency key derived from
+    the email ids, and a batch that failed ambiguously (timeout, 429, 5xx)
+    is retried as the same batch under the same key, so Resend drops it if
+    the first call went through. Template params are dropped once a row is
+    sent or given up on. Rows survive restarts; a row claimed by a sender
+    that died is picked up again once its lease expires.
+    """
+
+    def __init__(self, db, concurrency: int = EMAIL_SENDER_CONCURRENCY):
+        self.db = db
+        self.concurrency = concurrency
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self.stats = {"enqueued": 0, "sent": 0, "retried": 0, "failed": 0}
+
+    @property
+    def configured(self) -> bool:
+        return bool(resend.api_key)
+
+    async def enqueue(self, template: str, to_email: str, params: dict) -> bool:
+        """Write an outbox row; returns False if email is not configured"""
+        if template not in EMAIL_TEMPLATES:
+            raise ValueError(f"Unknown email template: {template}")
+        if not self.configured:
+            logger.warning("RESEND_API_KEY not configured - skipping email send")
+            return False
+        now = datetime.now(timezone.utc)
+        await self.db.email_outbox.insert_one({
+            "email_id": f"email_{uuid.uuid4().hex[:12]}",
+            "template": template,
+            "to": to_email,
+            "params": params,
+            "status": "pending",
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now,
+        })
+        self.stats["enqueued"] += 1
+        self._wake.set()
+        return True
+
+    def start(self):
+        """Start the background sender (call from app startup)"""
+        if self._task or not self.configured:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Email outbox sender started (concurrency {self.concurrency})")
+
+    async def stop(self):
+        """Stop the sender; unsent rows stay in the outbox (call from app shutdown)"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                # Up to `concurrency` batch calls in flight at once
+                batches = [await self._claim() for _ in range(self.concurrency)]
+                batches = [batch for batch in batches if batch]
+                if batches:
+                    await asyncio.gather(*(self._send_batch(batch) for batch in batches))
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Email outbox sender error: {e}")
+
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=EMAIL_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim(self) -> List[dict]:
+        """Lease up to EMAIL_BATCH_SIZE due rows to this sender"""
+        now = datetime.now(timezone.utc)
+        due = await self.db.email_outbox.find(
+            {"$or": [
+                {"status": "pending", "next_attempt_at": {"$lte": now}},
+                {"status": "sending", "locked_until": {"$lt": now}},
+            ]},
+            {"_id": 0, "email_id": 1, "batch_key": 1}
+        ).sort("next_attempt_at", 1).limit(EMAIL_BATCH_SIZE).to_list(EMAIL_BATCH_SIZE)
+        if not due:
+            return []
+
+        # A batch that failed ambiguously is retried whole, so pull in its other rows
+        email_ids = {row["email_id"] for row in due}
+        batch_keys = list({row["batch_key"] for row in due if row.get("batch_key")})
+        if batch_keys:
+            members = await self.db.email_outbox.find(
+                {"batch_key": {"$in": batch_keys}}, {"_id": 0, "email_id": 1}
+            ).to_list(EMAIL_BATCH_SIZE * len(batch_keys))
+            email_ids.update(row["email_id"] for row in members)
+
+        claim_id = uuid.uuid4().hex
+        await self.db.email_outbox.update_many(
+            {
+                "email_id": {"$in": list(email_ids)},
+                "$or": [{"status": "pending"}, {"locked_until": {"$lt": now}}],
+            },
+            {"$set": {
+                "status": "sending",
+                "claim_id": claim_id,
+                "locked_until": now + timedelta(seconds=EMAIL_LEASE_SECONDS),
+            }}
+        )
+        return await self.db.email_outbox.find(
+            {"claim_id": claim_id, "status": "sending"},
+            {"_id": 0}
+        ).to_list(len(email_ids))
+
+    async def _send_batch(self, rows: List[dict]):
+        fresh = [row for row in rows if not row.get("batch_key")]
+        retried: Dict[str, List[dict]] = {}
+        for row in rows:
+            if row.get("batch_key"):
+                retried.setdefault(row["batch_key"], []).append(row)
+        for batch_key, group in retried.items():
+            if _batch_key(group) != batch_key:
+                # Another sender holds part of this batch; let it come back whole
+                await self._release(group)
+                continue
+            await self._send_rows(group)
+        for start in range(0, len(fresh), EMAIL_BATCH_SIZE):
+            await self._send_rows(fresh[start:start + EMAIL_BATCH_SIZE])
+
+    async def _send_rows(self, rows: List[dict]):
+        if not rows:
+            return
+        batch_key = _batch_key(rows)
+        try:
+            payloads = [render_email(row["template"], row["to"], row.get("params", {})) for row in rows]
+            await asyncio.to_thread(resend.Batch.send, payloads, {"idempotency_key": batch_key})
+        except Exception as e:
+            if _is_rejection(e):
+                # Resend refused the whole call over a bad address or row; send the
+                # rows one by one so only the ones that fail on their own are rescheduled
+                logger.warning(f"Email batch of {len(rows)} rejected, sending individually: {e}")
+                for row in rows:
+                    await self._send_one(row)
+                return
+            # The batch may have gone out; retry it as-is under the same key
+            logger.warning(f"Email batch of {len(rows)} failed, retrying as a batch: {e}")
+            await self._reschedule(rows, str(e), batch_key=batch_key)
+            return
+        await self._mark_sent(rows)
+
+    async def _send_one(self, row: dict):
+        try:
+            payload = render_email(row["template"], row["to"], row.get("params", {}))
+            await asyncio.to_thread(resend.Emails.send, payload, {"idempotency_key": f"outbox-{row['email_id']}"})
+        except Exception as e:
+            await self._reschedule([row], str(e))
+            return
+        await self._mark_sent([row])
+
+    async def _mark_sent(self, rows: List[dict]):
+        # params hold reset links and verification codes; they aren't kept once delivered
+        await self.db.email_outbox.update_many(
+            {"email_id": {"$in": [row["email_id"] for row in rows]}},
+            {"$set": {"status": "sent", "sent_at": datetime.now(timezone.utc)},
+             "$unset": {"params": "", "claim_id": "", "locked_until": "", "batch_key": ""},
+             "$inc": {"attempts": 1}}
+        )
+        self.stats["sent"] += len(rows)
+
+    async def _release(self, rows: List[dict]):
+        """Hand claimed rows back untouched (no attempt is counted)"""
+        await self.db.email_outbox.update_many(
+            {"email_id": {"$in": [row["email_id"] for row in rows]}, "status": "sending"},
+            {"$set": {"status": "pending"}, "$unset": {"claim_id": "", "locked_until": ""}}
+        )
+
+    async def _reschedule(self, rows: List[dict], error: str, batch_key: Optional[str] = None):
+        now = datetime.now(timezone.utc)
+        if batch_key:
+            # Rows retried as one batch share a schedule and an attempt count
+            attempts = max(row.get("attempts", 0) for row in rows)
+            if attempts + 1 < EMAIL_MAX_ATTEMPTS:
+                delay = EMAIL_BACKOFF_BASE * (2 ** attempts)
+                await self.db.email_outbox.update_many(
+                    {"email_id": {"$in": [row["email_id"] for row in rows]}},
+                    {"$set": {
+                        "status": "pending",
+                        "batch_key": batch_key,
+                        "attempts": attempts + 1,
+                        "last_error": error,
+                        "next_attempt_at": now + timedelta(seconds=delay + random.uniform(0, delay / 2))},
+                     "$unset": {"claim_id": "", "locked_until": ""}}
+                )
+                self.stats["retried"] += len(rows)
+                return
+            rows = [{**row, "attempts": attempts} for row in rows]
+
+        exhausted = [row["email_id"] for row in rows if row.get("attempts", 0) + 1 >= EMAIL_MAX_ATTEMPTS]
+        if exhausted:
+            await self.db.email_outbox.update_many(
+                {"email_id": {"$in": exhausted}},
+                {"$set": {"status": "failed", "last_error": error},
+                 "$unset": {"params": "", "claim_id": "", "locked_until": "", "batch_key": ""},
+                 "$inc": {"attempts": 1}}
+            )
+            self.stats["failed"] += len(exhausted)
+            logger.error(f"Giving up on {len(exhausted)} emails after {EMAIL_MAX_ATTEMPTS} attempts")
+
+        for row in rows:
+            if row["email_id"] in exhausted:
+                continue
+            delay = EMAIL_BACKOFF_BASE * (2 ** row.get("attempts", 0))
+            await self.db.email_outbox.update_one(
+                {"email_id": row["email_id"]},
+                {"$set": {
+                    "status": "pending",
+                    "last_error": error,
+                    "next_attempt_at": now + timedelta(seconds=delay + random.uniform(0, delay / 2))},
+                 "$unset": {"claim_id": "", "locked_until": "", "batch_key": ""},
+                 "$inc": {"attempts": 1}}
+            )
+            self.stats["retried"] += 1
@@ -0,0 +1,175 @@
+# /app/backend/services/engagement_counters.py
+"""Engagement counters for BLVX - buffered like/reply/repost deltas flushed in bulk"""
+import time
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FLUSH_INTERVAL = 1.0      # Seconds between bulk flushes
+COUNTER_SOURCES = {               # counter -> (collection, field pointing at the post)
+    "like_count": ("likes", "post_id"),
+    "reply_count": ("posts", "parent_post_id"),
+    "repost_count": ("posts", "quote_post_id"),
+}
+
+
+class EngagementCounters:
+    """
+    Likes, replies and quotes used to $inc the target post immediately, so a
+    viral post turned into a queue of writes on one document. add() now
+    accumulates deltas per post in memory and a loop applies them every
+    COUNTER_FLUSH_INTERVAL with one unordered bulk $inc. overlay() adds the
+    pending deltas to posts being served, so counts stay live.
+
+    The buffer is memory only: a crash loses at most one interval of deltas
+    (stop() flushes on a clean shutdown), and the counts stay derivable from
+    likes and posts. A flush that fails ambiguously (timeout, network error,
+    stepdown) may or may not have been applied, so its deltas are never
+    re-added: those posts are recounted from source before the next flush,
+    one $group aggregation per counter for the whole batch, and the deltas
+    buffered for them up to then are dropped (their source writes are
+    already in the recount).
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._pending: Dict[str, Dict[str, int]] = {}
+        self._inflight: Dict[str, Dict[str, int]] = {}   # Being written by the current flush
+        self._recount: set = set()                         # Posts an ambiguous flush may have updated
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            "events": 0,          # add() calls
+            "flushes": 0,
+            "writes": 0,          # post updates issued by flushes
+            "failed_flushes": 0,
+            "repaired": 0,
+            "last_flush_ms": None,
+        }
+
+    # ---- writes ----
+
+    def add(self, post_id: str, field: str, delta: int = 1):
+        """Buffer a counter change for post_id"""
+        if not post_id or not delta:
+            return
+        counts = self._pending.setdefault(post_id, {})
+        counts[field] = counts.get(field, 0) + delta
+        self.stats["events"] += 1
+
+    async def flush(self):
+        """Apply everything buffered so far"""
+        if self._recount:
+            await self._recount_ambiguous()
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        self._inflight = pending
+        started = time.perf_counter()
+        ops, targets = [], []
+        for post_id, counts in pending.items():
+            inc = {f: n for f, n in counts.items() if n}
+            if inc:
+                ops.append(UpdateOne({"post_id": post_id}, {"$inc": inc}))
+                targets.append(post_id)
+        try:
+            if ops:
+                await self.db.posts.bulk_write(ops, ordered=False)
+        except Exception as e:
+            # Writes the server rejected were not applied and are put back. Anything
+            # else may have been applied: recount those posts instead
+            details = e.details if isinstance(e, BulkWriteError) else {}
+            rejected = {targets[err["index"]] for err in details.get("writeErrors", [])}
+            if not details or details.get("writeConcernErrors"):
+                self._recount.update(post_id for post_id in targets if post_id not in rejected)
+            for post_id in rejected:
+                merged = self._pending.setdefault(post_id, {})
+                for f, n in pending[post_id].items():
+                    merged[f] = merged.get(f, 0) + n
+            self.stats["failed_flushes"] += 1
+            logger.error(f"Counter flush failed ({len(rejected)} rejected, {len(self._recount)} to recount): {e}")
+        finally:
+            self._inflight = {}
+        self.stats["flushes"] += 1
+        self.stats["writes"] += len(ops)
+        self.stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    # ---- reads ----
+
+    def overlay(self, posts: List[dict]):
+        """Add not-yet-flushed deltas to post dicts about to be returned"""
+        if not self._pending and not self._inflight:
+            return
+        for post in posts:
+            for buffer in (self._inflight, self._pending):
+                counts = buffer.get(post.get("post_id"))
+                if counts:
+                    for f, n in counts.items():
+                        post[f] = max((post.get(f) or 0) + n, 0)
+
+    # ---- recovery ----
+
+    async def recount(self, post_ids: List[str]):
+        """Set the counters of post_ids from likes and posts (one aggregation per counter)"""
+        counts = {post_id: {field: 0 for field in COUNTER_SOURCES} for post_id in post_ids}
+        for field, (collection, key) in COUNTER_SOURCES.items():
+            async for row in self.db[collection].aggregate([
+                {"$match": {key: {"$in": post_ids}}},
+                {"$group": {"_id": f"${key}", "n": {"$sum": 1}}}
+            ]):
+                counts[row["_id"]][field] = row["n"]
+        await self.db.posts.bulk_write(
+            [UpdateOne({"post_id": post_id}, {"$set": fields}) for post_id, fields in counts.items()],
+            ordered=False
+        )
+        self.stats["repaired"] += len(post_ids)
+
+    async def _recount_ambiguous(self):
+        """Recount posts after a flush that may or may not have been applied"""
+        post_ids = list(self._recount)
+        # Every buffered delta's source write (like, reply, quote) happened before
+        # add(), so the recount already includes it
+        for post_id in post_ids:
+            self._pending.pop(post_id, None)
+        try:
+            await self.recount(post_ids)
+        except Exception as e:
+            logger.error(f"Counter recount failed for {len(post_ids)} posts: {e}")
+            return
+        self._recount.difference_update(post_ids)
+        logger.info(f"Engagement counters recounted for {len(post_ids)} posts after an ambiguous flush")
+
+    # ---- lifecycle ----
+
+    def start(self):
+        if not self._task:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(COUNTER_FLUSH_INTERVAL)
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Counter flush loop failed: {e}")
+
+    @property
+    def metrics(self) -> dict:
+        return {
+            **self.stats,
+            "pending_posts": len(self._pending),
+            "pending_deltas": sum(abs(n) for counts in self._pending.values() for n in counts.values()),
+        }
@@ -0,0 +1,160 @@
+# /app/backend/services/explore_ranker.py
+"""Explore ranking for BLVX - time-decayed engagement scores published as a shared snapshot"""
+import time
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EXPLORE_CANDIDATES = 2000             # Most recent block posts scored per refresh
+EXPLORE_SNAPSHOT_SIZE = 500           # Ranked posts kept for serving
+EXPLORE_REFRESH_INTERVAL = 60         # Seconds between re-rankings
+EXPLORE_PAGE_SIZE = 20                # Diversity is enforced per page of this size
+EXPLORE_AUTHOR_CAP = 2                # Max posts by one author per page
+
+# score = (1 + weighted engagement) / (age_hours + 2) ** GRAVITY
+WEIGHT_LIKE = 1.0
+WEIGHT_REPLY = 2.0
+WEIGHT_REPOST = 3.0
+GRAVITY = 1.5
+
+CANDIDATE_PROJECTION = {
+    "_id": 0, "post_id": 1, "user_id": 1, "energy": 1, "created_at": 1,
+    "like_count": 1, "reply_count": 1, "repost_count": 1,
+}
+
+
+def _age_hours(created: List, now: datetime) -> np.ndarray:
+    ages = np.empty(len(created), dtype=np.float64)
+    for i, value in enumerate(created):
+        if isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                value = None
+        if isinstance(value, datetime):
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+            ages[i] = (now - value).total_seconds() / 3600
+        else:
+            ages[i] = np.inf   # Undated posts sink to the bottom
+    return np.maximum(ages, 0)
+
+
+def score_posts(posts: List[dict], now: datetime) -> np.ndarray:
+    """Time-decayed engagement score per post, vectorized over the window"""
+    likes = np.fromiter((p.get("like_count") or 0 for p in posts), dtype=np.float64, count=len(posts))
+    replies = np.fromiter((p.get("reply_count") or 0 for p in posts), dtype=np.float64, count=len(posts))
+    reposts = np.fromiter((p.get("repost_count") or 0 for p in posts), dtype=np.float64, count=len(posts))
+    engagement = WEIGHT_LIKE * np.maximum(likes, 0) + WEIGHT_REPLY * np.maximum(replies, 0) + WEIGHT_REPOST * np.maximum(reposts, 0)
+    return (1 + engagement) / np.power(_age_hours([p.get("created_at") for p in posts], now) + 2, GRAVITY)
+
+
+def diversify(order: np.ndarray, authors: List[str], page_size: int, cap: int, limit: int) -> List[int]:
+    """
+    Lay ranked posts out page by page, taking at most `cap` per author per
+    page. Posts over the cap move to the next page they fit on; a page that
+    cannot be filled within the caps is topped up in rank order.
+    """
+    pending = [int(i) for i in order]
+    rank = {i: r for r, i in enumerate(pending)}
+    result: List[int] = []
+    while pending and len(result) < limit:
+        page, rest, counts = [], [], {}
+        for i in pending:
+            author = authors[i]
+            if len(page) < page_size and counts.get(author, 0) < cap:
+                page.append(i)
+                counts[author] = counts.get(author, 0) + 1
+            else:
+                rest.append(i)
+        if len(page) < page_size:
+            short = page_size - len(page)
+            page = sorted(page + rest[:short], key=rank.__getitem__)
+            rest = rest[short:]
+        result.extend(page)
+        pending = rest
+    return result[:limit]
+
+
+class ExploreRanker:
+    """
+    Explore is the same ranking for everyone, so it is computed once per
+    EXPLORE_REFRESH_INTERVAL instead of per request. Each refresh reads the
+    newest EXPLORE_CANDIDATES block posts (counts plus metadata only),
+    scores them with one vectorized time-decay pass, spreads authors out
+    with a per-page cap and publishes the top EXPLORE_SNAPSHOT_SIZE as an
+    immutable list. Requests slice it after their own filters and load
+    fresh post documents for just that page.
+    """
+
+    def __init__(self, db, overlay: Optional[Callable[[List[dict]], None]] = None):
+        self.db = db
+        self.overlay = overlay          # Adds not-yet-flushed engagement deltas
+        self.snapshot: List[Dict] = []
+        self.refreshed_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"candidates": 0, "ranked": 0, "last_refresh_ms": None}
+
+    def ranked(self) -> List[Dict]:
+        """Current snapshot: [{post_id, user_id, energy, created_at, score}] best first"""
+        return self.snapshot
+
+    async def refresh(self):
+        started = time.perf_counter()
+        posts = await self.db.posts.find(
+            {"visibility": "block"}, CANDIDATE_PROJECTION
+        ).sort("created_at", -1).limit(EXPLORE_CANDIDATES).to_list(EXPLORE_CANDIDATES)
+        if self.overlay:
+            self.overlay(posts)
+        now = datetime.now(timezone.utc)
+        snapshot = []
+        if posts:
+            scores = score_posts(posts, now)
+            order = np.argsort(-scores, kind="stable")
+            authors = [p.get("user_id", "") for p in posts]
+            for i in diversify(order, authors, EXPLORE_PAGE_SIZE, EXPLORE_AUTHOR_CAP, EXPLORE_SNAPSHOT_SIZE):
+                p = posts[i]
+                snapshot.append({
+                    "post_id": p["post_id"],
+                    "user_id": p.get("user_id"),
+                    "energy": p.get("energy"),
+                    "created_at": p.get("created_at"),
+                    "score": round(float(scores[i]), 6),
+                })
+        self.snapshot = snapshot   # Swapped whole; readers never see a half-built list
+        self.refreshed_at = now
+        self.stats.update(
+            candidates=len(posts),
+            ranked=len(snapshot),
+            last_refresh_ms=round((time.perf_counter() - started) * 1000, 1),
+        )
+
+    async def start(self):
+        """Rank once before serving, then keep the snapshot fresh"""
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error(f"Explore ranking failed: {e}")
+        if not self._task:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(EXPLORE_REFRESH_INTERVAL)
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Explore ranking failed: {e}")
@@ -0,0 +1,162 @@
+# /app/backend/services/leaderboard.py
+"""Rising Voices leaderboard for BLVX - daily score buckets and a top-K snapshot"""
+import asyncio
+import logging
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Optional
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+LEADERBOARD_WINDOW_DAYS = 7
+LEADERBOARD_TOP_K = 100
+LEADERBOARD_REFRESH_INTERVAL = 5 * 60    # Seconds between snapshot refreshes
+BUCKET_RETENTION_DAYS = LEADERBOARD_WINDOW_DAYS + 1
+
+# Points per event, matching the old "new followers x2 + likes + replies" score
+EVENT_WEIGHTS = {"followers": 2, "likes": 1, "replies": 1}
+EXCLUDED_USERS = {"bonita"}
+
+
+def _day(when: Optional[datetime] = None) -> str:
+    return (when or datetime.now(timezone.utc)).strftime("%Y-%m-%d")
+
+
+def _window_start(now: datetime) -> str:
+    """First day (inclusive) counted by the leaderboard"""
+    return _day(now - timedelta(days=LEADERBOARD_WINDOW_DAYS - 1))
+
+
+class RisingVoicesLeaderboard:
+    """
+    Per-user daily buckets in `trending_buckets` ({user_id, day, followers,
+    likes, replies, score}) are bumped with one upsert per follow, like and
+    reply, and decremented on undo in the original event's bucket. Every few
+    minutes one aggregation over the last LEADERBOARD_WINDOW_DAYS of buckets
+    refreshes an in-memory top-K snapshot, so reads are a slice plus
+    hydration. Buckets expire via TTL.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.top: List[Dict] = []
+        self.refreshed_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self._bumps: set = set()    # In-flight bumps, held so they aren't collected mid-write
+
+    def record(self, user_id: Optional[str], event: str, delta: int = 1, actor_id: Optional[str] = None,
+               when: Optional[datetime] = None):
+        """
+        Count an event toward user_id's score (fire-and-forget). An undo
+        (delta < 0) passes `when`, the time of the event it reverses: it comes
+        off that day's bucket, and is dropped if that day has left the window
+        (or is unknown), so unfollowing someone followed months ago doesn't
+        cost them this week.
+        """
+        if not user_id or user_id in EXCLUDED_USERS or user_id == actor_id:
+            return
+        now = datetime.now(timezone.utc)
+        if delta < 0 and (when is None or _day(when) < _window_start(now)):
+            return
+        task = asyncio.create_task(self._bump(user_id, event, delta, when if delta < 0 else now))
+        self._bumps.add(task)
+        task.add_done_callback(self._bumps.discard)
+
+    async def _bump(self, user_id: str, event: str, delta: int, when: datetime):
+        try:
+            await self.db.trending_buckets.update_one(
+                {"user_id": user_id, "day": _day(when)},
+                {"$inc": {event: delta, "score": delta * EVENT_WEIGHTS[event]},
+                 "$setOnInsert": {"expires_at": when + timedelta(days=BUCKET_RETENTION_DAYS)}},
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Leaderboard update failed for {user_id}: {e}")
+
+    def top_users(self, limit: int) -> List[Dict]:
+        return self.top[:limit]
+
+    def start(self):
+        if not self._task:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        try:
+            if not await self.db.trending_buckets.find_one({}, {"_id": 1}):
+                await self.backfill()
+        except Exception as e:
+            logger.error(f"Leaderboard backfill failed: {e}")
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Leaderboard refresh failed: {e}")
+            await asyncio.sleep(LEADERBOARD_REFRESH_INTERVAL)
+
+    async def refresh(self):
+        """Recompute the top-K from the window's buckets"""
+        cutoff = _window_start(datetime.now(timezone.utc))
+        self.top = await self.db.trending_buckets.aggregate([
+            {"$match": {"day": {"$gte": cutoff}}},
+            {"$group": {
+                "_id": "$user_id",
+                "score": {"$sum": "$score"},
+                "followers": {"$sum": "$followers"},
+                "likes": {"$sum": "$likes"},
+                "replies": {"$sum": "$replies"},
+            }},
+            {"$match": {"score": {"$gt": 0}}},
+            {"$sort": {"score": -1}},
+            {"$limit": LEADERBOARD_TOP_K},
+            {"$project": {"_id": 0, "user_id": "$_id", "score": 1, "followers": 1, "likes": 1, "replies": 1}},
+        ]).to_list(LEADERBOARD_TOP_K)
+        self.refreshed_at = datetime.now(timezone.utc)
+
+    async def backfill(self):
+        """Seed buckets from the last window of follows, likes and replies (first run only)"""
+        now = datetime.now(timezone.utc)
+        since = now - timedelta(days=LEADERBOARD_WINDOW_DAYS)
+        recent = {"$or": [{"created_at": {"$gte": since.isoformat()}}, {"created_at": {"$gte": since}}]}
+        day = {"$substrCP": [{"$toString": "$created_at"}, 0, 10]}
+
+        def author_of(local_field: str) -> List[dict]:
+            return [
+                {"$lookup": {"from": "posts", "localField": local_field, "foreignField": "post_id", "as": "target"}},
+                {"$unwind": "$target"},
+            ]
+
+        sources = {
+            "followers": (self.db.follows, [{"$match": recent}], "$following_id", None),
+            "likes": (self.db.likes, [{"$match": recent}] + author_of("post_id"), "$target.user_id", "$user_id"),
+            "replies": (self.db.posts, [{"$match": {**recent, "parent_post_id": {"$ne": None}}}] + author_of("parent_post_id"),
+                        "$target.user_id", "$user_id"),
+        }
+        ops = []
+        for event, (collection, stages, owner, actor) in sources.items():
+            if actor:
+                stages = stages + [{"$match": {"$expr": {"$ne": [owner, actor]}}}]
+            rows = await collection.aggregate(stages + [
+                {"$group": {"_id": {"user_id": owner, "day": day}, "n": {"$sum": 1}}},
+            ]).to_list(None)
+            for row in rows:
+                user_id = row["_id"].get("user_id")
+                if not user_id or user_id in EXCLUDED_USERS:
+                    continue
+                ops.append(UpdateOne(
+                    {"user_id": user_id, "day": row["_id"]["day"]},
+                    {"$inc": {event: row["n"], "score": row["n"] * EVENT_WEIGHTS[event]},
+                     "$setOnInsert": {"expires_at": now + timedelta(days=BUCKET_RETENTION_DAYS)}},
+                    upsert=True
+                ))
+        if ops:
+            await self.db.trending_buckets.bulk_write(ops, ordered=False)
+        logger.info(f"Leaderboard backfilled {len(ops)} buckets")
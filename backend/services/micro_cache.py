@@ -0,0 +1,159 @@
+# /app/backend/services/micro_cache.py
+"""Micro-cache for BLVX - short-TTL, single-flight caching of viewer-independent reads"""
+import time
+import asyncio
+import functools
+from typing import Any, Callable, Dict, Optional, Sequence
+
+MICRO_CACHE_MAX_ENTRIES = 1000    # Per endpoint; least recently stored entries go first
+
+
+class _Entry:
+    __slots__ = ("value", "fresh_until", "stale_until")
+
+    def __init__(self, value: Any, fresh_until: float, stale_until: float):
+        self.value = value
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+
+
+class _Namespace:
+    """Entries, in-flight computations and counters for one cached endpoint"""
+
+    def __init__(self, ttl: float, stale: float, max_entries: int):
+        self.ttl = ttl
+        self.stale = stale
+        self.max_entries = max_entries
+        self.entries: Dict[tuple, _Entry] = {}
+        self.inflight: Dict[tuple, asyncio.Task] = {}
+        self.generation = 0
+        self.stats = {
+            "hits": 0,
+            "stale_hits": 0,      # Served stale while a refresh ran
+            "misses": 0,          # Computations started by a request
+            "coalesced": 0,       # Requests that waited on someone else's computation
+            "refreshes": 0,       # Background stale-while-revalidate computations
+            "errors": 0,
+            "invalidations": 0,
+        }
+
+    def store(self, key: tuple, value: Any):
+        now = time.monotonic()
+        self.entries.pop(key, None)
+        self.entries[key] = _Entry(value, now + self.ttl, now + self.ttl + self.stale)
+        while len(self.entries) > self.max_entries:
+            del self.entries[next(iter(self.entries))]
+
+
+class MicroCache:
+    """
+    In-process cache for endpoints whose response is the same for every
+    caller. `@micro_cache.cached(name, ttl, stale, key)` wraps an endpoint;
+    `key` names the parameters the response depends on.
+
+    - Fresh entries (younger than ttl) are returned as is.
+    - Entries up to `stale` seconds past ttl are returned immediately while
+      one background task recomputes them (stale-while-revalidate).
+    - Otherwise the first caller starts the computation and concurrent
+      callers for the same key await that same task (single flight), so a
+      burst costs one backend call. Errors are not cached; every waiter
+      gets the exception.
+
+    Mutating endpoints call invalidate(); a computation that started before
+    the invalidation is not stored. One cache per process.
+    """
+
+    def __init__(self):
+        self._namespaces: Dict[str, _Namespace] = {}
+
+    def cached(self, name: str, ttl: float, stale: float = 0, key: Sequence[str] = (),
+               max_entries: int = MICRO_CACHE_MAX_ENTRIES) -> Callable:
+        ns = self._namespaces[name] = _Namespace(ttl, stale, max_entries)
+
+        def decorator(fn: Callable) -> Callable:
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                # FastAPI passes endpoint parameters as keywords
+                cache_key = tuple(kwargs.get(k) for k in key)
+                return await self._get(ns, cache_key, functools.partial(fn, *args, **kwargs))
+            return wrapper
+        return decorator
+
+    async def _get(self, ns: _Namespace, key: tuple, compute: Callable):
+        now = time.monotonic()
+        entry = ns.entries.get(key)
+        if entry and now < entry.fresh_until:
+            ns.stats["hits"] += 1
+            return entry.value
+        if entry and now < entry.stale_until:
+            ns.stats["stale_hits"] += 1
+            if key not in ns.inflight:
+                ns.stats["refreshes"] += 1
+                self._launch(ns, key, compute)
+            return entry.value
+
+        task = ns.inflight.get(key)
+        if task:
+            ns.stats["coalesced"] += 1
+        else:
+            ns.stats["misses"] += 1
+            task = self._launch(ns, key, compute)
+        # A disconnecting client must not cancel the computation others are waiting on
+        return await asyncio.shield(task)
+
+    def _launch(self, ns: _Namespace, key: tuple, compute: Callable) -> asyncio.Task:
+        generation = ns.generation
+
+        async def run():
+            try:
+                value = await compute()
+            except Exception:
+                ns.stats["errors"] += 1
+                raise
+            finally:
+                if ns.inflight.get(key) is asyncio.current_task():
+                    del ns.inflight[key]
+            if ns.generation == generation:
+                ns.store(key, value)
+            return value
+
+        task = asyncio.create_task(run())
+        # Background refreshes have no awaiter; retrieve their exception so it is not reported as lost
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        ns.inflight[key] = task
+        return task
+
+    def invalidate(self, name: str, *key, where: Optional[Callable[[Any], bool]] = None):
+        """
+        Drop cached responses of `name`: the one for `key` (the values of the
+        endpoint's key parameters, in order), those whose value matches
+        `where`, or all of them when neither is given.
+        """
+        ns = self._namespaces[name]
+        ns.generation += 1
+        ns.stats["invalidations"] += 1
+        if not key and where is None:
+            ns.entries.clear()
+            ns.inflight.clear()
+            return
+        if key:
+            ns.entries.pop(key, None)
+            ns.inflight.pop(key, None)
+        if where is not None:
+            for k, entry in list(ns.entries.items()):
+                if where(entry.value):
+                    del ns.entries[k]
+
+    @property
+    def stats(self) -> dict:
+        result = {}
+        for name, ns in self._namespaces.items():
+            # Share of requests that did not start a computation of their own
+            served = ns.stats["hits"] + ns.stats["stale_hits"] + ns.stats["coalesced"]
+            total = served + ns.stats["misses"]
+            result[name] = {
+                **ns.stats,
+                "entries": len(ns.entries),
+                "hit_ratio": round(served / total, 3) if total else None,
+            }
+        return result
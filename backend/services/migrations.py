@@ -0,0 +1,155 @@
+# /app/backend/services/migrations.py
+"""Schema migrations for BLVX - versioned, resumable, throttled backfills"""
+import time
+import asyncio
+import inspect
+import logging
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List, Optional, Union
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_BATCH = 500             # Documents read and updated per backfill batch
+MIGRATION_PAUSE = 0.25            # Seconds between batches so backfills never crowd out requests
+SCHEMA_DOC = "schema"             # _id of the version document in `migrations`
+
+
+class Backfill:
+    """
+    One pass over `collection` for documents matching `query`. transform(doc)
+    returns the update document for it (or None to leave it alone) and may
+    be a coroutine. The query should stop matching a document once it has
+    been migrated, so re-running a batch after a crash is harmless.
+    """
+
+    def __init__(self, collection: str, query: dict, transform: Callable, projection: Optional[dict] = None):
+        self.collection = collection
+        self.query = query
+        self.transform = transform
+        self.projection = projection
+
+
+class Migration:
+    """A numbered schema change: a Backfill, or an idempotent coroutine function for one-off steps"""
+
+    def __init__(self, version: int, name: str, step: Union[Backfill, Callable[[], Awaitable]]):
+        self.version = version
+        self.name = name
+        self.step = step
+
+
+class MigrationRunner:
+    """
+    Brings the database up to the newest registered schema version. The
+    applied version is stored in `migrations` ({_id: "schema", version,
+    checkpoint}); on start a background task runs every migration above it
+    in order and bumps the version after each, so each runs once per
+    database.
+
+    Backfills page through their collection in _id order, MIGRATION_BATCH
+    documents at a time, with one unordered bulk write per batch and a
+    MIGRATION_PAUSE between batches. The last _id of each batch is saved as
+    the checkpoint, so a restart resumes mid-collection. A failed migration
+    stops the run; it is retried from its checkpoint on the next start.
+    """
+
+    def __init__(self, db, migrations: List[Migration]):
+        self.db = db
+        self.migrations = sorted(migrations, key=lambda m: m.version)
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            "version": None,
+            "latest": self.migrations[-1].version if self.migrations else 0,
+            "running": None,
+            "updated": 0,         # Documents changed by backfills this process
+            "last_error": None,
+        }
+
+    @property
+    def complete(self) -> bool:
+        """True once the stored version has reached the newest registered migration"""
+        return self.stats["version"] is not None and self.stats["version"] >= self.stats["latest"]
+
+    def has_applied(self, version: int) -> bool:
+        """True once migration `version` has run against this database"""
+        return self.stats["version"] is not None and self.stats["version"] >= version
+
+    def start(self):
+        if not self._task:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def run(self):
+        state = await self.db.migrations.find_one({"_id": SCHEMA_DOC}) or {}
+        version = state.get("version", 0)
+        self.stats["version"] = version
+        for migration in self.migrations:
+            if migration.version <= version:
+                continue
+            self.stats["running"] = migration.name
+            started = time.perf_counter()
+            try:
+                if isinstance(migration.step, Backfill):
+                    after = state.get("checkpoint") if state.get("checkpoint_version") == migration.version else None
+                    updated = await self._backfill(migration, after)
+                else:
+                    await migration.step()
+                    updated = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["last_error"] = f"{migration.name}: {e}"
+                logger.error(f"Migration {migration.version} ({migration.name}) failed: {e}")
+                return
+            finally:
+                self.stats["running"] = None
+
+            version = migration.version
+            await self.db.migrations.update_one(
+                {"_id": SCHEMA_DOC},
+                {"$set": {"version": version, "applied_at": datetime.now(timezone.utc)},
+                 "$unset": {"checkpoint": "", "checkpoint_version": ""}},
+                upsert=True
+            )
+            self.stats["version"] = version
+            state = {}
+            took = time.perf_counter() - started
+            logger.info(f"Migration {version} ({migration.name}) applied in {took:.1f}s"
+                        + (f", {updated} documents updated" if updated is not None else ""))
+
+    async def _backfill(self, migration: Migration, after) -> int:
+        fill: Backfill = migration.step
+        collection = self.db[fill.collection]
+        updated = 0
+        while True:
+            query = dict(fill.query)
+            if after is not None:
+                query["_id"] = {"$gt": after}
+            batch = await collection.find(query, fill.projection).sort("_id", 1).limit(MIGRATION_BATCH).to_list(MIGRATION_BATCH)
+            if not batch:
+                return updated
+            ops = []
+            for doc in batch:
+                update = fill.transform(doc)
+                if inspect.isawaitable(update):
+                    update = await update
+                if update:
+                    ops.append(UpdateOne({"_id": doc["_id"]}, update))
+            if ops:
+                await collection.bulk_write(ops, ordered=False)
+                updated += len(ops)
+                self.stats["updated"] += len(ops)
+            after = batch[-1]["_id"]
+            await self.db.migrations.update_one(
+                {"_id": SCHEMA_DOC},
+                {"$set": {"checkpoint": after, "checkpoint_version": migration.version}},
+                upsert=True
+            )
+            await asyncio.sleep(MIGRATION_PAUSE)
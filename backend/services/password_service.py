@@ -0,0 +1,136 @@
+# /app/backend/services/password_service.py
+"""Password hashing for BLVX - PBKDF2 work runs on a bounded thread pool, off the event loop"""
+import os
+import hmac
+import time
+import asyncio
+import hashlib
+import secrets
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Cost factor for new hashes. Raising it upgrades existing users on their next login.
+PASSWORD_HASH_ITERATIONS = int(os.environ.get("PASSWORD_HASH_ITERATIONS", "100000"))
+# Max hashes computed at once; hashlib releases the GIL so this is real parallelism
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+
+HASH_SCHEME = "pbkdf2_sha256"
+LEGACY_ITERATIONS = 100000    # Cost of the original "salt:hex" hashes
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_in_flight = 0
+_stats = {"hashes": 0, "queue_seconds": 0.0, "queue_max_seconds": 0.0, "work_seconds": 0.0}
+
+
+def _derive(password: str, salt: str, iterations: int) -> str:
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), iterations).hex()
+
+
+def _parse(stored_hash: str) -> Optional[Tuple[int, str, str]]:
+    """Return (iterations, salt, digest) for current and legacy formats"""
+    if stored_hash.startswith(HASH_SCHEME + "$"):
+        _, iterations, salt, digest = stored_hash.split("$")
+        return int(iterations), salt, digest
+    if ":" in stored_hash:
+        salt, digest = stored_hash.split(":")
+        return LEGACY_ITERATIONS, salt, digest
+    return None
+
+
+def hash_password_sync(password: str, iterations: int = PASSWORD_HASH_ITERATIONS) -> str:
+    """Hash password with a fresh salt (blocking - use hash_password from async code)"""
+    salt = secrets.token_hex(16)
+    return f"{HASH_SCHEME}${iterations}${salt}${_derive(password, salt, iterations)}"
+
+
+def verify_password_sync(password: str, stored_hash: str) -> bool:
+    """Verify password against stored hash (blocking - use verify_password from async code)"""
+    try:
+        iterations, salt, digest = _parse(stored_hash)
+        return hmac.compare_digest(_derive(password, salt, iterations), digest)
+    except Exception:
+        return False
+
+
+def needs_rehash(stored_hash: str) -> bool:
+    """True if the hash is in the legacy format or was made with a different cost"""
+    if not stored_hash.startswith(HASH_SCHEME + "$"):
+        return True
+    return _parse(stored_hash)[0] != PASSWORD_HASH_ITERATIONS
+
+
+async def _run(fn, *args):
+    """Run fn on the password pool, recording how long it waited for a worker"""
+    global _in_flight
+    queued_at = time.perf_counter()
+
+    def timed():
+        started = time.perf_counter()
+        return fn(*args), started - queued_at, time.perf_counter() - started
+
+    _in_flight += 1
+    try:
+        result, waited, worked = await asyncio.get_running_loop().run_in_executor(_executor, timed)
+    finally:
+        _in_flight -= 1
+
+    _stats["hashes"] += 1
+    _stats["queue_seconds"] += waited
+    _stats["queue_max_seconds"] = max(_stats["queue_max_seconds"], waited)
+    _stats["work_seconds"] += worked
+    if waited > 1:
+        logger.warning(f"Password hash waited {waited:.2f}s for a worker ({_in_flight} in flight)")
+    return result
+
+
+async def hash_password(password: str) -> str:
+    """Hash password without blocking the event loop"""
+    return await _run(hash_password_sync, password)
+
+
+async def verify_password(password: str, stored_hash: str) -> bool:
+    """Verify password without blocking the event loop"""
+    return await _run(verify_password_sync, password, stored_hash)
+
+
+def password_stats() -> dict:
+    """Pool metrics for the health endpoint"""
+    count = _stats["hashes"] or 1
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "iterations": PASSWORD_HASH_ITERATIONS,
+        "in_flight": _in_flight,
+        "hashes": _stats["hashes"],
+        "avg_queue_ms": round(_stats["queue_seconds"] / count * 1000, 2),
+        "max_queue_ms": round(_stats["queue_max_seconds"] * 1000, 2),
+        "avg_hash_ms": round(_stats["work_seconds"] / count * 1000, 2),
+    }
+
+
+def shutdown():
+    _executor.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    # Benchmark: python services/password_service.py [logins]
+    import sys
+
+    async def bench(total: int):
+        stored = hash_password_sync("correct horse battery staple")
+        started = time.perf_counter()
+        results = await asyncio.gather(*(verify_password("correct horse battery staple", stored) for _ in range(total)))
+        elapsed = time.perf_counter() - started
+        assert all(results)
+        per_second = total / elapsed
+        print(f"{total} logins, {PASSWORD_HASH_ITERATIONS} iterations, {PASSWORD_HASH_WORKERS} workers")
+        print(f"{per_second:.1f} logins/s total, {per_second / PASSWORD_HASH_WORKERS:.1f} logins/s per core")
+        print(password_stats())
+
+    asyncio.run(bench(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
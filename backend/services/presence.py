@@ -0,0 +1,179 @@
+# /app/backend/services/presence.py
+"""Presence for BLVX - in-memory online registry fed by sockets and heartbeats"""
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Optional, Set
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+PRESENCE_WINDOW = timedelta(minutes=30)   # Seen this recently without a socket still counts as online
+PRESENCE_FLUSH_INTERVAL = 5 * 60          # Seconds between last_active write-behind flushes
+PRESENCE_SUBSCRIBER_QUEUE = 100           # Events buffered per subscriber before dropping
+
+
+class PresenceRegistry:
+    """
+    Who is on The Block, kept in process memory. WebSocket connects and
+    disconnects, socket heartbeats and authenticated HTTP requests call
+    connect()/disconnect()/touch(); nothing on that path touches Mongo.
+
+    `_seen` is an OrderedDict kept in last-seen order, so the online list is
+    a reverse walk that stops at the first entry older than PRESENCE_WINDOW.
+    Users with an open socket are always online. Subscribers get
+    online/offline transitions on a bounded queue. users.last_active is
+    written behind in one bulk write every PRESENCE_FLUSH_INTERVAL for the
+    parts of the app that read it from the database. One registry per
+    process; the API runs as a single process.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._sockets: Dict[str, int] = {}
+        self._seen: "OrderedDict[str, datetime]" = OrderedDict()
+        self._unflushed: Set[str] = set()
+        self._online: Set[str] = set()
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    # ---- inputs ----
+
+    def touch(self, user_id: str):
+        """Record activity (request, heartbeat)"""
+        self._seen[user_id] = datetime.now(timezone.utc)
+        self._seen.move_to_end(user_id)
+        self._unflushed.add(user_id)
+        self._set_online(user_id, True)
+
+    def connect(self, user_id: str):
+        self._sockets[user_id] = self._sockets.get(user_id, 0) + 1
+        self.touch(user_id)
+
+    def disconnect(self, user_id: str):
+        count = self._sockets.get(user_id, 0) - 1
+        if count > 0:
+            self._sockets[user_id] = count
+            return
+        self._sockets.pop(user_id, None)
+        self.touch(user_id)
+        # No socket left: they stay "online" until the window lapses (see _expire)
+
+    # ---- queries ----
+
+    def last_seen(self, user_id: str) -> Optional[datetime]:
+        return self._seen.get(user_id)
+
+    def is_online(self, user_id: str) -> bool:
+        return user_id in self._online
+
+    def online_count(self) -> int:
+        return len(self._online)
+
+    def online_users(self, limit: int, exclude: Optional[str] = None) -> List[str]:
+        """Online user ids, most recently seen first"""
+        cutoff = datetime.now(timezone.utc) - PRESENCE_WINDOW
+        result = []
+        for user_id in reversed(self._seen):
+            if self._seen[user_id] < cutoff and user_id not in self._sockets:
+                break
+            if user_id != exclude:
+                result.append(user_id)
+                if len(result) >= limit:
+                    break
+        return result
+
+    # ---- events ----
+
+    def subscribe(self, maxsize: int = PRESENCE_SUBSCRIBER_QUEUE) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def _set_online(self, user_id: str, online: bool):
+        if online == (user_id in self._online):
+            return
+        if online:
+            self._online.add(user_id)
+        else:
+            self._online.discard(user_id)
+        event = {
+            "type": "presence",
+            "user_id": user_id,
+            "status": "online" if online else "offline",
+            "total_online": len(self._online),
+        }
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                pass  # Slow subscriber; it can resync from GET /users/online
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "online": len(self._online),
+            "connected": len(self._sockets),
+            "tracked": len(self._seen),
+            "unflushed": len(self._unflushed),
+            "subscribers": len(self._subscribers),
+        }
+
+    # ---- maintenance ----
+
+    def start(self):
+        if not self._task:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    def _expire(self):
+        """Mark users offline once they have no socket and fall out of the window"""
+        cutoff = datetime.now(timezone.utc) - PRESENCE_WINDOW
+        for user_id, seen in list(self._seen.items()):
+            if seen >= cutoff:
+                break  # Ordered oldest first
+            if user_id not in self._sockets:
+                self._set_online(user_id, False)
+                if user_id not in self._unflushed:
+                    del self._seen[user_id]
+
+    async def flush(self):
+        """Write last_active for everyone seen since the last flush"""
+        if not self._unflushed:
+            return
+        pending, self._unflushed = self._unflushed, set()
+        ops = [
+            UpdateOne({"user_id": uid}, {"$set": {"last_active": self._seen[uid].replace(tzinfo=None)}})
+            for uid in pending if uid in self._seen
+        ]
+        try:
+            await self.db.users.bulk_write(ops, ordered=False)
+        except Exception as e:
+            self._unflushed |= pending
+            logger.error(f"Presence flush failed: {e}")
+
+    async def _run(self):
+        elapsed = 0
+        while True:
+            await asyncio.sleep(30)
+            elapsed += 30
+            try:
+                self._expire()
+                if elapsed >= PRESENCE_FLUSH_INTERVAL:
+                    elapsed = 0
+                    await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Presence maintenance failed: {e}")
@@ -0,0 +1,174 @@
+# /app/backend/services/push_service.py
+"""Web push delivery for BLVX - handlers enqueue, a worker pool delivers"""
+import os
+import json
+import random
+import asyncio
+import logging
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+PUSH_WORKERS = int(os.environ.get("PUSH_WORKERS", "4"))
+PUSH_QUEUE_SIZE = int(os.environ.get("PUSH_QUEUE_SIZE", "10000"))
+PUSH_BATCH_SIZE = 50          # Jobs drained per subscription lookup
+PUSH_MAX_ATTEMPTS = 4         # Per device, including the first try
+PUSH_BACKOFF_BASE = 0.5       # Seconds, doubled per retry (with jitter)
+PUSH_DEFAULT_TTL = 60 * 60    # Seconds the push service may hold an undelivered message
+PUSH_TIMEOUT = 10             # Seconds per HTTPS request
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+GONE_STATUSES = {404, 410}
+
+
+class PushDeliveryService:
+    """
+    In-process push outbox. Request handlers call enqueue() which never blocks;
+    workers batch subscription lookups, deliver to devices concurrently off the
+    event loop with one pooled HTTPS session per push service, retry transient
+    failures with backoff, and delete dead (404/410) subscriptions in bulk.
+    Pushes are best-effort: queued jobs are lost on restart.
+    """
+
+    def __init__(self, db, vapid_private_key: Optional[str], vapid_claims: dict, workers: int = PUSH_WORKERS):
+        self.db = db
+        self.vapid_private_key = vapid_private_key
+        self.vapid_claims = vapid_claims
+        self.workers = workers
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=PUSH_QUEUE_SIZE)
+        self._tasks: List[asyncio.Task] = []
+        # One requests.Session per push service origin (FCM, Mozilla, Apple...) for keep-alive
+        self._sessions: Dict[str, requests.Session] = {}
+        self.stats = {"enqueued": 0, "dropped": 0, "sent": 0, "failed": 0, "retried": 0, "pruned": 0}
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.vapid_private_key)
+
+    def enqueue(self, user_id: str, title: str, body: str, data: Optional[dict] = None,
+                urgency: str = "normal", ttl: int = PUSH_DEFAULT_TTL) -> bool:
+        """Queue a push for all of a user's devices; returns False if dropped"""
+        if not self.configured:
+            return False
+        job = {
+            "user_id": user_id,
+            "payload": json.dumps({"title": title, "body": body, "data": data or {}}),
+            "urgency": urgency,
+            "ttl": ttl,
+        }
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            logger.warning(f"Push queue full - dropping push for {user_id}")
+            return False
+        self.stats["enqueued"] += 1
+        return True
+
+    def start(self):
+        """Start the worker pool (call from app startup)"""
+        if self._tasks or not self.configured:
+            return
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Push delivery started with {self.workers} workers")
+
+    async def stop(self):
+        """Stop workers and close pooled sessions (call from app shutdown)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for session in self._sessions.values():
+            session.close()
+        self._sessions = {}
+
+    def _session_for(self, endpoint: str) -> requests.Session:
+        origin = urlparse(endpoint).netloc
+        session = self._sessions.get(origin)
+        if session is None:
+            session = requests.Session()
+            self._sessions[origin] = session
+        return session
+
+    async def _worker(self, worker_id: int):
+        while True:
+            jobs = [await self.queue.get()]
+            while len(jobs) < PUSH_BATCH_SIZE and not self.queue.empty():
+                jobs.append(self.queue.get_nowait())
+            try:
+                await self._deliver_batch(jobs)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Push worker {worker_id} batch failed: {e}")
+            finally:
+                for _ in jobs:
+                    self.queue.task_done()
+
+    async def _deliver_batch(self, jobs: List[dict]):
+        user_ids = list({job["user_id"] for job in jobs})
+        subscriptions = await self.db.push_subscriptions.find(
+            {"user_id": {"$in": user_ids}},
+            {"_id": 0, "user_id": 1, "endpoint": 1, "keys": 1}
+        ).to_list(None)
+
+        by_user: Dict[str, List[dict]] = {}
+        for sub in subscriptions:
+            by_user.setdefault(sub["user_id"], []).append(sub)
+
+        deliveries = [
+            self._deliver(sub, job)
+            for job in jobs
+            for sub in by_user.get(job["user_id"], [])
+        ]
+        if not deliveries:
+            return
+
+        results = await asyncio.gather(*deliveries)
+        gone = list({endpoint for endpoint in results if endpoint})
+        if gone:
+            await self.db.push_subscriptions.delete_many({"endpoint": {"$in": gone}})
+            self.stats["pruned"] += len(gone)
+
+    async def _deliver(self, sub: dict, job: dict) -> Optional[str]:
+        """Deliver one push to one device; returns the endpoint if it should be pruned"""
+        from pywebpush import webpush, WebPushException
+
+        for attempt in range(1, PUSH_MAX_ATTEMPTS + 1):
+            try:
+                await asyncio.to_thread(
+                    webpush,
+                    subscription_info={"endpoint": sub["endpoint"], "keys": sub["keys"]},
+                    data=job["payload"],
+                    vapid_private_key=self.vapid_private_key,
+                    vapid_claims=dict(self.vapid_claims),
+                    ttl=job["ttl"],
+                    headers={"Urgency": job["urgency"]},
+                    timeout=PUSH_TIMEOUT,
+                    requests_session=self._session_for(sub["endpoint"]),
+                )
+                self.stats["sent"] += 1
+                return None
+            except WebPushException as e:
+                status = e.response.status_code if e.response is not None else None
+                if status in GONE_STATUSES:
+                    return sub["endpoint"]
+                if status is not None and status not in RETRYABLE_STATUSES:
+                    logger.error(f"Push notification failed ({status}): {e}")
+                    break
+            except requests.RequestException as e:
+                logger.warning(f"Push request error (attempt {attempt}): {e}")
+
+            if attempt < PUSH_MAX_ATTEMPTS:
+                self.stats["retried"] += 1
+                delay = PUSH_BACKOFF_BASE * (2 ** (attempt - 1))
+                await asyncio.sleep(delay + random.uniform(0, delay / 2))
+
+        self.stats["failed"] += 1
+        return None
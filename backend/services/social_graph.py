@@ -0,0 +1,319 @@
+# /app/backend/services/social_graph.py
+"""In-memory follow graph for BLVX - dense ids, sorted NumPy adjacency, snapshots"""
+import os
+import time
+import random
+import asyncio
+import logging
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+GRAPH_SNAPSHOT_PATH = os.environ.get(
+    "GRAPH_SNAPSHOT_PATH", os.path.join(tempfile.gettempdir(), "blvx_social_graph.npz")
+)
+GRAPH_SNAPSHOT_INTERVAL = 10 * 60     # Seconds between snapshots
+GRAPH_REBUILD_INTERVAL = 60 * 60      # Seconds between full reconciles against Mongo
+GRAPH_LOAD_BATCH = 10000              # Follow docs per cursor batch when building
+TWO_HOP_FANOUT = 200                  # Max followed accounts expanded for 2-hop candidates
+
+EMPTY = np.empty(0, dtype=np.int32)
+
+
+def _contains(arr: np.ndarray, value: int) -> bool:
+    i = np.searchsorted(arr, value)
+    return i < len(arr) and arr[i] == value
+
+
+def _split(src: np.ndarray, dst: np.ndarray, n: int) -> List[np.ndarray]:
+    """Group (src, dst) edges into one sorted, de-duplicated dst array per src node"""
+    order = np.lexsort((dst, src))
+    src, dst = src[order], dst[order]
+    if len(src):
+        keep = np.ones(len(src), dtype=bool)
+        keep[1:] = (src[1:] != src[:-1]) | (dst[1:] != dst[:-1])
+        src, dst = src[keep], dst[keep]
+    bounds = np.searchsorted(src, np.arange(n + 1))
+    return [dst[bounds[i]:bounds[i + 1]] for i in range(n)]
+
+
+class _Adjacency:
+    """Dense-id follow graph: out[i] = who i follows, inn[i] = i's followers (both sorted int32)"""
+
+    def __init__(self, names: List[str], out: List[np.ndarray], inn: List[np.ndarray]):
+        self.names = names
+        self.ids: Dict[str, int] = {name: i for i, name in enumerate(names)}
+        self.out = out
+        self.inn = inn
+
+    @classmethod
+    def from_edges(cls, names: List[str], src: np.ndarray, dst: np.ndarray) -> "_Adjacency":
+        n = len(names)
+        return cls(names, _split(src, dst, n), _split(dst, src, n))
+
+    def node(self, user_id: str) -> int:
+        i = self.ids.get(user_id)
+        if i is None:
+            i = len(self.names)
+            self.ids[user_id] = i
+            self.names.append(user_id)
+            self.out.append(EMPTY)
+            self.inn.append(EMPTY)
+        return i
+
+    def add(self, follower_id: str, following_id: str):
+        a, b = self.node(follower_id), self.node(following_id)
+        if not _contains(self.out[a], b):
+            self.out[a] = np.insert(self.out[a], np.searchsorted(self.out[a], b), b)
+            self.inn[b] = np.insert(self.inn[b], np.searchsorted(self.inn[b], a), a)
+
+    def remove(self, follower_id: str, following_id: str):
+        a, b = self.ids.get(follower_id), self.ids.get(following_id)
+        if a is None or b is None:
+            return
+        self.out[a] = self.out[a][self.out[a] != b]
+        self.inn[b] = self.inn[b][self.inn[b] != a]
+
+    def drop(self, user_id: str):
+        """Remove every edge touching a user (account deletion)"""
+        i = self.ids.get(user_id)
+        if i is None:
+            return
+        for j in self.out[i]:
+            self.inn[j] = self.inn[j][self.inn[j] != i]
+        for j in self.inn[i]:
+            self.out[j] = self.out[j][self.out[j] != i]
+        self.out[i] = EMPTY
+        self.inn[i] = EMPTY
+
+    def edges(self) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """Consistent (names, src, dst) copy - safe to call from a thread while the loop mutates"""
+        names, out = list(self.names), list(self.out)
+        n = min(len(names), len(out))
+        names, out = names[:n], out[:n]
+        counts = np.fromiter((len(a) for a in out), dtype=np.int64, count=n)
+        src = np.repeat(np.arange(n, dtype=np.int32), counts)
+        dst = np.concatenate(out).astype(np.int32) if out else EMPTY
+        # Drop edges to users added after the copy was taken
+        keep = dst < n
+        return names, src[keep], dst[keep]
+
+
+class SocialGraph:
+    """
+    Process-local copy of the `follows` collection for graph questions the
+    request path used to answer with several unbounded follow-list reads.
+
+    User ids map to dense integers; each user keeps sorted int32 arrays of
+    who they follow and who follows them, so membership is a binary search
+    and mutual counts are sorted-array intersections. follow/unfollow update
+    it in place. It warm-starts from an .npz snapshot, then reconciles
+    against Mongo in the background (and every GRAPH_REBUILD_INTERVAL) to
+    pick up writes it did not see. Assumes a single API process, as deployed.
+    """
+
+    def __init__(self, db, snapshot_path: str = GRAPH_SNAPSHOT_PATH):
+        self.db = db
+        self.snapshot_path = snapshot_path
+        self._graph = _Adjacency([], [], [])
+        self._journal: Optional[List[tuple]] = None  # Mutations made while a rebuild is running
+        self._task: Optional[asyncio.Task] = None
+        self.built_at: Optional[float] = None
+
+    # ---- lifecycle ----
+
+    async def start(self):
+        """Load the snapshot (or build from Mongo if there is none) and start maintenance"""
+        fresh = False
+        if not self._load_snapshot():
+            try:
+                await self.rebuild()
+                fresh = True
+            except Exception as e:
+                logger.error(f"Social graph build failed, retrying in background: {e}")
+        # A snapshot may be stale, so reconcile with Mongo straight away
+        self._task = asyncio.create_task(self._maintain(rebuild_first=not fresh))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await asyncio.to_thread(self._write_snapshot, self._graph)
+        except Exception as e:
+            logger.error(f"Social graph snapshot failed: {e}")
+
+    async def _maintain(self, rebuild_first: bool):
+        last_rebuild = 0.0 if rebuild_first else time.monotonic()
+        while True:
+            try:
+                if time.monotonic() - last_rebuild >= GRAPH_REBUILD_INTERVAL:
+                    await self.rebuild()
+                    last_rebuild = time.monotonic()
+                await asyncio.to_thread(self._write_snapshot, self._graph)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Social graph maintenance failed: {e}")
+            await asyncio.sleep(GRAPH_SNAPSHOT_INTERVAL)
+
+    async def rebuild(self):
+        """Rebuild from the follows collection, replaying mutations made meanwhile"""
+        started = time.perf_counter()
+        self._journal = []
+        try:
+            ids: Dict[str, int] = {}
+            names: List[str] = []
+            src: List[int] = []
+            dst: List[int] = []
+
+            def node(user_id: str) -> int:
+                i = ids.get(user_id)
+                if i is None:
+                    i = ids[user_id] = len(names)
+                    names.append(user_id)
+                return i
+
+            cursor = self.db.follows.find(
+                {}, {"_id": 0, "follower_id": 1, "following_id": 1}
+            ).batch_size(GRAPH_LOAD_BATCH)
+            async for edge in cursor:
+                if edge.get("follower_id") and edge.get("following_id"):
+                    src.append(node(edge["follower_id"]))
+                    dst.append(node(edge["following_id"]))
+
+            graph = await asyncio.to_thread(
+                _Adjacency.from_edges, names,
+                np.array(src, dtype=np.int32), np.array(dst, dtype=np.int32)
+            )
+            for op, *args in self._journal:
+                getattr(graph, op)(*args)
+            self._graph = graph
+            self.built_at = time.time()
+            logger.info(f"Social graph built: {len(names)} users, {len(src)} follows in {time.perf_counter() - started:.2f}s")
+        finally:
+            self._journal = None
+
+    def _write_snapshot(self, graph: _Adjacency):
+        names, src, dst = graph.edges()
+        tmp = f"{self.snapshot_path}.tmp.npz"
+        np.savez(tmp, names=np.array(names, dtype=str), src=src, dst=dst,
+                 built_at=np.array([self.built_at or time.time()]))
+        os.replace(tmp, self.snapshot_path)
+
+    def _load_snapshot(self) -> bool:
+        if not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with np.load(self.snapshot_path) as snap:
+                names = snap["names"].tolist()
+                self._graph = _Adjacency.from_edges(names, snap["src"], snap["dst"])
+                self.built_at = float(snap["built_at"][0])
+            logger.info(f"Social graph loaded from snapshot: {len(names)} users")
+            return True
+        except Exception as e:
+            logger.error(f"Social graph snapshot unreadable, rebuilding: {e}")
+            return False
+
+    # ---- mutations (call after the follows write succeeds) ----
+
+    def _apply(self, op: str, *args):
+        getattr(self._graph, op)(*args)
+        if self._journal is not None:
+            self._journal.append((op, *args))
+
+    def add_follow(self, follower_id: str, following_id: str):
+        self._apply("add", follower_id, following_id)
+
+    def remove_follow(self, follower_id: str, following_id: str):
+        self._apply("remove", follower_id, following_id)
+
+    def remove_user(self, user_id: str):
+        self._apply("drop", user_id)
+
+    # ---- queries ----
+
+    def _out(self, user_id: str) -> np.ndarray:
+        i = self._graph.ids.get(user_id)
+        return self._graph.out[i] if i is not None else EMPTY
+
+    def _in(self, user_id: str) -> np.ndarray:
+        i = self._graph.ids.get(user_id)
+        return self._graph.inn[i] if i is not None else EMPTY
+
+    def _names(self, nodes) -> List[str]:
+        names = self._graph.names
+        return [names[i] for i in nodes]
+
+    def follows(self, follower_id: str, following_id: str) -> bool:
+        j = self._graph.ids.get(following_id)
+        return j is not None and _contains(self._out(follower_id), j)
+
+    def is_mutual(self, a: str, b: str) -> bool:
+        return self.follows(a, b) and self.follows(b, a)
+
+    def following(self, user_id: str) -> List[str]:
+        return self._names(self._out(user_id))
+
+    def followers(self, user_id: str) -> List[str]:
+        return self._names(self._in(user_id))
+
+    def mutuals(self, user_id: str) -> List[str]:
+        """People who follow user_id and are followed back"""
+        return self._names(np.intersect1d(self._out(user_id), self._in(user_id), assume_unique=True))
+
+    def mutual_following_count(self, a: str, b: str) -> int:
+        return len(np.intersect1d(self._out(a), self._out(b), assume_unique=True))
+
+    def mutual_followers(self, a: str, b: str, sample: Optional[int] = None) -> Tuple[int, List[str]]:
+        """(count, up to `sample` random ids) of people who follow both a and b"""
+        common = np.intersect1d(self._in(a), self._in(b), assume_unique=True)
+        if sample is None or len(common) <= sample:
+            return len(common), self._names(common)
+        return len(common), self._names(random.sample(common.tolist(), sample))
+
+    def two_hop_candidates(self, user_id: str, limit: int, fanout: int = TWO_HOP_FANOUT) -> List[dict]:
+        """
+        Friends-of-friends ranked by how many of user_id's follows follow them.
+        Returns [{"user_id", "mutual_count", "connection"}] excluding self and
+        accounts already followed.
+        """
+        i = self._graph.ids.get(user_id)
+        if i is None:
+            return []
+        mine = self._graph.out[i]
+        if not len(mine):
+            return []
+        hops = mine if len(mine) <= fanout else np.random.choice(mine, fanout, replace=False)
+        reach = np.concatenate([self._graph.out[j] for j in hops])
+        if not len(reach):
+            return []
+
+        nodes, counts = np.unique(reach, return_counts=True)
+        keep = ~np.isin(nodes, mine, assume_unique=True) & (nodes != i)
+        nodes, counts = nodes[keep], counts[keep]
+        top = np.argsort(-counts, kind="stable")[:limit]
+
+        result = []
+        for k in top:
+            candidate = nodes[k]
+            via = np.intersect1d(self._graph.inn[candidate], mine, assume_unique=True)
+            result.append({
+                "user_id": self._graph.names[candidate],
+                "mutual_count": int(counts[k]),
+                "connection": self._graph.names[via[0]] if len(via) else None,
+            })
+        return result
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "users": len(self._graph.names),
+            "follows": int(sum(len(a) for a in self._graph.out)),
+            "built_at": self.built_at,
+            "rebuilding": self._journal is not None,
+        }
@@ -0,0 +1,234 @@
+# /app/backend/services/suggestions.py
+"""People You Might Know for BLVX - scored candidates precomputed into `suggestions`"""
+import math
+import time
+import asyncio
+import logging
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Optional, Set
+
+from pymongo import ReplaceOne
+
+logger = logging.getLogger(__name__)
+
+SUGGESTIONS_PER_USER = 50
+SUGGESTIONS_INTERVAL = 6 * 60 * 60    # Seconds between full recomputes
+SUGGESTIONS_DIRTY_INTERVAL = 60       # Seconds between recomputes of users whose follows changed
+SUGGESTIONS_ACTIVE_DAYS = 14          # Only users seen this recently get a precomputed list
+SUGGESTIONS_WRITE_BATCH = 500
+POOL_SIZE = 200                       # New/active members considered per user
+
+# Score weights: mutual connections dominate, the rest break ties and fill gaps
+WEIGHT_MUTUAL = 3.0
+WEIGHT_SAME_VOUCHER = 2.0
+WEIGHT_NEW_MEMBER = 1.0               # Decays linearly over NEW_MEMBER_DAYS
+WEIGHT_ACTIVE = 1.0                   # Decays linearly over ACTIVE_HOURS
+NEW_MEMBER_DAYS = 7
+ACTIVE_HOURS = 24
+
+
+def _as_utc(value) -> Optional[datetime]:
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return None
+
+
+class _Context:
+    """Per-run snapshot of the user attributes scoring needs"""
+
+    def __init__(self, users: List[dict], blocks: List[dict]):
+        now = datetime.now(timezone.utc)
+        self.now = now
+        self.voucher: Dict[str, str] = {}
+        self.vouched: Dict[str, List[str]] = {}
+        self.new_member: Dict[str, float] = {}
+        self.activity: Dict[str, float] = {}
+        self.active_users: List[str] = []
+        self.hidden: Dict[str, Set[str]] = {}
+
+        active_cutoff = now - timedelta(days=SUGGESTIONS_ACTIVE_DAYS)
+        for u in users:
+            uid = u["user_id"]
+            if u.get("vouched_by"):
+                self.voucher[uid] = u["vouched_by"]
+                self.vouched.setdefault(u["vouched_by"], []).append(uid)
+            created = _as_utc(u.get("created_at"))
+            if created:
+                age_days = (now - created).total_seconds() / 86400
+                if age_days < NEW_MEMBER_DAYS:
+                    self.new_member[uid] = 1 - age_days / NEW_MEMBER_DAYS
+            seen = _as_utc(u.get("last_active"))
+            if seen:
+                idle_hours = (now - seen).total_seconds() / 3600
+                if idle_hours < ACTIVE_HOURS:
+                    self.activity[uid] = 1 - idle_hours / ACTIVE_HOURS
+                if seen >= active_cutoff:
+                    self.active_users.append(uid)
+
+        self.new_pool = sorted(self.new_member, key=self.new_member.get, reverse=True)[:POOL_SIZE]
+        self.active_pool = sorted(self.activity, key=self.activity.get, reverse=True)[:POOL_SIZE]
+        for b in blocks:
+            self.hidden.setdefault(b["blocker_id"], set()).add(b["blocked_id"])
+            self.hidden.setdefault(b["blocked_id"], set()).add(b["blocker_id"])
+
+
+class SuggestionService:
+    """
+    Precomputes a ranked People You Might Know list per active user into the
+    `suggestions` collection (one doc per user), so /users/discover is one
+    indexed read plus hydration.
+
+    Candidates come from friends-of-friends (the in-memory social graph),
+    people vouched by the same voucher, new members and recently active
+    members; each is scored by mutual-connection count, shared voucher,
+    join recency and activity. A full pass runs every SUGGESTIONS_INTERVAL;
+    follow/unfollow mark the follower dirty and a short loop recomputes
+    just those users.
+    """
+
+    def __init__(self, db, graph):
+        self.db = db
+        self.graph = graph
+        self._ctx: Optional[_Context] = None
+        self._ctx_at = 0.0
+        self._dirty: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"last_full_run": None, "users": 0, "incremental": 0}
+
+    def start(self):
+        if not self._task:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def mark_dirty(self, user_id: str):
+        """Call when a user's follows change"""
+        self._dirty.add(user_id)
+
+    async def on_follow(self, follower_id: str, following_id: str):
+        """Drop a newly followed account from the follower's list right away"""
+        self.mark_dirty(follower_id)
+        await self.db.suggestions.update_one(
+            {"user_id": follower_id},
+            {"$pull": {"items": {"user_id": following_id}}}
+        )
+
+    async def get(self, user_id: str) -> List[dict]:
+        """
+        Stored suggestions. A user without a list yet is queued for the
+        background worker and scored against the last snapshot if there is
+        one (empty otherwise); the snapshot is never rebuilt on a request.
+        """
+        doc = await self.db.suggestions.find_one({"user_id": user_id}, {"_id": 0, "items": 1})
+        if doc is not None:
+            return doc["items"]
+        self.mark_dirty(user_id)
+        if self._ctx is None:
+            return []
+        return self._score(user_id, self._ctx)
+
+    async def _context(self) -> _Context:
+        # Reused between passes; the dirty loop tolerates attributes a few hours old
+        if self._ctx is None or time.monotonic() - self._ctx_at > SUGGESTIONS_INTERVAL:
+            users = await self.db.users.find(
+                {"deleted_at": {"$exists": False}},
+                {"_id": 0, "user_id": 1, "vouched_by": 1, "created_at": 1, "last_active": 1}
+            ).to_list(None)
+            blocks = await self.db.blocks.find({}, {"_id": 0, "blocker_id": 1, "blocked_id": 1}).to_list(None)
+            self._ctx = _Context(users, blocks)
+            self._ctx_at = time.monotonic()
+        return self._ctx
+
+    def _score(self, user_id: str, ctx: _Context) -> List[dict]:
+        excluded = set(self.graph.following(user_id))
+        excluded.add(user_id)
+        excluded |= ctx.hidden.get(user_id, set())
+
+        scores: Dict[str, float] = {}
+        reasons: Dict[str, tuple] = {}
+
+        def add(uid: str, points: float, reason: str, connection: Optional[str] = None):
+            if uid in excluded or points <= 0:
+                return
+            scores[uid] = scores.get(uid, 0.0) + points
+            # Reason shown is the strongest single signal
+            if uid not in reasons or points > reasons[uid][2]:
+                reasons[uid] = (reason, connection, points)
+
+        for c in self.graph.two_hop_candidates(user_id, SUGGESTIONS_PER_USER * 2):
+            points = WEIGHT_MUTUAL * math.log1p(c["mutual_count"])
+            add(c["user_id"], points, "mutual_connection", c["connection"])
+        voucher = ctx.voucher.get(user_id)
+        if voucher:
+            for uid in ctx.vouched.get(voucher, [])[:POOL_SIZE]:
+                add(uid, WEIGHT_SAME_VOUCHER, "same_voucher", voucher)
+        for uid in ctx.new_pool:
+            points = WEIGHT_NEW_MEMBER * ctx.new_member[uid]
+            add(uid, points, "new_member")
+        for uid in ctx.active_pool:
+            points = WEIGHT_ACTIVE * ctx.activity[uid]
+            add(uid, points, "active_now")
+
+        ranked = sorted(scores, key=scores.get, reverse=True)[:SUGGESTIONS_PER_USER]
+        return [
+            {"user_id": uid, "score": round(scores[uid], 3), "reason": reasons[uid][0], "connection": reasons[uid][1]}
+            for uid in ranked
+        ]
+
+    async def _store(self, lists: Dict[str, List[dict]]):
+        now = datetime.now(timezone.utc)
+        ops = [
+            ReplaceOne({"user_id": uid}, {"user_id": uid, "items": items, "computed_at": now}, upsert=True)
+            for uid, items in lists.items()
+        ]
+        for i in range(0, len(ops), SUGGESTIONS_WRITE_BATCH):
+            await self.db.suggestions.bulk_write(ops[i:i + SUGGESTIONS_WRITE_BATCH], ordered=False)
+
+    async def recompute_all(self):
+        started = time.perf_counter()
+        self._ctx = None
+        ctx = await self._context()
+        batch: Dict[str, List[dict]] = {}
+        for uid in ctx.active_users:
+            batch[uid] = self._score(uid, ctx)
+            if len(batch) % 50 == 0:
+                await asyncio.sleep(0)  # Let requests through between scoring runs
+            if len(batch) >= SUGGESTIONS_WRITE_BATCH:
+                await self._store(batch)
+                batch = {}
+        if batch:
+            await self._store(batch)
+        self.stats.update(last_full_run=datetime.now(timezone.utc).isoformat(), users=len(ctx.active_users))
+        logger.info(f"Suggestions computed for {len(ctx.active_users)} users in {time.perf_counter() - started:.1f}s")
+
+    async def _recompute_dirty(self):
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        ctx = await self._context()
+        await self._store({uid: self._score(uid, ctx) for uid in dirty})
+        self.stats["incremental"] += len(dirty)
+
+    async def _run(self):
+        last_full = 0.0
+        while True:
+            try:
+                if time.monotonic() - last_full >= SUGGESTIONS_INTERVAL:
+                    await self.recompute_all()
+                    last_full = time.monotonic()
+                else:
+                    await self._recompute_dirty()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Suggestions job failed: {e}")
+            await asyncio.sleep(SUGGESTIONS_DIRTY_INTERVAL)
@@ -44,11 +44,11 @@ export const PostCard = ({ post, showThread = false, onBonitaContext, onLiveDrop
   const navigate = useNavigate();
   const { user } = useAuth();
   const { likePost, unlikePost, deletePost, checkLiked, votePoll } = usePosts();
-  const [isPlated, setIsPlated] = useState(false);
+  const [isPlated, setIsPlated] = useState(isValidPost ? !!post.liked_by_me : false);
   const [plateCount, setPlateCount] = useState(isValidPost ? (post.like_count || 0) : 0);
   const [replyOpen, setReplyOpen] = useState(false);
   const [quoteOpen, setQuoteOpen] = useState(false);
-  const [checkingLike, setCheckingLike] = useState(true);
+  const [checkingLike, setCheckingLike] = useState(isValidPost && post.liked_by_me === undefined);
   const [isMuted, setIsMuted] = useState(true);
   const [isPlaying, setIsPlaying] = useState(false);
   const [reportOpen, setReportOpen] = useState(false);
@@ -111,9 +111,14 @@ export const PostCard = ({ post, showThread = false, onBonitaContext, onLiveDrop
     }
   };
 
-  // Check if post is plated on mount
+  // Check if post is plated on mount (feeds embed liked_by_me, so this is a fallback)
   useEffect(() => {
     if (!isValidPost) return;
+    if (post.liked_by_me !== undefined) {
+      setIsPlated(post.liked_by_me);
+      setCheckingLike(false);
+      return;
+    }
     const check = async () => {
       try {
         const plated = await checkLiked(post.post_id);
@@ -176,11 +181,11 @@ export const PostCard = ({ post, showThread = false, onBonitaContext, onLiveDrop
   // Check if user already voted on this poll
   useEffect(() => {
     if (!isValidPost || !post.poll) return;
-    if (user && post.poll.voters?.includes(user.user_id)) {
-      // Find which option they voted for (we don't store this, so just mark as voted)
-      setVotedIndex(-1); // -1 = voted but we don't know which (show results)
+    // voted_option comes with the post; -1 = voted on an old poll, option unknown (show results)
+    if (post.voted_option !== undefined && post.voted_option !== null) {
+      setVotedIndex(post.voted_option);
     }
-  }, [isValidPost, post?.poll, user]);
+  }, [isValidPost, post?.poll, post?.voted_option]);
 
   const handleVote = async (optionIndex) => {
     if (!isValidPost || voting || votedIndex !== null) return;
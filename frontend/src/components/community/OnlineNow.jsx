@@ -5,6 +5,10 @@ import { Avatar, AvatarFallback, AvatarImage } from '@/components/ui/avatar';
 import { Skeleton } from '@/components/ui/skeleton';
 import { cn } from '@/lib/utils';
 import api from '@/lib/api';
+import { useAuth } from '@/context/AuthContext';
+
+const WS_URL = process.env.REACT_APP_BACKEND_URL?.replace('https://', 'wss://').replace('http://', 'ws://');
+const PRESENCE_REFILL_MS = 60000;
 
 
 // Theme hook
@@ -40,7 +44,9 @@ const StatusDot = ({ status, size = 'sm' }) => {
 export const OnlineNow = ({ limit = 8, className }) => {
   const [data, setData] = useState({ total_online: 0, users: [] });
   const [loading, setLoading] = useState(true);
+  const { user: currentUser } = useAuth();
   const isDark = useTheme();
+  const currentUserId = currentUser?.user_id;
 
   // Theme classes
   const textClass = isDark ? 'text-white' : 'text-gray-900';
@@ -50,11 +56,79 @@ export const OnlineNow = ({ limit = 8, className }) => {
 
   useEffect(() => {
     fetchOnlineUsers();
-    // Refresh every 2 minutes
-    const interval = setInterval(fetchOnlineUsers, 120000);
-    return () => clearInterval(interval);
+
+    // Presence changes arrive over /ws/presence with the cards of users who
+    // came online and the ids of those who left, and are applied in place.
+    // The list is only refetched when departures leave it short.
+    const token = localStorage.getItem('blvx-session-token');
+    if (!WS_URL || !token) {
+      const interval = setInterval(fetchOnlineUsers, 120000);
+      return () => clearInterval(interval);
+    }
+
+    let ws = null;
+    let closed = false;
+    let heartbeat = null;
+    let refillTimer = null;
+    let reconnectTimer = null;
+    let reconnectDelay = 1000;
+
+    const connect = () => {
+      ws = new WebSocket(`${WS_URL}/ws/presence?token=${token}`);
+      ws.onopen = () => {
+        reconnectDelay = 1000;
+        heartbeat = setInterval(() => {
+          if (ws.readyState === WebSocket.OPEN) ws.send('ping');
+        }, 25000);
+      };
+      ws.onmessage = (event) => {
+        if (event.data === 'pong') return;
+        try {
+          const data = JSON.parse(event.data);
+          if (data.type === 'presence') {
+            applyPresence(data);
+          } else if (typeof data.total_online === 'number') {
+            setData((prev) => ({ ...prev, total_online: data.total_online }));
+          }
+        } catch (err) {
+          // Ignore malformed frames
+        }
+      };
+      ws.onclose = () => {
+        clearInterval(heartbeat);
+        if (closed) return;
+        reconnectTimer = setTimeout(connect, reconnectDelay);
+        reconnectDelay = Math.min(reconnectDelay * 2, 30000);
+      };
+    };
+
+    const applyPresence = ({ added = [], removed = [], total_online }) => {
+      const changed = new Set([...removed, ...added.map((u) => u.user_id)]);
+      const joined = added.filter((u) => u.user_id !== currentUserId);
+      setData((prev) => {
+        const users = [...joined, ...prev.users.filter((u) => !changed.has(u.user_id))].slice(0, limit);
+        // Someone left and others beyond the list are still online: refill it, rarely
+        if (users.length < limit && total_online > users.length + 1 && !refillTimer) {
+          refillTimer = setTimeout(() => {
+            refillTimer = null;
+            fetchOnlineUsers();
+          }, PRESENCE_REFILL_MS);
+        }
+        return { total_online, users };
+      });
+    };
+
+    connect();
+
+    return () => {
+      closed = true;
+      clearInterval(heartbeat);
+      clearTimeout(refillTimer);
+      clearTimeout(reconnectTimer);
+      if (ws) ws.close();
+    };
     // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [limit]);
+  }, [limit, currentUserId]);
 
   const fetchOnlineUsers = async () => {
     try {
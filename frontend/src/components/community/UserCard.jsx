@@ -55,7 +55,8 @@ export const UserCard = ({
   onFollowChange,
   className 
 }) => {
-  const [isFollowing, setIsFollowing] = useState(false);
+  // Follow state comes with the list payload (or /viewer-state); cards never fetch it one by one
+  const [isFollowing, setIsFollowing] = useState(Boolean(user.is_following));
   const [loading, setLoading] = useState(false);
   const [isDark, setIsDark] = useState(() => {
     return document.documentElement.getAttribute('data-theme') === 'dark';
@@ -1,25 +1,146 @@
 import { useState, useEffect, useCallback } from 'react';
 import api from '@/lib/api';
 
-export const useNotificationCount = () => {
-  const [count, setCount] = useState(0);
+const WS_URL = process.env.REACT_APP_BACKEND_URL?.replace('https://', 'wss://').replace('http://', 'ws://');
+const HEARTBEAT_MS = 25000;
+const MAX_RECONNECT_MS = 30000;
+
+// One notifications socket is shared by every component showing the badge
+const listeners = new Set();
+let socket = null;
+let heartbeat = null;
+let reconnectTimer = null;
+let reconnectDelay = 1000;
+let lastCount = 0;
+// updated_at of the last notification event seen; survives reconnects
+let resumeToken = null;
+
+const emit = (count) => {
+  lastCount = count;
+  listeners.forEach((listener) => listener(count));
+};
+
+const fetchCount = async () => {
+  try {
+    const response = await api.get('/notifications/unread-count');
+    emit(response.data.count);
+  } catch (err) {
+    // Silently fail
+  }
+};
+
+const advanceResumeToken = (token) => {
+  if (token && (!resumeToken || token > resumeToken)) resumeToken = token;
+};
+
+const dispatchNotification = (detail) => {
+  window.dispatchEvent(new CustomEvent('blvx:notification', { detail }));
+};
+
+// Replay what was created or updated while the socket was down, oldest first
+const fetchMissed = async () => {
+  const since = resumeToken;
+  if (!since) return;
+  try {
+    const response = await api.get('/notifications', { params: { since } });
+    [...response.data].reverse().forEach((notif) => {
+      advanceResumeToken(notif.updated_at);
+      dispatchNotification({
+        type: 'notification',
+        notification_type: notif.type,
+        actor: notif.from_user,
+        post_id: notif.post_id,
+        gc_id: notif.gc_id,
+        count: notif.count,
+        resume_token: notif.updated_at,
+        missed: true,
+      });
+    });
+  } catch (err) {
+    // The next reconnect retries from the same token
+  }
+};
+
+const scheduleReconnect = () => {
+  if (reconnectTimer || listeners.size === 0) return;
+  reconnectTimer = setTimeout(() => {
+    reconnectTimer = null;
+    connect();
+  }, reconnectDelay);
+  reconnectDelay = Math.min(reconnectDelay * 2, MAX_RECONNECT_MS);
+};
+
+const connect = () => {
+  const token = localStorage.getItem('blvx-session-token');
+  if (!WS_URL || !token || socket) return;
 
-  const fetchCount = useCallback(async () => {
+  const ws = new WebSocket(`${WS_URL}/ws/notifications?token=${token}`);
+  socket = ws;
+
+  ws.onopen = () => {
+    reconnectDelay = 1000;
+    fetchMissed();
+    heartbeat = setInterval(() => {
+      if (ws.readyState === WebSocket.OPEN) ws.send('ping');
+    }, HEARTBEAT_MS);
+  };
+
+  ws.onmessage = (event) => {
+    if (event.data === 'pong') return;
     try {
-      const response = await api.get('/notifications/unread-count');
-      setCount(response.data.count);
+      const data = JSON.parse(event.data);
+      if (typeof data.unread_count === 'number') emit(data.unread_count);
+      if (data.type === 'notification') {
+        advanceResumeToken(data.resume_token);
+        dispatchNotification(data);
+      } else if (!resumeToken && data.resume_token) {
+        // First connection: start from the server's clock, not an event
+        resumeToken = data.resume_token;
+      }
     } catch (err) {
-      // Silently fail
+      // Ignore malformed frames
     }
-  }, []);
+  };
+
+  ws.onclose = () => {
+    clearInterval(heartbeat);
+    heartbeat = null;
+    if (socket === ws) socket = null;
+    scheduleReconnect();
+  };
+};
+
+const disconnect = () => {
+  clearTimeout(reconnectTimer);
+  reconnectTimer = null;
+  clearInterval(heartbeat);
+  heartbeat = null;
+  if (socket) {
+    const ws = socket;
+    socket = null;
+    ws.close();
+  }
+};
+
+// Token the socket passes as `since` to GET /notifications after a reconnect
+export const getNotificationResumeToken = () => resumeToken;
+
+export const useNotificationCount = () => {
+  const [count, setCount] = useState(lastCount);
+
+  const refetch = useCallback(() => fetchCount(), []);
 
   useEffect(() => {
-    fetchCount();
-    
-    // Poll every 30 seconds
-    const interval = setInterval(fetchCount, 30000);
-    return () => clearInterval(interval);
-  }, [fetchCount]);
-
-  return { count, refetch: fetchCount };
+    listeners.add(setCount);
+    if (listeners.size === 1) {
+      fetchCount();
+      connect();
+    }
+    return () => {
+      listeners.delete(setCount);
+      if (listeners.size === 0) disconnect();
+    };
+  }, []);
+
+  return { count, refetch };
 };
@@ -31,19 +31,24 @@ export const usePosts = () => {
     }
   }, []);
 
-  const fetchExploreFeed = useCallback(async (before = null, energy = null) => {
+  // Explore is ranked by score, not time, so it pages by offset into the ranking
+  const fetchExploreFeed = useCallback(async (offset = 0, energy = null) => {
     setLoading(true);
     setError(null);
     try {
       const params = {};
-      if (before) params.before = before;
+      if (offset) params.offset = offset;
       if (energy) params.energy = energy;
       const response = await api.get(`/posts/explore`, {
         params,
         withCredentials: true
       });
-      if (before) {
-        setPosts(prev => [...prev, ...response.data]);
+      if (offset) {
+        // The ranking can be refreshed between pages; skip posts already shown
+        setPosts(prev => {
+          const seen = new Set(prev.map(p => p.post_id));
+          return [...prev, ...response.data.filter(p => !seen.has(p.post_id))];
+        });
       } else {
         setPosts(response.data);
       }
@@ -95,11 +100,12 @@ export const usePosts = () => {
     }
   }, []);
 
-  const fetchThread = useCallback(async (postId) => {
+  const fetchThread = useCallback(async (postId, params = {}) => {
     setLoading(true);
     setError(null);
     try {
       const response = await api.get(`/posts/${postId}/thread`, {
+        params,
         withCredentials: true
       });
       return response.data;
@@ -59,14 +59,19 @@ export const useUsers = () => {
     }
   }, []);
 
-  const checkFollowing = useCallback(async (userId) => {
+  // Viewer flags for many users (and posts) in one request:
+  // { users: { [id]: { is_following, follows_me } }, posts: { [id]: {...} } }
+  const fetchViewerState = useCallback(async ({ userIds = [], postIds = [] }) => {
     try {
-      const response = await axios.get(`${API}/users/following/${userId}`, {
+      const response = await axios.post(`${API}/viewer-state`, {
+        user_ids: userIds,
+        post_ids: postIds
+      }, {
         withCredentials: true
       });
-      return response.data.is_following;
+      return response.data;
     } catch (err) {
-      return false;
+      return { users: {}, posts: {} };
     }
   }, []);
 
@@ -94,7 +99,7 @@ export const useUsers = () => {
     updateProfile,
     followUser,
     unfollowUser,
-    checkFollowing,
+    fetchViewerState,
     searchUsers
   };
 };
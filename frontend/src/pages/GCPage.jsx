@@ -27,6 +27,7 @@ import { formatDistanceToNow } from 'date-fns';
 
 const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
 const WS_URL = process.env.REACT_APP_BACKEND_URL?.replace('https://', 'wss://').replace('http://', 'ws://');
+const GC_PAGE_SIZE = 50;
 
 export default function GCPage() {
   const navigate = useNavigate();
@@ -42,6 +43,8 @@ export default function GCPage() {
   const [sendingMessage, setSendingMessage] = useState(false);
   const [wsConnected, setWsConnected] = useState(false);
   const [typingUsers, setTypingUsers] = useState([]);
+  const [hasOlder, setHasOlder] = useState(false);
+  const [loadingOlder, setLoadingOlder] = useState(false);
   
   // User selection for new GC
   const [availableUsers, setAvailableUsers] = useState([]);
@@ -52,6 +55,7 @@ export default function GCPage() {
   const [startingSidebar, setStartingSidebar] = useState(null); // user_id of person we're starting sidebar with
   
   const messagesEndRef = useRef(null);
+  const skipScrollRef = useRef(false);
   const wsRef = useRef(null);
   const typingTimeoutRef = useRef(null);
 
@@ -93,6 +97,11 @@ export default function GCPage() {
   }, [activeGC]);
 
   useEffect(() => {
+    // Prepending older history keeps the reader where they were
+    if (skipScrollRef.current) {
+      skipScrollRef.current = false;
+      return;
+    }
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
   }, [messages]);
 
@@ -233,13 +242,35 @@ export default function GCPage() {
 
   const fetchMessages = async (gcId) => {
     try {
-      const response = await axios.get(`${API}/gc/${gcId}/messages`, { withCredentials: true });
+      const response = await axios.get(`${API}/gc/${gcId}/messages`, {
+        params: { limit: GC_PAGE_SIZE },
+        withCredentials: true
+      });
       setMessages(response.data);
+      setHasOlder(response.data.length === GC_PAGE_SIZE);
     } catch (error) {
       console.error('Error fetching messages:', error);
     }
   };
 
+  const loadOlderMessages = async () => {
+    if (!activeGC || loadingOlder || messages.length === 0) return;
+    setLoadingOlder(true);
+    try {
+      const response = await axios.get(`${API}/gc/${activeGC.gc_id}/messages`, {
+        params: { limit: GC_PAGE_SIZE, before: messages[0].created_at },
+        withCredentials: true
+      });
+      skipScrollRef.current = true;
+      setMessages(prev => [...response.data, ...prev]);
+      setHasOlder(response.data.length === GC_PAGE_SIZE);
+    } catch (error) {
+      toast.error('Failed to load earlier messages');
+    } finally {
+      setLoadingOlder(false);
+    }
+  };
+
   const sendMessage = async () => {
     if (!newMessage.trim() || !activeGC || sendingMessage) return;
     
@@ -460,6 +491,21 @@ export default function GCPage() {
                 </div>
               ) : (
                 <div className="space-y-4">
+                  {hasOlder && (
+                    <div className="text-center">
+                      <Button
+                        variant="ghost"
+                        size="sm"
+                        onClick={loadOlderMessages}
+                        disabled={loadingOlder}
+                        className={cn("text-xs", textMutedClass)}
+                        data-testid="gc-load-older"
+                      >
+                        {loadingOlder && <Loader2 className="h-3.5 w-3.5 mr-2 animate-spin" />}
+                        Load earlier messages
+                      </Button>
+                    </div>
+                  )}
                   {messages.map((msg) => (
                     <div 
                       key={msg.message_id}
@@ -100,7 +100,7 @@ export default function HomePage() {
       } else if (feedType === 'cookout') {
         await fetchCookout();
       } else {
-        await fetchExploreFeed(null, energyFilter);
+        await fetchExploreFeed(0, energyFilter);
       }
       setLastFetch(new Date());
       if (showToast) {
@@ -61,6 +61,8 @@ export default function NotificationsPage() {
         return 'reposted your post';
       case 'follow':
         return 'followed you';
+      case 'gc_message':
+        return 'sent messages in The GC';
       case 'mention':
         return 'mentioned you';
       case 'stoop_visit':
@@ -187,6 +189,9 @@ export default function NotificationsPage() {
                   <div className="flex-1 min-w-0">
                     <p className="text-sm">
                       <span className={cn("font-semibold", textClass)}>{notif.from_user?.name}</span>
+                      {notif.count > 1 && (
+                        <span className={textMutedClass}> and {notif.count - 1} {notif.count - 1 === 1 ? 'other' : 'others'}</span>
+                      )}
                       <span className={textMutedClass}> {getNotificationText(notif)}</span>
                     </p>
                     
@@ -29,7 +29,7 @@ export default function ProfilePage() {
   const { username } = useParams();
   const navigate = useNavigate();
   const { user: currentUser, updateUser } = useAuth();
-  const { fetchProfile, followUser, unfollowUser, checkFollowing, loading: userLoading } = useUsers();
+  const { fetchProfile, followUser, unfollowUser, fetchViewerState, loading: userLoading } = useUsers();
   const { posts, fetchUserPosts, loading: postsLoading } = usePosts();
   const { isDark, textClass, textMutedClass, textVeryMutedClass, borderClass, hoverBgClass } = useThemeClasses();
   
@@ -72,8 +72,8 @@ export default function ProfilePage() {
         setProfile(userData);
         
         if (!isOwnProfile && currentUser) {
-          const following = await checkFollowing(userData.user_id);
-          setIsFollowing(following);
+          const state = await fetchViewerState({ userIds: [userData.user_id] });
+          setIsFollowing(Boolean(state.users?.[userData.user_id]?.is_following));
         }
         
         await fetchUserPosts(username);
@@ -84,7 +84,7 @@ export default function ProfilePage() {
     };
 
     loadProfile();
-  }, [username, fetchProfile, fetchUserPosts, checkFollowing, isOwnProfile, currentUser, navigate]);
+  }, [username, fetchProfile, fetchUserPosts, fetchViewerState, isOwnProfile, currentUser, navigate]);
 
   const handleFollow = async () => {
     if (!profile || followLoading) return;
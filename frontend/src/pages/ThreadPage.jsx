@@ -10,6 +10,39 @@ import { Skeleton } from '@/components/ui/skeleton';
 import { cn } from '@/lib/utils';
 import { toast } from 'sonner';
 
+// Replace the replies of one node anywhere in the tree
+const updateBranch = (replies, postId, update) => replies.map((reply) => {
+  if (reply.post_id === postId) return update(reply);
+  if (!reply.replies?.length) return reply;
+  return { ...reply, replies: updateBranch(reply.replies, postId, update) };
+});
+
+const ReplyBranch = ({ reply, level, onLoadMore, onBonitaContext, textMutedClass, borderClass }) => (
+  <div className={cn(level > 0 && "ml-6 border-l", level > 0 && borderClass)}>
+    <PostCard post={reply} onBonitaContext={onBonitaContext} />
+    {reply.replies?.map((child) => (
+      <ReplyBranch
+        key={child.post_id}
+        reply={child}
+        level={level + 1}
+        onLoadMore={onLoadMore}
+        onBonitaContext={onBonitaContext}
+        textMutedClass={textMutedClass}
+        borderClass={borderClass}
+      />
+    ))}
+    {reply.more_replies > 0 && (
+      <button
+        onClick={() => onLoadMore(reply)}
+        className={cn("ml-6 px-4 py-2 text-sm hover:underline", textMutedClass)}
+        data-testid={`more-replies-${reply.post_id}`}
+      >
+        Show {reply.more_replies} more {reply.more_replies === 1 ? 'reply' : 'replies'}
+      </button>
+    )}
+  </div>
+);
+
 export default function ThreadPage() {
   const { postId } = useParams();
   const navigate = useNavigate();
@@ -34,6 +67,40 @@ export default function ThreadPage() {
     loadThread();
   }, [postId, fetchThread, navigate]);
 
+  const loadMoreReplies = async () => {
+    try {
+      const data = await fetchThread(postId, { after: thread.next_cursor });
+      setThread((prev) => ({
+        ...prev,
+        replies: [...prev.replies, ...data.replies],
+        next_cursor: data.next_cursor
+      }));
+    } catch (error) {
+      toast.error('Could not load more replies');
+    }
+  };
+
+  const loadBranch = async (reply) => {
+    try {
+      const params = reply.replies_cursor ? { after: reply.replies_cursor } : {};
+      const data = await fetchThread(reply.post_id, params);
+      setThread((prev) => ({
+        ...prev,
+        replies: updateBranch(prev.replies, reply.post_id, (node) => {
+          const replies = [...(node.replies || []), ...data.replies];
+          return {
+            ...node,
+            replies,
+            more_replies: data.next_cursor ? Math.max((node.reply_count || 0) - replies.length, 0) : 0,
+            replies_cursor: data.next_cursor
+          };
+        })
+      }));
+    } catch (error) {
+      toast.error('Could not load more replies');
+    }
+  };
+
   const handleDecompress = async () => {
     if (!thread || bonitaLoading) return;
     
@@ -91,6 +158,8 @@ export default function ThreadPage() {
 
   if (!thread) return null;
 
+  const replyTotal = Math.max(thread.post.reply_count || 0, thread.replies.length);
+
   return (
     <div className="mb-safe" data-testid="thread-page">
       {/* Header */}
@@ -160,7 +229,7 @@ export default function ThreadPage() {
         <>
           <div className={cn("px-4 py-3 border-b", borderClass)}>
             <p className={cn("text-sm", textMutedClass)}>
-              {thread.replies.length} {thread.replies.length === 1 ? 'reply' : 'replies'}
+              {replyTotal} {replyTotal === 1 ? 'reply' : 'replies'}
             </p>
           </div>
           
@@ -170,12 +239,30 @@ export default function ThreadPage() {
               className="animate-fade-in"
               style={{ animationDelay: `${index * 50}ms` }}
             >
-              <PostCard 
-                post={reply} 
+              <ReplyBranch
+                reply={reply}
+                level={0}
+                onLoadMore={loadBranch}
                 onBonitaContext={handleBonitaContext}
+                textMutedClass={textMutedClass}
+                borderClass={borderClass}
               />
             </div>
           ))}
+
+          {thread.next_cursor && (
+            <div className={cn("p-4 border-b", borderClass)}>
+              <Button
+                variant="ghost"
+                onClick={loadMoreReplies}
+                disabled={loading}
+                className={cn("w-full", textMutedClass)}
+                data-testid="load-more-replies"
+              >
+                Load more replies
+              </Button>
+            </div>
+          )}
         </>
       )}
     </div>